@@ -2,11 +2,9 @@ import streamlit as st
 from dotenv import load_dotenv
 import os
 
-# Import components
+# Import components; page components are imported when their page is opened,
+# so the login page does not load openai, reportlab or the database layer
 from auth import auth_component, check_authentication, get_current_user, logout
-from components.simple_prospect import simple_prospect_component
-from components.ai_report import ai_report_component
-from database.models import db
 
 # Load environment variables
 load_dotenv()
@@ -444,6 +442,18 @@ def display_navigation():
             "description": "Create a new prospect profile",
             "value": "New Prospect"
         },
+        {
+            "icon": "📥",
+            "title": "Bulk Import",
+            "description": "Import prospects from CSV or Excel",
+            "value": "Bulk Import"
+        },
+        {
+            "icon": "📤",
+            "title": "Export Data",
+            "description": "Download prospects and reports",
+            "value": "Export Data"
+        },
         {
             "icon": "🤖",
             "title": "AI Report Generation",
@@ -545,8 +555,16 @@ def main():
     # Route to appropriate component with enhanced error handling
     try:
         if page == "New Prospect":
+            from components.simple_prospect import simple_prospect_component
             simple_prospect_component()
+        elif page == "Bulk Import":
+            from components.bulk_import import bulk_import_component
+            bulk_import_component()
+        elif page == "Export Data":
+            from components.data_export import data_export_component
+            data_export_component()
         elif page == "AI Report Generation":
+            from components.ai_report import ai_report_component
             ai_report_component()
         else:
             st.error("Page not found")
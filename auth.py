@@ -1,9 +1,14 @@
 import streamlit as st
 from typing import Optional, Dict, Any
 import base64
-from PIL import Image
 import os
 
+def database_user_id(username: str) -> int:
+    """Id of the users row a login writes under, created on first use"""
+    # Imported here so the login page does not open the database
+    from database.models import db
+    return db.ensure_user(username)
+
 class AuthManager:
     """Authentication manager for NBP Sales Preparation Tool with hardcoded credentials"""
     
@@ -12,6 +17,14 @@ class AuthManager:
         self.valid_credentials = {
             "sales_rep": "nbp2025"
         }
+        # Database ids of the logins, resolved once per process
+        self._user_ids: Dict[str, int] = {}
+    
+    def _user_id(self, username: str) -> int:
+        """Database id of a login's users row"""
+        if username not in self._user_ids:
+            self._user_ids[username] = database_user_id(username)
+        return self._user_ids[username]
     
     def authenticate_user(self, username: str, password: str) -> Dict[str, Any]:
         """Authenticate a user with hardcoded credentials"""
@@ -24,7 +37,7 @@ class AuthManager:
                 "success": True, 
                 "message": "Login successful!",
                 "user": {
-                    "id": 1,
+                    "id": self._user_id(username),
                     "username": username,
                     "email": "sales_rep@nbp.com",
                     "role": "sales_rep"
@@ -37,7 +50,7 @@ class AuthManager:
         """Get user by username (hardcoded)"""
         if username in self.valid_credentials:
             return {
-                "id": 1,
+                "id": self._user_id(username),
                 "username": username,
                 "email": "sales_rep@nbp.com",
                 "role": "sales_rep",
@@ -47,9 +60,9 @@ class AuthManager:
     
     def get_user_by_id(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Get user by ID (hardcoded)"""
-        if user_id == 1:
+        if user_id == self._user_id("sales_rep"):
             return {
-                "id": 1,
+                "id": user_id,
                 "username": "sales_rep",
                 "email": "sales_rep@nbp.com",
                 "role": "sales_rep",
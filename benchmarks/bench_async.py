@@ -0,0 +1,140 @@
+"""Concurrent request throughput: sync DatabaseManager vs AsyncDatabaseManager.
+
+Each simulated report request awaits a fake model call, then reads the
+user's prospects, a prospect's scripts and the user statistics and saves a
+generated script. ``--concurrency`` requests are in flight at once on one
+event loop, and each mode gets its own freshly seeded database. In sync mode the database calls run directly in the coroutine,
+blocking the loop; in async mode they go through the facade's writer and
+reader threads, and in async-read mode the three reads share one
+``AsyncDatabaseManager.read`` call. The script also reports the worst event-loop stall, measured
+by a ticker task that expects to wake every millisecond.
+
+    python -m benchmarks.bench_async --requests 2000 --concurrency 100
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from database.aio import AsyncDatabaseManager
+from database.models import DatabaseManager
+
+TICK = 0.001
+
+
+def seed(db: DatabaseManager, prospects: int):
+    """Give user 1 prospects with a few scripts each"""
+    ids = db.create_prospects_with_contacts(1, [
+        {'company_name': f'Company {i}', 'industry': 'Technology', 'context': 'Context ' * 20,
+         'contacts': [{'contact_name': f'Contact {i}', 'title': 'CTO'}]}
+        for i in range(prospects)
+    ])
+    for prospect_id in ids:
+        for kind in ('email', 'call'):
+            db.create_generated_script(prospect_id, 1, {'script_type': kind, 'content': f'{kind} script ' * 100})
+    return ids
+
+
+async def sync_request(db: DatabaseManager, prospect_id: int, latency: float):
+    await asyncio.sleep(latency)
+    db.get_user_prospects(1, limit=20)
+    db.get_prospect_scripts(prospect_id)
+    db.get_user_statistics(1)
+    db.create_generated_script(prospect_id, 1, {'script_type': 'email', 'content': 'generated ' * 100})
+
+
+async def async_request(adb: AsyncDatabaseManager, prospect_id: int, latency: float):
+    await asyncio.sleep(latency)
+    await asyncio.gather(
+        adb.get_user_prospects(1, limit=20),
+        adb.get_prospect_scripts(prospect_id),
+        adb.get_user_statistics(1),
+    )
+    await adb.create_generated_script(prospect_id, 1, {'script_type': 'email', 'content': 'generated ' * 100})
+
+
+async def async_read_request(adb: AsyncDatabaseManager, prospect_id: int, latency: float):
+    await asyncio.sleep(latency)
+    await adb.read(lambda db: (
+        db.get_user_prospects(1, limit=20),
+        db.get_prospect_scripts(prospect_id),
+        db.get_user_statistics(1),
+    ))
+    await adb.create_generated_script(prospect_id, 1, {'script_type': 'email', 'content': 'generated ' * 100})
+
+
+async def drive(request, target, prospect_ids, requests: int, concurrency: int, latency: float) -> dict:
+    """Run requests with at most concurrency in flight; collect latency and loop stall"""
+    latencies, stalls = [], []
+    done = asyncio.Event()
+
+    async def ticker():
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(TICK)
+            now = time.perf_counter()
+            stalls.append(now - last - TICK)
+            last = now
+
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with slots:
+            started = time.perf_counter()
+            await request(target, prospect_ids[i % len(prospect_ids)], latency)
+            latencies.append(time.perf_counter() - started)
+
+    tick = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await tick
+
+    latencies.sort()
+    return {
+        'throughput': requests / elapsed,
+        'p50': statistics.median(latencies),
+        'p95': latencies[int(len(latencies) * 0.95)],
+        'max_stall': max(stalls, default=0.0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.05, help='simulated model call, seconds')
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--prospects', type=int, default=200)
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode, request in (('sync', sync_request), ('async', async_request),
+                              ('async-read', async_read_request)):
+            db = DatabaseManager(os.path.join(tmp, f'{mode}.db'), maintenance=False, pool_size=args.readers + 3)
+            prospect_ids = seed(db, args.prospects)
+            if mode == 'sync':
+                results[mode] = asyncio.run(drive(
+                    request, db, prospect_ids, args.requests, args.concurrency, args.latency))
+            else:
+                adb = AsyncDatabaseManager(db, readers=args.readers)
+                results[mode] = asyncio.run(drive(
+                    request, adb, prospect_ids, args.requests, args.concurrency, args.latency))
+                adb.close()
+                print(f"{mode}: {adb.stats()}")
+            db.close()
+
+    print(f"\n{args.requests} requests, {args.concurrency} in flight, "
+          f"{args.latency * 1e3:.0f} ms simulated model latency")
+    print(f"{'mode':<12}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'max loop stall ms':>20}")
+    for mode, r in results.items():
+        print(f"{mode:<12}{r['throughput']:>10.1f}{r['p50'] * 1e3:>10.1f}{r['p95'] * 1e3:>10.1f}"
+              f"{r['max_stall'] * 1e3:>20.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Storage backend comparison: a database file versus the in-memory backend.
+
+Runs the same workload against each backend: startup (schema and
+migrations), single-row prospect inserts (one commit each), batched
+inserts, point reads, search, and a mixed read/write load
+from several threads. The in-memory backend shows what tests and
+benchmarks gain by skipping disk I/O.
+
+    python -m benchmarks.bench_backends --rows 5000 --threads 4
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from database.models import DatabaseManager
+
+
+def timed(label: str, results: dict, func, count: int = 1):
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    results[label] = count / elapsed if count > 1 else elapsed * 1000
+
+
+def run(database: str, rows: int, threads: int) -> dict:
+    results = {}
+    started = time.perf_counter()
+    # No prospect cache, so reads measure the storage
+    db = DatabaseManager(database, maintenance=False, pool_size=threads + 1, cache_size=0)
+    results['startup ms'] = (time.perf_counter() - started) * 1000
+    rng = random.Random(5)
+
+    def single_inserts():
+        for i in range(rows):
+            db.create_prospect(1, {'company_name': f'Single {i}', 'industry': 'Technology', 'context': 'x' * 200})
+
+    def batch_inserts():
+        for start in range(0, rows, 500):
+            db.create_prospects_with_contacts(1, [
+                {'company_name': f'Batch {i}', 'website': f'batch{i}.com',
+                 'contacts': [{'contact_name': f'Contact {i}', 'email': f'c{i}@batch{i}.com', 'is_primary': True}]}
+                for i in range(start, min(start + 500, rows))
+            ])
+
+    timed('inserts/s', results, single_inserts, rows)
+    timed('batched inserts/s', results, batch_inserts, rows)
+    ids = [row['id'] for row in db.get_user_prospects(1, limit=rows)]
+    timed('point reads/s', results, lambda: [db.get_prospect_by_id(rng.choice(ids)) for _ in range(rows)], rows)
+    timed('search/s', results, lambda: [db.search(1, f'Batch {rng.randrange(rows)}') for _ in range(500)], 500)
+
+    ops = [0]
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + 2.0
+
+    def worker(n: int):
+        done = 0
+        while time.perf_counter() < stop_at:
+            if n % 2:
+                db.get_user_prospects(1, limit=20)
+            else:
+                db.create_prospect(1, {'company_name': f'Mixed {n}-{done}'})
+            done += 1
+        with lock:
+            ops[0] += done
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    results['mixed ops/s'] = ops[0] / (time.perf_counter() - started)
+    db.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--threads', type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = {'file': os.path.join(tmp, 'bench.db'), 'memory': 'memory:'}
+        results = {name: run(database, args.rows, args.threads) for name, database in backends.items()}
+
+    print(f"{'':<20}" + ''.join(f'{name:>12}' for name in results))
+    for metric in results['file']:
+        print(f'{metric:<20}' + ''.join(f'{r[metric]:>12,.1f}' for r in results.values()))
+
+
+if __name__ == '__main__':
+    main()
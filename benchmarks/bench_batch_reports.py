@@ -0,0 +1,52 @@
+"""Batch report throughput at different concurrency limits.
+
+Seeds an in-memory database with prospects and runs
+``components.batch_reports.generate_reports`` against the local mock API
+(``benchmarks.mock_openai``) once per ``--concurrency`` value, bypassing
+the response cache. The shared rate limiter is opened wide, so only the
+batch's own limit applies. A final run repeats the batch to show cache hits.
+
+    python -m benchmarks.bench_batch_reports --prospects 500 --latency 0.5 --concurrency 1 8 32
+"""
+import argparse
+
+from benchmarks.mock_openai import MockOpenAI
+from components.batch_reports import run_batch
+from components.rate_limit import configure_rate_limiter
+from database.models import DatabaseManager
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--prospects', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.5, help='mock API seconds per request')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    args = parser.parse_args()
+
+    db = DatabaseManager('memory:', maintenance=False)
+    db.create_user('bench', 'x')
+    prospect_ids = db.create_prospects_with_contacts(1, [
+        {'company_name': f'Company {i}', 'industry': 'Technology', 'meeting_objective': 'Discovery call',
+         'context': 'Evaluating vendors this quarter.',
+         'contacts': [{'contact_name': f'Contact {i}', 'is_primary': True}]}
+        for i in range(args.prospects)
+    ])
+
+    # Budgets and concurrency wide open, so only the batch's own limit applies
+    configure_rate_limiter(rpm=10 ** 6, tpm=10 ** 9, max_concurrency=max(args.concurrency),
+                           initial_concurrency=max(args.concurrency))
+    print(f"{'concurrency':>11} {'seconds':>9} {'reports/min':>12} {'p50 s':>7} {'p95 s':>7} {'failed':>7}")
+    with MockOpenAI(latency=args.latency) as server:
+        runs = [(c, True) for c in args.concurrency] + [(max(args.concurrency), False)]
+        for concurrency, bypass in runs:
+            result = run_batch(db, 1, prospect_ids, api_key='sk-bench', base_url=server.base_url,
+                               concurrency=concurrency, force_regenerate=bypass)
+            label = str(concurrency) if bypass else 'cached'
+            print(f"{label:>11} {result.elapsed:>9.1f} {result.reports_per_minute:>12,.0f} "
+                  f"{result.latency_percentile(0.5):>7.2f} {result.latency_percentile(0.95):>7.2f} "
+                  f"{result.failed:>7}")
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
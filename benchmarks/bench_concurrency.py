@@ -0,0 +1,85 @@
+"""Read/write concurrency benchmark for DatabaseManager storage profiles.
+
+Half of the threads hammer ``create_prospect`` while the other half call
+``get_user_prospects``; each storage profile runs against a fresh database
+file for the same wall-clock budget.
+
+    python -m benchmarks.bench_concurrency --threads 8 --seconds 5
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from database.models import DatabaseManager
+
+
+def run_profile(profile: str, threads: int, seconds: float, seed_rows: int) -> dict:
+    """Run the mixed workload against one profile and collect counters"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'bench.db'), pool_size=threads, profile=profile)
+        for i in range(seed_rows):
+            db.create_prospect(1, {'company_name': f'Seed {i}', 'industry': 'Technology'})
+
+        counts = {'writes': 0, 'reads': 0, 'locked': 0, 'errors': 0}
+        lock = threading.Lock()
+        stop_at = time.perf_counter() + seconds
+
+        def writer(worker: int):
+            n = 0
+            while time.perf_counter() < stop_at:
+                try:
+                    db.create_prospect(1, {'company_name': f'Bench {worker}-{n}', 'context': 'x' * 200})
+                    key = 'writes'
+                except sqlite3.OperationalError as e:
+                    key = 'locked' if 'locked' in str(e) else 'errors'
+                n += 1
+                with lock:
+                    counts[key] += 1
+
+        def reader(_worker: int):
+            while time.perf_counter() < stop_at:
+                try:
+                    db.get_user_prospects(1)
+                    key = 'reads'
+                except sqlite3.OperationalError as e:
+                    key = 'locked' if 'locked' in str(e) else 'errors'
+                with lock:
+                    counts[key] += 1
+
+        workers = []
+        for i in range(threads):
+            target = writer if i % 2 == 0 else reader
+            workers.append(threading.Thread(target=target, args=(i,)))
+        started = time.perf_counter()
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        elapsed = time.perf_counter() - started
+        db.close()
+
+    counts['elapsed'] = elapsed
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--seed-rows', type=int, default=200)
+    parser.add_argument('--profiles', nargs='+', default=['legacy', 'wal'])
+    args = parser.parse_args()
+
+    print(f"{args.threads} threads, {args.seconds:.0f}s per profile, {args.seed_rows} seed rows")
+    print(f"{'profile':<10}{'writes/s':>12}{'reads/s':>12}{'locked':>10}{'errors':>10}")
+    for profile in args.profiles:
+        c = run_profile(profile, args.threads, args.seconds, args.seed_rows)
+        print(f"{profile:<10}{c['writes'] / c['elapsed']:>12.1f}{c['reads'] / c['elapsed']:>12.1f}"
+              f"{c['locked']:>10}{c['errors']:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Duplicate lookup latency against a large prospect table.
+
+Seeds one user with ``--rows`` synthetic companies whose names are built
+from a shared vocabulary (so trigrams repeat the way real names do), then
+times ``find_duplicate_prospects`` for four kinds of lookups:
+
+- exact: an existing name with different casing and legal suffix
+- domain: a new name with an existing website
+- typo: an existing name with one character changed
+- new: a name that is not in the table
+
+    python -m benchmarks.bench_dedupe --rows 500000 --lookups 500
+"""
+import argparse
+import os
+import random
+import statistics
+import string
+import tempfile
+import time
+
+from database.models import DatabaseManager
+
+SUFFIXES = ['Inc', 'LLC', 'Ltd', 'GmbH', 'Corp', '', '', '']
+
+
+def vocabulary(rng: random.Random, size: int = 20000):
+    """Pronounceable made-up words plus the generic words real company names reuse"""
+    onsets = ['b', 'c', 'd', 'f', 'g', 'h', 'k', 'l', 'm', 'n', 'p', 'r', 's', 't', 'v', 'w', 'z',
+              'br', 'cr', 'dr', 'fl', 'gr', 'pl', 'st', 'tr', 'sh', 'ch', 'th', 'qu', 'sp']
+    vowels = ['a', 'e', 'i', 'o', 'u', 'ai', 'ea', 'io', 'ou', 'y']
+    codas = ['', '', 'n', 'r', 's', 'x', 'l', 'm', 't', 'nd', 'rk', 'st', 'ck', 'ng']
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(onsets) + rng.choice(vowels) + rng.choice(codas)
+                          for _ in range(rng.randint(1, 3))))
+    generic = ['Systems', 'Solutions', 'Software', 'Labs', 'Partners', 'Consulting', 'Health', 'Logistics',
+               'Capital', 'Group', 'Industries', 'Technologies', 'Media', 'Energy', 'Foods', 'Analytics',
+               'Global', 'Digital', 'Services', 'Networks', 'Bank', 'Insurance', 'Motors', 'Pharma']
+    return sorted(words), generic
+
+
+def company(rng: random.Random, words, generic) -> str:
+    name = ' '.join(word.title() for word in rng.sample(words, rng.randint(1, 2)))
+    if rng.random() < 0.6:
+        name += ' ' + rng.choice(generic)
+    return f'{name} {rng.choice(SUFFIXES)}'.strip()
+
+
+def seed(db: DatabaseManager, rows: int, rng: random.Random):
+    words, generic = vocabulary(rng)
+    names = []
+    batch = []
+    for i in range(rows):
+        name = company(rng, words, generic)
+        names.append(name)
+        batch.append({'company_name': name, 'website': f'https://www.{name.split()[0].lower()}{i}.com'})
+        if len(batch) == 5000:
+            db.create_prospects_with_contacts(1, batch)
+            batch = []
+    if batch:
+        db.create_prospects_with_contacts(1, batch)
+    return names, words, generic
+
+
+def typo(rng: random.Random, name: str) -> str:
+    i = rng.randrange(len(name))
+    return name[:i] + rng.choice(string.ascii_lowercase) + name[i + 1:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=500000)
+    parser.add_argument('--lookups', type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'bench.db'), maintenance=False)
+        started = time.perf_counter()
+        names, words, generic = seed(db, args.rows, rng)
+        print(f"seeded {args.rows:,} prospects in {time.perf_counter() - started:.1f}s")
+
+        cases = {
+            'exact': lambda: (rng.choice(names).upper() + ' Inc', None),
+            'domain': lambda: ('Unrelated Name', f'http://{names[0].split()[0].lower()}0.com/about'),
+            'typo': lambda: (typo(rng, rng.choice(names)), None),
+            'new': lambda: (company(rng, words, generic) + ' Worldwide', None),
+        }
+        print(f"{'lookup':<8}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}{'found':>8}")
+        for label, make in cases.items():
+            timings, found = [], 0
+            for _ in range(args.lookups):
+                name, website = make()
+                started = time.perf_counter()
+                matches = db.find_duplicate_prospects(1, name, website)
+                timings.append((time.perf_counter() - started) * 1000)
+                found += bool(matches)
+            timings.sort()
+            print(f"{label:<8}{statistics.median(timings):>9.2f}{timings[int(len(timings) * 0.95)]:>9.2f}"
+                  f"{timings[-1]:>9.2f}{found / args.lookups:>8.0%}")
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
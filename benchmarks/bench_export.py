@@ -0,0 +1,65 @@
+"""Export throughput and memory at growing row counts.
+
+Seeds one user with prospects and generated scripts, then exports both
+datasets in every available format. Reports rows per second and, from a
+second run, the peak Python heap (tracemalloc). With streaming, the peak
+should stay flat as the row count grows.
+
+    python -m benchmarks.bench_export --rows 10000 100000
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from database.export import available_formats, export
+from database.models import DatabaseManager
+
+
+def seed(db: DatabaseManager, rows: int):
+    with db.connection() as conn:
+        conn.executemany(
+            'INSERT INTO prospects (user_id, company_name, industry, context) VALUES (1, ?, ?, ?)',
+            ((f'Company {i}', 'Technology', 'Context ' * 20) for i in range(rows))
+        )
+    prospect_ids = [row['id'] for page in db.iter_user_prospects(1, chunk_size=5000) for row in page]
+    for start in range(0, len(prospect_ids), 1000):
+        with db.connection():
+            for prospect_id in prospect_ids[start:start + 1000]:
+                db.create_generated_script(prospect_id, 1, {
+                    'script_type': 'email', 'content': f'Dear Company {prospect_id}, ' + 'pitch text ' * 100
+                })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'dataset':<10}{'format':<9}{'seconds':>9}{'rows/s':>10}{'file MB':>9}{'peak heap MB':>14}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = DatabaseManager(os.path.join(tmp, 'bench.db'), maintenance=False)
+            seed(db, rows)
+            for dataset in ('prospects', 'scripts'):
+                for fmt in available_formats():
+                    path = os.path.join(tmp, f'{dataset}.{fmt}')
+                    started = time.perf_counter()
+                    with open(path, 'wb') as out:
+                        exported = export(db, dataset, fmt, out, user_id=1, chunk_size=args.chunk_size)
+                    elapsed = time.perf_counter() - started
+                    # tracemalloc slows allocation-heavy writers a lot, so measure memory in a second run
+                    tracemalloc.start()
+                    with open(path, 'wb') as out:
+                        export(db, dataset, fmt, out, user_id=1, chunk_size=args.chunk_size)
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    print(f"{exported:>8} {dataset:<10}{fmt:<9}{elapsed:>9.2f}{exported / elapsed:>10,.0f}"
+                          f"{os.path.getsize(path) / 1e6:>9.1f}{peak / 1e6:>14.1f}")
+            db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""Check cache coherence across processes sharing one database file.
+
+Several reader processes hammer ``get_prospect_by_id`` and
+``get_prospect_contacts`` through their own cached ``DatabaseManager``
+while this process updates prospects and adds contacts. Each reader
+records when it first sees every new version. The script reports
+invalidation latency. It exits non-zero if a reader ever saw a version go
+backwards or never caught up with the final state.
+
+    python -m benchmarks.bench_invalidation --readers 4 --writes 200
+"""
+import argparse
+import multiprocessing as mp
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from database.models import DatabaseManager
+
+SETTLE_SECONDS = 2.0
+
+
+def reader(db_path: str, prospect_ids, poll_interval: float, stop, results):
+    """Read every prospect in a loop, reporting the first time each new version shows up"""
+    db = DatabaseManager(db_path, invalidation_poll_interval=poll_interval)
+    seen = {}
+    observations, regressions = [], []
+
+    def observe(key, version):
+        previous = seen.get(key, -1)
+        if version < previous:
+            regressions.append((key, previous, version))
+        elif version > previous:
+            seen[key] = version
+            observations.append((key, version, time.time()))
+
+    while not stop.is_set():
+        for prospect_id in prospect_ids:
+            name = db.get_prospect_by_id(prospect_id)['company_name']
+            observe(('prospect', prospect_id), int(name.rsplit(' v', 1)[1]))
+            observe(('contacts', prospect_id), len(db.get_prospect_contacts(prospect_id)))
+        time.sleep(0.001)
+
+    results.put({'pid': os.getpid(), 'observations': observations, 'regressions': regressions,
+                 'final': seen, 'cache': db.get_cache_stats()})
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--prospects', type=int, default=20)
+    parser.add_argument('--writes', type=int, default=200)
+    parser.add_argument('--interval', type=float, default=0.02, help='seconds between writes')
+    parser.add_argument('--poll-interval', type=float, default=0.25)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        db = DatabaseManager(db_path)
+        db.create_user('bench', 'x')
+        prospect_ids = [db.create_prospect(1, {'company_name': f'Company {i} v0'}) for i in range(args.prospects)]
+
+        ctx = mp.get_context('spawn')
+        stop, results = ctx.Event(), ctx.Queue()
+        readers = [ctx.Process(target=reader, args=(db_path, prospect_ids, args.poll_interval, stop, results))
+                   for _ in range(args.readers)]
+        for process in readers:
+            process.start()
+        time.sleep(3.0)  # let the readers import and warm their caches
+
+        versions = {('prospect', pid): 0 for pid in prospect_ids}
+        versions.update({('contacts', pid): 0 for pid in prospect_ids})
+        committed = {}
+        for _ in range(args.writes):
+            prospect_id = rng.choice(prospect_ids)
+            if rng.random() < 0.5:
+                key = ('prospect', prospect_id)
+                versions[key] += 1
+                db.update_prospect(prospect_id, {'company_name': f'Company {prospect_id} v{versions[key]}'})
+            else:
+                key = ('contacts', prospect_id)
+                versions[key] += 1
+                db.create_contact(prospect_id, {'contact_name': f'Contact {versions[key]}'})
+            committed[(key, versions[key])] = time.time()
+            time.sleep(args.interval)
+
+        time.sleep(SETTLE_SECONDS)
+        stop.set()
+        reports = [results.get() for _ in readers]
+        for process in readers:
+            process.join()
+        db.close()
+
+    failures = 0
+    latencies = []
+    for report in reports:
+        first_seen = {(key, version): at for key, version, at in report['observations']}
+        for (key, version), written_at in committed.items():
+            if (key, version) in first_seen:
+                latencies.append(first_seen[(key, version)] - written_at)
+        stale = {key: report['final'].get(key) for key, version in versions.items()
+                 if report['final'].get(key) != version}
+        if stale or report['regressions']:
+            failures += 1
+            print(f"reader {report['pid']}: {len(stale)} stale keys, {len(report['regressions'])} regressions")
+        cache = report['cache']
+        print(f"reader {report['pid']}: hit rate {cache['hit_rate']:.1%}, "
+              f"{cache['invalidation']['checks']} change-log reads in {cache['invalidation']['polls']} polls")
+
+    # Versions overwritten before a reader polled are never observed, so count what was seen
+    latencies.sort()
+    if latencies:
+        print(f"\n{len(latencies)} versions observed, invalidation latency "
+              f"p50 {statistics.median(latencies) * 1e3:.0f} ms, "
+              f"p95 {latencies[int(len(latencies) * 0.95)] * 1e3:.0f} ms, "
+              f"max {latencies[-1] * 1e3:.0f} ms (poll interval {args.poll_interval * 1e3:.0f} ms)")
+    print(f"{'FAIL' if failures else 'OK'}: {len(reports) - failures}/{len(reports)} readers coherent")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Report call latency: a new OpenAI client per call versus the shared client.
+
+Sends chat completions to a local mock API (``benchmarks.mock_openai``)
+over HTTPS with a fixed server delay, so the difference between the modes
+is client overhead: building the client, and the TCP and TLS handshakes of
+a fresh connection pool.
+
+- ``per-call``: what the report page used to do, a new ``openai.OpenAI``
+  for every call (and every Streamlit rerun)
+- ``shared``: ``components.openai_client.get_openai_client``, which
+  returns one client whose pooled connections stay open between calls
+
+Each mode runs ``--calls`` sequential calls, then the same number from
+``--threads`` threads, and reports p50/p95 latency and the number of
+connections the server accepted.
+
+    python -m benchmarks.bench_openai_client --calls 200 --latency 0.02
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import openai
+
+from benchmarks.mock_openai import MockOpenAI
+from components.openai_client import client_stats, close_openai_clients, get_openai_client
+
+MESSAGES = [{'role': 'user', 'content': 'Prepare a meeting report for Acme Corp. ' * 20}]
+
+
+def per_call_client(server: MockOpenAI) -> openai.OpenAI:
+    return openai.OpenAI(api_key='sk-bench', base_url=server.base_url,
+                         http_client=openai.DefaultHttpxClient(verify=server.cert_path))
+
+
+def shared_client(server: MockOpenAI) -> openai.OpenAI:
+    return get_openai_client('sk-bench', base_url=server.base_url, verify=server.cert_path)
+
+
+def timed_call(make_client, server: MockOpenAI) -> float:
+    started = time.perf_counter()
+    client = make_client(server)
+    client.chat.completions.create(model='gpt-4o-mini', messages=MESSAGES, max_tokens=1500)
+    elapsed = time.perf_counter() - started
+    if make_client is per_call_client:
+        client.close()
+    return elapsed * 1000
+
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run(make_client, calls: int, threads: int, latency: float) -> dict:
+    with MockOpenAI(latency=latency, tls=True) as server:
+        timed_call(make_client, server)  # warm imports and the first handshake
+        before = server.stats['connections']
+        sequential = [timed_call(make_client, server) for _ in range(calls)]
+        sequential_connections = server.stats['connections'] - before
+
+        before = server.stats['connections']
+        started = time.perf_counter()
+        with ThreadPoolExecutor(threads) as pool:
+            concurrent = list(pool.map(lambda _: timed_call(make_client, server), range(calls)))
+        wall = time.perf_counter() - started
+        concurrent_connections = server.stats['connections'] - before
+    close_openai_clients()
+    return {
+        'sequential p50 ms': statistics.median(sequential),
+        'sequential p95 ms': percentile(sequential, 0.95),
+        'sequential conns': sequential_connections,
+        'threaded p50 ms': statistics.median(concurrent),
+        'threaded p95 ms': percentile(concurrent, 0.95),
+        'threaded calls/s': calls / wall,
+        'threaded conns': concurrent_connections,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.02, help='mock server delay per call, seconds')
+    args = parser.parse_args()
+
+    results = {
+        'per-call': run(per_call_client, args.calls, args.threads, args.latency),
+        'shared': run(shared_client, args.calls, args.threads, args.latency),
+    }
+    print(f"{'':<20}" + ''.join(f'{name:>12}' for name in results))
+    for metric in results['per-call']:
+        print(f'{metric:<20}' + ''.join(f'{r[metric]:>12,.1f}' for r in results.values()))
+    print(f"server delay {args.latency * 1000:.0f} ms per call; shared registry {client_stats()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""Report requests against a rate-limited API, with and without the shared limiter.
+
+The local mock API (``benchmarks.mock_openai``) answers 429 with a
+Retry-After whenever more than ``--server-limit`` requests are in
+progress. ``--threads`` threads (like reps on the report page) and
+``--tasks`` asyncio tasks (like a batch job) send ``--requests`` report
+requests each, all at once:
+
+- ``client retries``: what happened before, each client retrying 429s
+  on its own (the SDK default of two retries)
+- ``shared limiter``: every request goes through one
+  ``components.rate_limit.RateLimiter``. It backs concurrency off on
+  429s, honours Retry-After and retries with the clients' retries off
+
+    python -m benchmarks.bench_rate_limit --threads 8 --tasks 24 --requests 10 --server-limit 8
+"""
+import argparse
+import asyncio
+import threading
+import time
+
+import openai
+
+from benchmarks.mock_openai import MockOpenAI
+from components.ai_report import REPORT_MODEL, REPORT_PARAMS, create_ai_report_prompt, report_messages
+from components.openai_client import ClientConfig, build_async_client, build_client
+from components.rate_limit import RateLimiter, estimate_tokens
+
+MESSAGES = report_messages(create_ai_report_prompt({'company_name': 'Acme Corp'}))
+TOKENS = estimate_tokens(MESSAGES, REPORT_PARAMS['max_tokens'])
+
+
+def run(server: MockOpenAI, threads: int, tasks: int, requests: int, limiter=None) -> dict:
+    retries = 0 if limiter else 2
+    config = ClientConfig(api_key='sk-bench', base_url=server.base_url, max_retries=retries,
+                          max_connections=threads + tasks)
+    client = build_client(config)
+    outcome = {'ok': 0, 'failed': 0}
+    lock = threading.Lock()
+
+    def count(ok: bool):
+        with lock:
+            outcome['ok' if ok else 'failed'] += 1
+
+    def send():
+        return client.chat.completions.create(model=REPORT_MODEL, messages=MESSAGES, **REPORT_PARAMS)
+
+    def rep():
+        for _ in range(requests):
+            try:
+                limiter.call(send, TOKENS) if limiter else send()
+                count(True)
+            except openai.RateLimitError:
+                count(False)
+
+    async def batch():
+        async_client = build_async_client(config)
+
+        async def send_async():
+            return await async_client.chat.completions.create(model=REPORT_MODEL, messages=MESSAGES, **REPORT_PARAMS)
+
+        async def task():
+            for _ in range(requests):
+                try:
+                    await (limiter.call_async(send_async, TOKENS) if limiter else send_async())
+                    count(True)
+                except openai.RateLimitError:
+                    count(False)
+
+        await asyncio.gather(*(task() for _ in range(tasks)))
+        await async_client.close()
+
+    before = server.stats
+    started = time.perf_counter()
+    workers = [threading.Thread(target=rep) for _ in range(threads)]
+    workers.append(threading.Thread(target=asyncio.run, args=(batch(),)))
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    client.close()
+    return {
+        'succeeded': outcome['ok'],
+        'failed': outcome['failed'],
+        '429s served': server.stats['rate_limited'] - before['rate_limited'],
+        'seconds': elapsed,
+        'requests/s': outcome['ok'] / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--tasks', type=int, default=24)
+    parser.add_argument('--requests', type=int, default=10, help='per thread and per task')
+    parser.add_argument('--server-limit', type=int, default=8, help='requests the mock serves at once')
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--retry-after', type=float, default=0.5)
+    args = parser.parse_args()
+
+    # Request and token budgets out of the way: this measures the 429 handling
+    limiter = RateLimiter(rpm=100000, tpm=100000000, max_concurrency=args.threads + args.tasks)
+    with MockOpenAI(latency=args.latency, max_concurrent=args.server_limit, retry_after=args.retry_after) as server:
+        results = {
+            'client retries': run(server, args.threads, args.tasks, args.requests),
+            'shared limiter': run(server, args.threads, args.tasks, args.requests, limiter),
+        }
+
+    print(f"{(args.threads + args.tasks) * args.requests} requests from {args.threads} threads and "
+          f"{args.tasks} asyncio tasks; the server takes {args.server_limit} at a time")
+    print(f"{'':<16}" + ''.join(f'{name:>16}' for name in results))
+    for metric in results['client retries']:
+        print(f'{metric:<16}' + ''.join(f'{r[metric]:>16,.1f}' for r in results.values()))
+    print(f"limiter: {limiter.stats()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Compare the RowSet read path against pandas.read_sql_query.
+
+For each result size the same prospects query is read three ways: the old
+DataFrame path, the RowSet returned by ``get_user_prospects``, and a RowSet
+converted to a DataFrame afterwards.
+
+    python -m benchmarks.bench_rows --sizes 10 1000 100000
+"""
+import argparse
+import os
+import tempfile
+import timeit
+
+import pandas as pd
+
+from database.models import DatabaseManager
+
+PROSPECTS_SQL = 'SELECT * FROM prospects WHERE user_id = ? ORDER BY created_at DESC'
+
+
+def seed(db: DatabaseManager, user_id: int, rows: int):
+    """Insert rows prospects for one user in a single transaction"""
+    with db.connection() as conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO users (id, username, password_hash) VALUES (?, ?, 'x')",
+            (user_id, f'bench{user_id}')
+        )
+        conn.executemany(
+            'INSERT INTO prospects (user_id, company_name, industry, context) VALUES (?, ?, ?, ?)',
+            ((user_id, f'Company {i}', 'Technology', 'Context ' * 10) for i in range(rows))
+        )
+
+
+def time_per_call(func, repeats: int = 5) -> float:
+    """Best seconds per call over several autoranged runs"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeats, number=number)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>8}{'read_sql_query':>18}{'RowSet':>14}{'RowSet+frame':>16}{'speedup':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'bench.db'))
+        for user_id, size in enumerate(args.sizes, start=1):
+            seed(db, user_id, size)
+
+            def pandas_path():
+                conn = db.get_connection()
+                pd.read_sql_query(PROSPECTS_SQL, conn, params=[user_id])
+                conn.close()
+
+            def rowset_path():
+                db.get_user_prospects(user_id)
+
+            def rowset_frame_path():
+                db.get_user_prospects(user_id).to_frame()
+
+            t_pandas = time_per_call(pandas_path)
+            t_rows = time_per_call(rowset_path)
+            t_frame = time_per_call(rowset_frame_path)
+            print(f"{size:>8}{t_pandas * 1e3:>16.3f}ms{t_rows * 1e3:>12.3f}ms"
+                  f"{t_frame * 1e3:>14.3f}ms{t_pandas / t_rows:>9.1f}x")
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Measure full-text search latency against a large number of generated scripts.
+
+Seeds prospects and generated scripts for several users with text drawn
+from a Zipf-distributed vocabulary (so, as in real prose, a few words are
+in almost every report and most are rare), then times
+``DatabaseManager.search`` for common terms, rarer terms, multi-word
+queries and prefixes.
+
+    python -m benchmarks.bench_search --scripts 300000 --users 20
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import timeit
+
+from database.models import DatabaseManager
+from database.search import optimize_search_indexes
+
+WORDS = (
+    'pipeline revenue quarter budget renewal churn onboarding integration security compliance '
+    'analytics dashboard forecast migration latency throughput procurement pilot expansion '
+    'stakeholder champion objection pricing discount contract roadmap adoption retention '
+    'cloud platform workflow automation reporting visibility headcount hiring logistics'
+).split()
+
+QUERIES = ('w3', 'pipeline', 'renewal security', 'forecast latency procurement', 'integ', 'zyzzyva')
+
+VOCABULARY_SIZE = 5000
+# Rank of the first domain word; ranks around 200 land in roughly one report in ten
+DOMAIN_RANK = 200
+
+
+def vocabulary():
+    """Synthetic words w0..wN with the domain words spliced in at moderate frequency"""
+    words = [f'w{i}' for i in range(VOCABULARY_SIZE)]
+    words[DOMAIN_RANK:DOMAIN_RANK + len(WORDS)] = WORDS
+    weights = [1.0 / (rank + 1) for rank in range(len(words))]
+    return words, weights
+
+
+def seed(db: DatabaseManager, users: int, scripts: int, rng: random.Random):
+    """Insert one prospect per user and spread the scripts across them"""
+    with db.connection() as conn:
+        conn.executemany(
+            'INSERT INTO users (username, password_hash) VALUES (?, ?)',
+            ((f'user{u}', 'x') for u in range(users))
+        )
+        user_ids = [row[0] for row in conn.execute('SELECT id FROM users')]
+        words, weights = vocabulary()
+        prospect_ids = []
+        for user_id in user_ids:
+            cursor = conn.execute(
+                'INSERT INTO prospects (user_id, company_name, context) VALUES (?, ?, ?)',
+                (user_id, f'Company {user_id}', ' '.join(rng.choices(words, weights, k=30)))
+            )
+            prospect_ids.append((user_id, cursor.lastrowid))
+
+        def rows():
+            for i in range(scripts):
+                user_id, prospect_id = prospect_ids[i % len(prospect_ids)]
+                yield (prospect_id, user_id, 'cold_call', ' '.join(rng.choices(words, weights, k=200)))
+
+        conn.executemany(
+            'INSERT INTO generated_scripts (prospect_id, user_id, script_type, content) VALUES (?, ?, ?, ?)',
+            rows()
+        )
+        optimize_search_indexes(conn)
+    return user_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scripts', type=int, default=300000)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'bench.db'))
+        start = time.perf_counter()
+        user_ids = seed(db, args.users, args.scripts, rng)
+        print(f"Seeded {args.scripts} scripts for {args.users} users in {time.perf_counter() - start:.1f}s\n")
+
+        user_id = user_ids[0]
+        print(f"{'query':<32}{'results':>8}{'median':>12}")
+        for query in QUERIES:
+            results = db.search(user_id, query, args.limit)
+            times = timeit.repeat(lambda: db.search(user_id, query, args.limit), repeat=7, number=1)
+            times.sort()
+            print(f"{query:<32}{len(results):>8}{times[len(times) // 2] * 1e3:>10.2f}ms")
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
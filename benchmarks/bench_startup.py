@@ -0,0 +1,92 @@
+"""Cold start: import time of app.py and time to render the login page.
+
+Every trial starts a fresh interpreter, so nothing is already imported:
+
+- ``python -X importtime -c "import streamlit; import app"`` gives the
+  cumulative import time of ``app`` alone (streamlit is already loaded
+  by then, so its own cost is reported separately)
+- Streamlit's ``AppTest`` runs ``app.py`` once, which renders the login
+  page for a new session, and reports which heavy packages are loaded
+  once the page is on screen
+
+Streamlit itself imports pandas, numpy, PIL and pyarrow, so those are
+listed separately from what the app's own imports add.
+
+    python -m benchmarks.bench_startup --trials 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = ['openai', 'httpx', 'reportlab', 'pandas', 'numpy', 'PIL', 'pyarrow', 'openpyxl', 'database.models']
+
+RENDER_LOGIN = '''
+import json, sys, time
+started = time.perf_counter()
+import streamlit
+streamlit_loaded = set(sys.modules)
+imported = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file("app.py", default_timeout=60)
+rendering = time.perf_counter()
+app.run()
+done = time.perf_counter()
+print(json.dumps({
+    "streamlit_ms": (imported - started) * 1000,
+    "login_ms": (done - rendering) * 1000,
+    "login_inputs": len(app.text_input),
+    "by_streamlit": [m for m in HEAVY if m in streamlit_loaded],
+    "by_app": [m for m in HEAVY if m in sys.modules and m not in streamlit_loaded],
+}))
+'''
+
+
+def app_import_ms() -> float:
+    """Cumulative import time of the app module, in milliseconds"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import streamlit; import app'],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    for line in result.stderr.splitlines():
+        parts = line.split('|')
+        # Nested imports are indented further; the top-level entry is ' app'
+        if len(parts) == 3 and parts[2].rstrip() == ' app':
+            return int(parts[1]) / 1000
+    raise RuntimeError('app did not appear in the -X importtime output')
+
+
+def render_login() -> dict:
+    result = subprocess.run(
+        [sys.executable, '-c', f'HEAVY = {HEAVY!r}\n' + RENDER_LOGIN],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--trials', type=int, default=5)
+    args = parser.parse_args()
+
+    imports, logins, streamlit_ms = [], [], []
+    for _ in range(args.trials):
+        imports.append(app_import_ms())
+        run = render_login()
+        logins.append(run['login_ms'])
+        streamlit_ms.append(run['streamlit_ms'])
+
+    print(f"import streamlit   median {statistics.median(streamlit_ms):8.1f} ms")
+    print(f"import app         median {statistics.median(imports):8.1f} ms  (after streamlit)")
+    print(f"login page render  median {statistics.median(logins):8.1f} ms  "
+          f"({run['login_inputs']} text inputs on the page)")
+    print(f"loaded by streamlit: {', '.join(run['by_streamlit']) or 'none'}")
+    print(f"loaded by the app:   {', '.join(run['by_app']) or 'none'}")
+
+
+if __name__ == '__main__':
+    main()
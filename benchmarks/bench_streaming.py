@@ -0,0 +1,56 @@
+"""How long a rep waits to see a report: blocking versus streamed generation.
+
+Generates reports against the local mock API (``benchmarks.mock_openai``).
+The mock waits ``--latency`` seconds before the first token, then
+``--token-delay`` per chunk, so a report of about 240 chunks takes as long
+as a short real generation. ``generate_ai_report`` shows nothing until the
+whole completion is back. ``generate_ai_report_stream`` hands over text
+from the first token on. Both go through the same shared client with the
+response cache bypassed.
+
+    python -m benchmarks.bench_streaming --trials 5 --latency 0.5 --token-delay 0.01
+"""
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault('NBP_DATABASE_URL', 'memory:')
+
+from benchmarks.mock_openai import MockOpenAI
+from components.ai_report import create_ai_report_prompt, generate_ai_report, generate_ai_report_stream
+from components.openai_client import get_openai_client
+
+PROSPECT = {'company_name': 'Acme Corp', 'industry': 'Manufacturing', 'meeting_objective': 'Discovery call',
+            'primary_contact': 'Jane Doe', 'context': 'Expanding into two new regions this year.'}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--trials', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.5, help='mock delay before the first token, seconds')
+    parser.add_argument('--token-delay', type=float, default=0.01, help='mock delay per chunk, seconds')
+    args = parser.parse_args()
+
+    prompt = create_ai_report_prompt(PROSPECT)
+    blocking, first_token, streamed_total = [], [], []
+    with MockOpenAI(latency=args.latency, token_delay=args.token_delay) as server:
+        client = get_openai_client('sk-bench', base_url=server.base_url)
+        for _ in range(args.trials):
+            started = time.perf_counter()
+            result = generate_ai_report(client, prompt, force_regenerate=True)
+            assert result['success'], result
+            blocking.append((time.perf_counter() - started) * 1000)
+
+            result = generate_ai_report_stream(client, prompt, lambda text: None, force_regenerate=True)
+            assert result['success'], result
+            first_token.append(result['time_to_first_token_ms'])
+            streamed_total.append(result['total_time_ms'])
+
+    print(f"blocking: first text after  median {statistics.median(blocking):8.1f} ms")
+    print(f"streamed: first text after  median {statistics.median(first_token):8.1f} ms")
+    print(f"streamed: complete after    median {statistics.median(streamed_total):8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
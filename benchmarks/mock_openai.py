@@ -0,0 +1,272 @@
+"""A local stand-in for the OpenAI chat completions API.
+
+Serves ``POST /v1/chat/completions`` over HTTP/1.1 with keep-alive, so
+benchmarks can measure the client side (connection setup, pooling,
+retries) without network noise or API costs. Each response waits
+``latency`` seconds before its first token, then ``token_delay`` seconds
+per streamed chunk (roughly four characters each). Without ``stream`` the
+whole wait happens before the response is sent. ``stream=True`` requests
+get server-sent events like the real API. ``tls=True`` serves HTTPS
+with a throwaway self-signed certificate (made with the ``openssl``
+command). Pass ``server.cert_path`` as the client's ``verify``.
+
+``max_concurrent`` makes the server answer 429 with a ``Retry-After`` of
+``retry_after`` seconds (also sent as ``retry-after-ms``) whenever more
+requests than that are in progress, like an exhausted API quota.
+
+``server.stats`` counts requests, the TCP connections they arrived on
+and the 429s sent.
+
+    with MockOpenAI(latency=0.05, tls=True) as server:
+        client = get_openai_client('sk-test', base_url=server.base_url, verify=server.cert_path)
+
+Run on its own to point the app at it:
+
+    python -m benchmarks.mock_openai --port 8765 --latency 0.5
+"""
+import argparse
+import json
+import os
+import shutil
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+REPORT = ('**Executive Summary**\nA short mock report. ' + 'Talking point. ' * 60).strip()
+
+
+def make_certificate(directory: str) -> tuple:
+    """A self-signed localhost certificate and key, returned as file paths"""
+    openssl = shutil.which('openssl')
+    if openssl is None:
+        raise RuntimeError('tls=True needs the openssl command on PATH')
+    cert, key = os.path.join(directory, 'cert.pem'), os.path.join(directory, 'key.pem')
+    subprocess.run(
+        [openssl, 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+         '-keyout', key, '-out', cert, '-subj', '/CN=localhost',
+         '-addext', 'subjectAltName=DNS:localhost,IP:127.0.0.1'],
+        check=True, capture_output=True
+    )
+    return cert, key
+
+
+def chunks(text: str, size: int = 4) -> List[str]:
+    """Split a reply into token-sized pieces"""
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def usage(prompt_tokens: int, content: str) -> Dict[str, int]:
+    completion_tokens = max(1, len(content) // 4)
+    return {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens}
+
+
+def completion(model: str, content: str, prompt_tokens: int) -> Dict[str, Any]:
+    return {
+        'id': f'chatcmpl-mock-{time.time_ns()}',
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': model,
+        'choices': [{'index': 0, 'finish_reason': 'stop',
+                     'message': {'role': 'assistant', 'content': content}}],
+        'usage': usage(prompt_tokens, content),
+    }
+
+
+def completion_chunk(model: str, created: int, delta: Dict[str, Any], finish_reason: Optional[str] = None,
+                     usage: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    return {
+        'id': f'chatcmpl-mock-{created}',
+        'object': 'chat.completion.chunk',
+        'created': created,
+        'model': model,
+        'choices': [] if usage else [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}],
+        'usage': usage,
+    }
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are separate writes; with Nagle on, a kept-alive
+    # connection waits out the client's delayed ACK between them
+    disable_nagle_algorithm = True
+    server: 'MockServer'
+
+    def setup(self):
+        super().setup()
+        self.server.record('connections')
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        self.server.record('requests')
+        if self.path.rstrip('/') != '/v1/chat/completions':
+            self.send_json(404, {'error': {'message': f'No route {self.path}', 'type': 'invalid_request_error'}})
+            return
+        if not self.server.enter():
+            self.server.record('rate_limited')
+            delay = self.server.retry_after
+            self.send_json(429, {'error': {'message': 'Rate limit reached', 'type': 'requests',
+                                           'code': 'rate_limit_exceeded'}},
+                           {'Retry-After': f'{delay:g}', 'retry-after-ms': f'{delay * 1000:.0f}'})
+            return
+        try:
+            self.chat_completion(body)
+        finally:
+            self.server.leave()
+
+    def chat_completion(self, body: Dict[str, Any]):
+        messages: List[Dict[str, Any]] = body.get('messages', [])
+        prompt_tokens = sum(len(str(m.get('content', ''))) for m in messages) // 4
+        model = body.get('model', 'gpt-4o-mini')
+        reply = self.server.reply
+        if body.get('stream'):
+            self.stream_completion(model, reply, prompt_tokens,
+                                   bool((body.get('stream_options') or {}).get('include_usage')))
+            return
+        time.sleep(self.server.latency + self.server.token_delay * len(chunks(reply)))
+        self.send_json(200, completion(model, reply, prompt_tokens))
+
+    def send_event(self, data: str):
+        payload = f'data: {data}\n\n'.encode()
+        self.wfile.write(f'{len(payload):x}\r\n'.encode() + payload + b'\r\n')
+
+    def stream_completion(self, model: str, reply: str, prompt_tokens: int, include_usage: bool):
+        """Server-sent events in chunked transfer encoding, so the connection stays reusable"""
+        created = int(time.time())
+        time.sleep(self.server.latency)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        self.send_event(json.dumps(completion_chunk(model, created, {'role': 'assistant', 'content': ''})))
+        for piece in chunks(reply):
+            self.send_event(json.dumps(completion_chunk(model, created, {'content': piece})))
+            if self.server.token_delay:
+                time.sleep(self.server.token_delay)
+        self.send_event(json.dumps(completion_chunk(model, created, {}, finish_reason='stop')))
+        if include_usage:
+            self.send_event(json.dumps(completion_chunk(model, created, {}, usage=usage(prompt_tokens, reply))))
+        self.send_event('[DONE]')
+        self.wfile.write(b'0\r\n\r\n')
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Batch clients open dozens of connections at once; the default backlog of 5 drops SYNs
+    request_queue_size = 128
+
+    def __init__(self, address, handler, latency: float, reply: str, token_delay: float = 0.0,
+                 max_concurrent: Optional[int] = None, retry_after: float = 0.5):
+        super().__init__(address, handler)
+        self.latency = latency
+        self.token_delay = token_delay
+        self.reply = reply
+        self.max_concurrent = max_concurrent
+        self.retry_after = retry_after
+        self.in_progress = 0
+        self.stats = {'connections': 0, 'requests': 0, 'rate_limited': 0, 'peak_concurrent': 0}
+        self._stats_lock = threading.Lock()
+
+    def enter(self) -> bool:
+        """Start a request, or refuse it (False) when max_concurrent are already running"""
+        with self._stats_lock:
+            if self.max_concurrent is not None and self.in_progress >= self.max_concurrent:
+                return False
+            self.in_progress += 1
+            self.stats['peak_concurrent'] = max(self.stats['peak_concurrent'], self.in_progress)
+            return True
+
+    def leave(self):
+        with self._stats_lock:
+            self.in_progress -= 1
+
+    def record(self, counter: str, amount: int = 1):
+        with self._stats_lock:
+            self.stats[counter] = self.stats.get(counter, 0) + amount
+
+
+class MockOpenAI:
+    """Runs a MockServer on a background thread for the duration of a with block"""
+
+    def __init__(self, latency: float = 0.05, tls: bool = False, port: int = 0,
+                 reply: str = REPORT, handler: type = MockHandler, token_delay: float = 0.0,
+                 max_concurrent: Optional[int] = None, retry_after: float = 0.5):
+        self.server = MockServer(('127.0.0.1', port), handler, latency, reply, token_delay,
+                                 max_concurrent, retry_after)
+        self.tls = tls
+        self.cert_path: Optional[str] = None
+        self._tmp: Optional[tempfile.TemporaryDirectory] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        scheme = 'https' if self.tls else 'http'
+        return f'{scheme}://localhost:{self.server.server_address[1]}/v1'
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return dict(self.server.stats)
+
+    def start(self) -> 'MockOpenAI':
+        if self.tls:
+            self._tmp = tempfile.TemporaryDirectory()
+            self.cert_path, key = make_certificate(self._tmp.name)
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(self.cert_path, key)
+            self.server.socket = context.wrap_socket(self.server.socket, server_side=True)
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self._tmp is not None:
+            self._tmp.cleanup()
+
+    def __enter__(self) -> 'MockOpenAI':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.5, help='seconds before the first token')
+    parser.add_argument('--token-delay', type=float, default=0.01, help='seconds per streamed chunk')
+    parser.add_argument('--max-concurrent', type=int, help='answer 429 beyond this many requests in progress')
+    parser.add_argument('--retry-after', type=float, default=0.5, help='Retry-After of those 429s, seconds')
+    parser.add_argument('--tls', action='store_true')
+    args = parser.parse_args()
+
+    with MockOpenAI(latency=args.latency, tls=args.tls, port=args.port, token_delay=args.token_delay,
+                    max_concurrent=args.max_concurrent, retry_after=args.retry_after) as server:
+        print(f'Serving on {server.base_url}; set OPENAI_BASE_URL to it. Ctrl+C to stop.')
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
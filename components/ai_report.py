@@ -4,12 +4,16 @@ import json
 import subprocess
 import sys
 import os
+import sqlite3
+import time
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, List, Optional
 from database.models import db
+from database.response_cache import cache_key
 from auth import get_current_user
+from components.openai_client import get_openai_client
+from components.rate_limit import estimate_tokens, get_rate_limiter, quota_exhausted
 from dotenv import load_dotenv
-from components.pdf_generator import download_pdf_report, test_pdf_generation
 
 # Load environment variables
 load_dotenv()
@@ -18,62 +22,7 @@ def initialize_openai_client(api_key: str) -> Optional[openai.OpenAI]:
     """Initialize OpenAI client with API key"""
     if not api_key:
         return None
-    
-    # Method 1: Try with environment variable cleanup and monkey patching
-    try:
-        import os
-        import openai._client
-        
-        # Temporarily unset any proxy-related environment variables
-        original_proxy_vars = {}
-        proxy_vars = ['HTTP_PROXY', 'HTTPS_PROXY', 'http_proxy', 'https_proxy', 'ALL_PROXY', 'all_proxy']
-        
-        for var in proxy_vars:
-            if var in os.environ:
-                original_proxy_vars[var] = os.environ[var]
-                del os.environ[var]
-        
-        # Monkey patch the OpenAI client to ignore proxies argument
-        original_init = openai._client.Client.__init__
-        
-        def patched_init(self, *args, **kwargs):
-            # Remove proxies from kwargs if present
-            kwargs.pop('proxies', None)
-            return original_init(self, *args, **kwargs)
-        
-        # Apply the patch
-        openai._client.Client.__init__ = patched_init
-        
-        try:
-            client = openai.OpenAI(api_key=api_key)
-            return client
-        finally:
-            # Restore original method
-            openai._client.Client.__init__ = original_init
-            # Restore original environment variables
-            for var, value in original_proxy_vars.items():
-                os.environ[var] = value
-    except Exception as e:
-        st.warning(f"Method 1 failed: {str(e)}")
-    
-    # Method 2: Try with explicit http_client configuration
-    try:
-        client = openai.OpenAI(
-            api_key=api_key,
-            http_client=None
-        )
-        return client
-    except Exception as e:
-        st.warning(f"Method 2 failed: {str(e)}")
-    
-    # Method 3: Try with minimal configuration
-    try:
-        client = openai.OpenAI(api_key=api_key)
-        return client
-    except Exception as e:
-        st.error(f"All initialization methods failed: {str(e)}")
-        st.info("💡 Try updating your OpenAI library: pip install --upgrade openai")
-        return None
+    return create_safe_openai_client(api_key)
 
 def get_environment_api_key() -> Optional[str]:
     """
@@ -101,35 +50,9 @@ def check_openai_version() -> bool:
         return False
 
 def create_safe_openai_client(api_key: str) -> Optional[openai.OpenAI]:
-    """Create OpenAI client with safe initialization"""
+    """The shared OpenAI client for this key; proxy settings in the environment are ignored"""
     try:
-        import os
-        import openai._client
-        
-        # Store original environment
-        original_env = dict(os.environ)
-        
-        # Remove proxy-related environment variables
-        proxy_vars = ['HTTP_PROXY', 'HTTPS_PROXY', 'http_proxy', 'https_proxy', 'ALL_PROXY', 'all_proxy']
-        for var in proxy_vars:
-            os.environ.pop(var, None)
-        
-        # Create a custom client class that ignores proxies
-        class SafeOpenAIClient(openai.OpenAI):
-            def __init__(self, *args, **kwargs):
-                # Remove any proxy-related arguments
-                kwargs.pop('proxies', None)
-                kwargs.pop('http_client', None)
-                super().__init__(*args, **kwargs)
-        
-        # Create client using the safe class
-        client = SafeOpenAIClient(api_key=api_key)
-        
-        # Restore original environment
-        os.environ.clear()
-        os.environ.update(original_env)
-        
-        return client
+        return get_openai_client(api_key)
     except Exception as e:
         st.error(f"Safe client creation failed: {str(e)}")
         return None
@@ -200,55 +123,190 @@ Make the report specific to {company_name} and their {industry} industry, focusi
 
     return prompt
 
-def generate_ai_report(client: openai.OpenAI, prompt: str) -> Dict[str, Any]:
-    """Generate AI report using OpenAI API"""
+REPORT_MODEL = "gpt-4o-mini"
+REPORT_SYSTEM_MESSAGE = "You are an expert sales consultant and business analyst specializing in B2B sales preparation and strategic meeting planning."
+REPORT_PARAMS = {
+    "max_tokens": 1500,
+    "temperature": 0.7,
+    "top_p": 0.9,
+    "frequency_penalty": 0.1,
+    "presence_penalty": 0.1
+}
+
+def report_messages(prompt: str) -> List[Dict[str, str]]:
+    """Chat messages sent to the model for a report prompt"""
+    return [
+        {"role": "system", "content": REPORT_SYSTEM_MESSAGE},
+        {"role": "user", "content": prompt}
+    ]
+
+def get_cached_report(key: str) -> Optional[Dict[str, Any]]:
+    """A cached report result for this request key, or None (cache errors count as a miss)"""
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert sales consultant and business analyst specializing in B2B sales preparation and strategic meeting planning."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            max_tokens=1500,
-            temperature=0.7,
-            top_p=0.9,
-            frequency_penalty=0.1,
-            presence_penalty=0.1
+        cached = db.get_cached_ai_response(key)
+    except Exception as e:
+        print(f"AI response cache lookup failed: {e}")
+        return None
+    if cached is None:
+        return None
+    return cached_report_result(cached)
+
+def cached_report_result(cached: Dict[str, Any]) -> Dict[str, Any]:
+    """The report result for a response cache entry"""
+    return {
+        "success": True,
+        "report": cached["content"],
+        "model_used": cached["model"],
+        # Nothing was spent on this request; the original generation's tokens were saved
+        "tokens_used": 0,
+        "tokens_saved": cached["tokens_used"],
+        "cached": True,
+        "cached_at": datetime.fromtimestamp(cached["created_at"]).isoformat(),
+        "generation_time": datetime.now().isoformat()
+    }
+
+def cache_report(key: str, result: Dict[str, Any]):
+    """Keep a successful report for identical requests"""
+    try:
+        db.cache_ai_response(key, result["model_used"], result["report"], result["tokens_used"])
+    except Exception as e:
+        print(f"AI response cache store failed: {e}")
+
+def generation_error(error: Exception) -> Dict[str, Any]:
+    """The failed result for an exception raised while generating"""
+    if isinstance(error, openai.AuthenticationError):
+        return {"success": False, "error": "Invalid API key. Please check your OpenAI API key."}
+    if isinstance(error, openai.RateLimitError):
+        if quota_exhausted(error):
+            return {
+                "success": False,
+                "error": "The OpenAI account has run out of credit. Please check its plan and billing details."
+            }
+        return {"success": False, "error": "Rate limit exceeded. Please try again in a moment."}
+    if isinstance(error, openai.APIError):
+        return {"success": False, "error": f"OpenAI API error: {str(error)}"}
+    return {"success": False, "error": f"Generation error: {str(error)}"}
+
+def generate_ai_report(client: openai.OpenAI, prompt: str, force_regenerate: bool = False) -> Dict[str, Any]:
+    """Generate AI report using OpenAI API.
+    
+    An identical earlier request (same model, messages and parameters) is
+    answered from the response cache unless force_regenerate is set.
+    """
+    messages = report_messages(prompt)
+    key = cache_key(REPORT_MODEL, messages, REPORT_PARAMS)
+    if force_regenerate:
+        db.record_ai_cache_bypass()
+    else:
+        cached = get_cached_report(key)
+        if cached is not None:
+            return cached
+    
+    try:
+        # 429s are retried by the shared limiter, which also slows every other caller down
+        unretried = client.with_options(max_retries=0)
+        response = get_rate_limiter().call(
+            lambda: unretried.chat.completions.create(model=REPORT_MODEL, messages=messages, **REPORT_PARAMS),
+            estimate_tokens(messages, REPORT_PARAMS["max_tokens"])
         )
         
         generated_report = response.choices[0].message.content
         
-        return {
+        result = {
             "success": True,
             "report": generated_report,
-            "model_used": "gpt-4o-mini",
+            "model_used": REPORT_MODEL,
             "tokens_used": response.usage.total_tokens if response.usage else 0,
+            "cached": False,
             "generation_time": datetime.now().isoformat()
         }
+        cache_report(key, result)
+        return result
         
-    except openai.AuthenticationError:
-        return {"success": False, "error": "Invalid API key. Please check your OpenAI API key."}
-    except openai.RateLimitError:
-        return {"success": False, "error": "Rate limit exceeded. Please try again in a moment."}
-    except openai.APIError as e:
-        return {"success": False, "error": f"OpenAI API error: {str(e)}"}
     except Exception as e:
-        return {"success": False, "error": f"Generation error: {str(e)}"}
+        return generation_error(e)
 
-def generate_ai_report_safe(api_key: str, prompt: str) -> Dict[str, Any]:
-    """Generate AI report using safe client creation"""
+def generate_ai_report_stream(client: openai.OpenAI, prompt: str,
+                              on_text: Optional[Callable[[str], None]] = None,
+                              force_regenerate: bool = False) -> Dict[str, Any]:
+    """Generate AI report with a streamed response, passing each new piece of text to on_text.
+    
+    Returns the same result as generate_ai_report plus time_to_first_token_ms
+    and total_time_ms. A cached report is passed to on_text in one piece.
+    """
+    started = time.perf_counter()
+    messages = report_messages(prompt)
+    key = cache_key(REPORT_MODEL, messages, REPORT_PARAMS)
+    if force_regenerate:
+        db.record_ai_cache_bypass()
+    else:
+        cached = get_cached_report(key)
+        if cached is not None:
+            if on_text:
+                on_text(cached["report"])
+            elapsed = (time.perf_counter() - started) * 1000
+            return {**cached, "time_to_first_token_ms": elapsed, "total_time_ms": elapsed}
+    
+    parts = []
+    first_token_at = None
+    unretried = client.with_options(max_retries=0)
+    
+    def consume():
+        nonlocal first_token_at
+        usage = None
+        stream = unretried.chat.completions.create(
+            model=REPORT_MODEL,
+            messages=messages,
+            stream=True,
+            stream_options={"include_usage": True},
+            **REPORT_PARAMS
+        )
+        for chunk in stream:
+            # The final chunk carries the usage and no choices
+            if chunk.usage:
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            text = chunk.choices[0].delta.content
+            if text:
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                parts.append(text)
+                if on_text:
+                    on_text(text)
+        return usage
+    
+    try:
+        # A 429 arrives before any text, so the limiter can safely retry the whole stream
+        usage = get_rate_limiter().call(consume, estimate_tokens(messages, REPORT_PARAMS["max_tokens"]))
+    except Exception as e:
+        return {**generation_error(e), "partial_report": "".join(parts)}
+    
+    finished = time.perf_counter()
+    result = {
+        "success": True,
+        "report": "".join(parts),
+        "model_used": REPORT_MODEL,
+        "tokens_used": usage.total_tokens if usage else 0,
+        "cached": False,
+        "generation_time": datetime.now().isoformat(),
+        "time_to_first_token_ms": ((first_token_at or finished) - started) * 1000,
+        "total_time_ms": (finished - started) * 1000
+    }
+    cache_report(key, result)
+    return result
+
+def generate_ai_report_safe(api_key: str, prompt: str, force_regenerate: bool = False,
+                            on_text: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """Generate AI report using safe client creation (streamed to on_text when given)"""
     try:
         client = create_safe_openai_client(api_key)
         if client is None:
             return {"success": False, "error": "Failed to create OpenAI client"}
         
-        return generate_ai_report(client, prompt)
+        if on_text is not None:
+            return generate_ai_report_stream(client, prompt, on_text, force_regenerate=force_regenerate)
+        return generate_ai_report(client, prompt, force_regenerate=force_regenerate)
     except Exception as e:
         return {"success": False, "error": f"Client creation error: {str(e)}"}
 
@@ -266,10 +324,48 @@ def save_report_to_database(report_data: Dict[str, Any], prospect_id: int, user_
             }
         )
         return script_id > 0
+    except sqlite3.IntegrityError:
+        # Foreign keys are enforced: the prospect (or the user) was deleted in the meantime
+        st.error("Error saving report: this prospect no longer exists in the database.")
+        return False
     except Exception as e:
         st.error(f"Error saving report: {str(e)}")
         return False
 
+class StreamingReportView:
+    """Shows streamed report text in a placeholder, redrawn at most every `interval` seconds"""
+    
+    def __init__(self, slot, interval: float = 0.1):
+        self.slot = slot
+        self.interval = interval
+        self.parts: List[str] = []
+        self.last_render = 0.0
+    
+    def write(self, text: str):
+        self.parts.append(text)
+        now = time.monotonic()
+        # Each redraw sends the whole text to the browser, so they are throttled
+        if now - self.last_render >= self.interval:
+            self.slot.markdown("".join(self.parts) + " ▌")
+            self.last_render = now
+    
+    def finish(self, report: str):
+        self.slot.markdown(report)
+
+def log_report_timing(user_id: int, prospect_id: int, result: Dict[str, Any]):
+    """Record a generation's time to first token and total time as an analytics event"""
+    try:
+        db.log_analytics(user_id, 'ai_report_generated', json.dumps({
+            'prospect_id': prospect_id,
+            'model': result['model_used'],
+            'cached': result.get('cached', False),
+            'tokens_used': result['tokens_used'],
+            'time_to_first_token_ms': round(result['time_to_first_token_ms'], 1),
+            'total_time_ms': round(result['total_time_ms'], 1)
+        }))
+    except Exception as e:
+        print(f"Report timing not logged: {e}")
+
 def ai_report_component():
     """Enhanced AI report generation component with modern UX"""
     st.markdown("""
@@ -403,6 +499,10 @@ def ai_report_component():
     
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
+        force_regenerate = st.checkbox(
+            "🔄 Force regenerate",
+            help="Ask the model again even if an identical report is cached"
+        )
         if st.button("🚀 Generate AI Report", use_container_width=True, disabled=not client, help="Generate a comprehensive AI report for this prospect"):
             if not client:
                 st.error("Please check the OpenAI configuration.")
@@ -412,36 +512,49 @@ def ai_report_component():
                 # Create prompt
                 prompt = create_ai_report_prompt(current_prospect)
                 
-                # Generate report using safe method
-                result = generate_ai_report_safe(api_key, prompt)
-                
-                if result["success"]:
-                    # Display the report with enhanced styling
-                    st.markdown("""
-                    <div class="red-bg-text" style="background: linear-gradient(135deg, #28a745 0%, #20c997 100%); 
-                                color: white; padding: 2rem; border-radius: 15px; margin: 2rem 0; 
-                                box-shadow: 0 8px 25px rgba(40,167,69,0.3); border: 2px solid #28a745;">
-                        <h3 style="margin: 0 0 1rem 0; display: flex; align-items: center; gap: 0.5rem; color: white;">
-                            ✅ AI Report Generated Successfully!
-                        </h3>
-                        <p style="margin: 0; opacity: 0.9; color: white;">Your personalized NBP report is ready for review and download.</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    # Save to database
-                    if save_report_to_database(result, current_prospect['id'], current_user['id']):
-                        st.success("✅ Report saved to database")
-                    
-                    # Display report in a modern container
+                # The report panel comes first so the text can stream into it
+                summary = st.container()
+                report_panel = st.empty()
+                with report_panel.container():
                     st.markdown("""
                     <div style="background: white; padding: 2rem; border-radius: 15px; margin: 2rem 0; 
                                 box-shadow: 0 5px 15px rgba(0,0,0,0.1); border: 1px solid rgba(255,0,0,0.1);">
                         <h3 style="margin: 0 0 1.5rem 0; color: #ff0000;">📋 Generated Report</h3>
                     """, unsafe_allow_html=True)
-                    
-                    st.markdown(result["report"])
-                    
+                    report_view = StreamingReportView(st.empty())
                     st.markdown("</div>")
+                
+                # Generate report using safe method, rendering it as it arrives
+                result = generate_ai_report_safe(
+                    api_key, prompt, force_regenerate=force_regenerate, on_text=report_view.write
+                )
+                
+                if result["success"]:
+                    report_view.finish(result["report"])
+                    log_report_timing(current_user['id'], current_prospect['id'], result)
+                    
+                    with summary:
+                        if result.get("cached"):
+                            st.info(
+                                f"♻️ Served from the report cache (generated {result['cached_at'][:19]}, "
+                                f"{result['tokens_saved']} tokens saved). Tick \"Force regenerate\" for a fresh report."
+                            )
+                        
+                        # Display the report with enhanced styling
+                        st.markdown("""
+                        <div class="red-bg-text" style="background: linear-gradient(135deg, #28a745 0%, #20c997 100%); 
+                                    color: white; padding: 2rem; border-radius: 15px; margin: 2rem 0; 
+                                    box-shadow: 0 8px 25px rgba(40,167,69,0.3); border: 2px solid #28a745;">
+                            <h3 style="margin: 0 0 1rem 0; display: flex; align-items: center; gap: 0.5rem; color: white;">
+                                ✅ AI Report Generated Successfully!
+                            </h3>
+                            <p style="margin: 0; opacity: 0.9; color: white;">Your personalized NBP report is ready for review and download.</p>
+                        </div>
+                        """, unsafe_allow_html=True)
+                        
+                        # Save to database
+                        if save_report_to_database(result, current_prospect['id'], current_user['id']):
+                            st.success("✅ Report saved to database")
                     
                     # Report details with enhanced design
                     st.markdown("""
@@ -450,7 +563,7 @@ def ai_report_component():
                         <h4 style="margin: 0 0 1rem 0; color: #ff0000;">📊 Report Details</h4>
                     """, unsafe_allow_html=True)
                     
-                    col1, col2, col3 = st.columns(3)
+                    col1, col2, col3, col4 = st.columns(4)
                     
                     with col1:
                         st.markdown(f"""
@@ -479,6 +592,15 @@ def ai_report_component():
                         </div>
                         """, unsafe_allow_html=True)
                     
+                    with col4:
+                        st.markdown(f"""
+                        <div style="text-align: center; padding: 1rem; background: white; border-radius: 8px; border: 1px solid rgba(255,0,0,0.1);">
+                            <div style="font-size: 1.5rem; color: #ff0000; margin-bottom: 0.5rem;">⚡</div>
+                            <div style="font-weight: bold;">First Token</div>
+                            <div style="color: #666;">{result['time_to_first_token_ms'] / 1000:.1f}s of {result['total_time_ms'] / 1000:.1f}s</div>
+                        </div>
+                        """, unsafe_allow_html=True)
+                    
                     st.markdown("</div>")
                     
                     # Action buttons with enhanced design
@@ -496,7 +618,8 @@ def ai_report_component():
                             st.code(result["report"])
                     
                     with col2:
-                        # Generate PDF and create download button
+                        # Generate PDF and create download button (reportlab is only loaded here)
+                        from components.pdf_generator import download_pdf_report
                         pdf_bytes, filename = download_pdf_report(result, current_prospect, "ai_report")
                         if pdf_bytes:
                             st.download_button(
@@ -546,6 +669,7 @@ def ai_report_component():
                     """, unsafe_allow_html=True)
                     
                 else:
+                    report_panel.empty()
                     st.error(f"❌ Report generation failed: {result['error']}")
     
     st.markdown("</div>")
@@ -590,9 +714,24 @@ def ai_report_component():
         
         st.markdown("</div>")
     
+    # Response cache metrics
+    with st.expander("♻️ AI Report Cache", expanded=False):
+        try:
+            cache_stats = db.get_ai_cache_stats()
+        except Exception as e:
+            st.error(f"Cache statistics unavailable: {str(e)}")
+        else:
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Hit Rate", f"{cache_stats['hit_rate']:.0%}")
+            col2.metric("Hits / Misses", f"{cache_stats['hits']} / {cache_stats['misses']}")
+            col3.metric("Tokens Saved", f"{cache_stats['tokens_saved']:,}")
+            col4.metric("Cached Reports", cache_stats['entries'])
+            st.caption(f"{cache_stats['bypasses']} forced regenerations, {cache_stats['evictions']} entries evicted")
+    
     # Test PDF generation
     with st.expander("🧪 Test PDF Generation", expanded=False):
         if st.button("Test PDF Generation", help="Test if PDF generation is working"):
+            from components.pdf_generator import test_pdf_generation
             test_pdf_generation()
     
     # Help section with enhanced design
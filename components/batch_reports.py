@@ -0,0 +1,316 @@
+"""Generate AI reports for many prospects at once.
+
+``generate_reports`` builds each prospect's prompt with
+``create_ai_report_prompt`` and runs up to ``concurrency`` API requests
+at a time on one event loop, within the shared rate limiter's budget.
+Identical earlier requests are answered from the response cache, as on
+the report page. Finished reports are saved with
+``create_generated_scripts`` every ``write_batch_size`` reports, so
+database writes do not cost one commit per prospect. A failed prospect
+(missing, owned by another user, API error) is recorded and the batch
+carries on. When a batch of reports fails to save, they are saved one
+at a time, and only the reports that still fail count as failed. Cache
+trouble is reported as a warning.
+
+    python -m components.batch_reports 12 15 18 [--user-id N] [--concurrency 8]
+    python -m components.batch_reports --all
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from components.ai_report import (
+    REPORT_MODEL, REPORT_PARAMS, cached_report_result, create_ai_report_prompt, generation_error,
+    report_messages
+)
+from components.openai_client import ClientConfig, build_async_client
+from components.rate_limit import estimate_tokens, get_rate_limiter
+from database.aio import AsyncDatabaseManager
+from database.models import DEFAULT_USERNAME, DatabaseManager
+from database.response_cache import cache_key
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_WRITE_BATCH_SIZE = 25
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one batch run"""
+    requested: int = 0
+    generated: int = 0
+    cached: int = 0
+    saved: int = 0
+    tokens_used: int = 0
+    tokens_saved: int = 0
+    # 429 responses seen (process-wide) while the batch ran
+    rate_limited: int = 0
+    elapsed: float = 0.0
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+    # Problems that did not fail a report (cache trouble)
+    warnings: List[str] = field(default_factory=list)
+    latencies: List[float] = field(default_factory=list)
+
+    @property
+    def failed(self) -> int:
+        return len(self.errors)
+
+    @property
+    def completed(self) -> int:
+        return self.generated + self.cached + self.failed
+
+    @property
+    def reports_per_minute(self) -> float:
+        return (self.generated + self.cached) * 60 / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def tokens_per_minute(self) -> float:
+        return self.tokens_used * 60 / self.elapsed if self.elapsed else 0.0
+
+    def latency_percentile(self, fraction: float) -> float:
+        """Seconds per API request at this percentile (0 when none were made)"""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+    def add_error(self, prospect_id: int, message: str):
+        self.errors.append((prospect_id, message))
+
+    def add_save_error(self, prospect_id: int, cached: bool, message: str):
+        """A finished report that could not be saved counts as failed, not as generated or cached"""
+        if cached:
+            self.cached -= 1
+        else:
+            self.generated -= 1
+        self.add_error(prospect_id, message)
+
+    def add_warning(self, message: str):
+        self.warnings.append(message)
+
+    def summary(self) -> str:
+        lines = [
+            f"{self.generated + self.cached:,} of {self.requested:,} reports in {self.elapsed:.1f}s "
+            f"({self.generated:,} generated, {self.cached:,} from cache, {self.failed:,} failed, "
+            f"{self.saved:,} saved)",
+            f"{self.reports_per_minute:,.1f} reports/min, {self.tokens_used:,} tokens "
+            f"({self.tokens_per_minute:,.0f}/min), {self.tokens_saved:,} tokens saved by the cache",
+        ]
+        if self.rate_limited:
+            lines.append(f"{self.rate_limited:,} rate-limited responses were retried")
+        if self.latencies:
+            lines.append(
+                f"API latency p50 {statistics.median(self.latencies):.2f}s, "
+                f"p95 {self.latency_percentile(0.95):.2f}s"
+            )
+        return '\n'.join(lines)
+
+
+def prospect_report_info(prospect: Dict[str, Any], contacts) -> Dict[str, Any]:
+    """The prospect details create_ai_report_prompt expects, as the prospect page builds them"""
+    primary = next((contact for contact in contacts if contact['is_primary']), None)
+    if primary is None and len(contacts):
+        primary = contacts[0]
+    info = {
+        'id': prospect['id'],
+        'company_name': prospect['company_name'],
+        'industry': prospect['industry'],
+        'meeting_objective': prospect['meeting_objective'],
+        'context': prospect['context'] or '',
+    }
+    if primary is not None:
+        info['primary_contact'] = primary['contact_name']
+    # Missing values fall back to the prompt's defaults
+    return {key: value for key, value in info.items() if value is not None}
+
+
+async def generate_reports(db: DatabaseManager, user_id: int, prospect_ids: List[int],
+                           api_key: Optional[str] = None, base_url: Optional[str] = None,
+                           concurrency: int = DEFAULT_CONCURRENCY,
+                           write_batch_size: int = DEFAULT_WRITE_BATCH_SIZE,
+                           force_regenerate: bool = False,
+                           on_progress: Optional[Callable[[BatchResult], None]] = None) -> BatchResult:
+    """Generate and save an AI report for each of a user's prospects"""
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    api_key = api_key or os.getenv('OPENAI_API_KEY')
+    if not api_key:
+        raise ValueError("No OpenAI API key; pass api_key or set OPENAI_API_KEY")
+
+    result = BatchResult(requested=len(prospect_ids))
+    started = time.perf_counter()
+    adb = AsyncDatabaseManager(db)
+    # Enough pooled connections for every request in flight; 429s are retried by the limiter
+    client = build_async_client(ClientConfig(
+        api_key=api_key, base_url=base_url, max_retries=0,
+        max_connections=concurrency, max_keepalive=concurrency
+    ))
+    limiter = get_rate_limiter()
+    throttled_before = limiter.stats()['rate_limited']
+    slots = asyncio.Semaphore(concurrency)
+    # (script to save, whether the report came from the cache)
+    pending: List[Tuple[Dict[str, Any], bool]] = []
+
+    async def flush():
+        if not pending:
+            return
+        batch = pending[:]
+        pending.clear()
+        try:
+            await adb.create_generated_scripts(user_id, [script for script, _ in batch])
+            result.saved += len(batch)
+        except Exception:
+            # One bad row (say, a prospect deleted mid-run) fails the whole
+            # batch; save the reports one by one so only that one is lost
+            for script, cached in batch:
+                try:
+                    await adb.create_generated_scripts(user_id, [script])
+                    result.saved += 1
+                except Exception as e:
+                    result.add_save_error(script['prospect_id'], cached, f"Saving the report failed: {e}")
+
+    async def load_prompt(prospect_id: int) -> Optional[str]:
+        def read(manager: DatabaseManager):
+            prospect = manager.get_prospect_by_id(prospect_id)
+            contacts = manager.get_prospect_contacts(prospect_id) if prospect else []
+            return prospect, contacts
+
+        prospect, contacts = await adb.read(read)
+        if prospect is None:
+            result.add_error(prospect_id, "Prospect not found")
+            return None
+        if prospect['user_id'] != user_id:
+            result.add_error(prospect_id, "Prospect belongs to another user")
+            return None
+        return create_ai_report_prompt(prospect_report_info(prospect, contacts))
+
+    async def generate(prospect_id: int) -> Optional[Dict[str, Any]]:
+        prompt = await load_prompt(prospect_id)
+        if prompt is None:
+            return None
+        messages = report_messages(prompt)
+        key = cache_key(REPORT_MODEL, messages, REPORT_PARAMS)
+        # As on the report page, cache trouble never fails a report
+        try:
+            if force_regenerate:
+                adb.record_ai_cache_bypass()
+            else:
+                cached = await adb.get_cached_ai_response(key)
+                if cached is not None:
+                    return cached_report_result(cached)
+        except Exception as e:
+            result.add_warning(f"prospect {prospect_id}: AI response cache lookup failed: {e}")
+
+        async def request():
+            requested = time.perf_counter()
+            response = await client.chat.completions.create(model=REPORT_MODEL, messages=messages, **REPORT_PARAMS)
+            result.latencies.append(time.perf_counter() - requested)
+            return response
+
+        async with slots:
+            # Shared with the report page, so a batch cannot starve reps of the API budget
+            response = await limiter.call_async(request, estimate_tokens(messages, REPORT_PARAMS["max_tokens"]))
+        report = {
+            "success": True,
+            "report": response.choices[0].message.content,
+            "model_used": REPORT_MODEL,
+            "tokens_used": response.usage.total_tokens if response.usage else 0,
+            "cached": False,
+        }
+        try:
+            await adb.cache_ai_response(key, report["model_used"], report["report"], report["tokens_used"])
+        except Exception as e:
+            result.add_warning(f"prospect {prospect_id}: AI response cache store failed: {e}")
+        return report
+
+    async def run(prospect_id: int):
+        try:
+            report = await generate(prospect_id)
+        except Exception as e:
+            report = generation_error(e)
+            result.add_error(prospect_id, report["error"])
+            report = None
+        if report is not None:
+            if report["cached"]:
+                result.cached += 1
+                result.tokens_saved += report["tokens_saved"]
+            else:
+                result.generated += 1
+                result.tokens_used += report["tokens_used"]
+            pending.append(({
+                'prospect_id': prospect_id,
+                'script_type': 'AI Report',
+                'content': report['report'],
+                'ai_model': report['model_used'],
+                'tokens_used': report['tokens_used']
+            }, report["cached"]))
+            if len(pending) >= write_batch_size:
+                await flush()
+        result.elapsed = time.perf_counter() - started
+        if on_progress is not None:
+            on_progress(result)
+
+    try:
+        await asyncio.gather(*(run(prospect_id) for prospect_id in prospect_ids))
+        await flush()
+    finally:
+        await client.close()
+        await adb.aclose()
+    result.elapsed = time.perf_counter() - started
+    result.rate_limited = limiter.stats()['rate_limited'] - throttled_before
+    return result
+
+
+def run_batch(db: DatabaseManager, user_id: int, prospect_ids: List[int], **options: Any) -> BatchResult:
+    """generate_reports() for callers without an event loop"""
+    return asyncio.run(generate_reports(db, user_id, prospect_ids, **options))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('prospect_ids', nargs='*', type=int)
+    parser.add_argument('--all', action='store_true', help="every prospect of the user")
+    parser.add_argument('--db', default=None, help='database path or URL (NBP_DATABASE_URL by default)')
+    parser.add_argument('--user-id', type=int, help='default: the sales_rep login')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument('--write-batch-size', type=int, default=DEFAULT_WRITE_BATCH_SIZE)
+    parser.add_argument('--force-regenerate', action='store_true', help='skip the response cache')
+    parser.add_argument('--base-url', help='OpenAI-compatible API URL (OPENAI_BASE_URL by default)')
+    args = parser.parse_args()
+    if not args.prospect_ids and not args.all:
+        parser.error('give prospect ids or --all')
+
+    manager = DatabaseManager(args.db, maintenance=False)
+    try:
+        if args.user_id is None:
+            args.user_id = manager.ensure_user(DEFAULT_USERNAME)
+        prospect_ids = args.prospect_ids
+        if args.all:
+            prospect_ids = [row['id'] for page in manager.iter_user_prospects(args.user_id) for row in page]
+        result = run_batch(
+            manager, args.user_id, prospect_ids,
+            base_url=args.base_url,
+            concurrency=args.concurrency,
+            write_batch_size=args.write_batch_size,
+            force_regenerate=args.force_regenerate,
+            on_progress=lambda r: print(f"\r{r.completed:,}/{r.requested:,} done, {r.failed:,} failed, "
+                                        f"{len(r.warnings):,} warnings, {r.reports_per_minute:,.0f} reports/min",
+                                        end='', flush=True)
+        )
+    finally:
+        manager.close()
+
+    print('\n' + result.summary())
+    for prospect_id, message in result.errors[:20]:
+        print(f"  prospect {prospect_id}: {message}")
+    if result.warnings:
+        print(f"{len(result.warnings):,} warnings:")
+        for message in result.warnings[:20]:
+            print(f"  {message}")
+
+
+if __name__ == '__main__':
+    main()
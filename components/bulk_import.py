@@ -0,0 +1,400 @@
+"""Bulk prospect import from CSV and Excel files.
+
+Rows are streamed, never loaded whole: CSV through ``csv.reader`` and
+XLSX through openpyxl's read-only mode. Each row is validated with the same
+rules as the New Prospect form. Valid rows are collected into batches of
+``batch_size`` and written with ``create_prospects_with_contacts``, so a
+batch (prospects plus their primary contacts) costs one transaction.
+Invalid rows are reported by row number and skipped. When a batch fails to
+insert, its rows are retried one at a time so only the rows that really
+fail are reported. Rows that look like
+an existing prospect, or like an earlier row of the same file, are still
+imported but listed as possible duplicates. Same name and same website
+are checked for every row with one query per batch. The fuzzy
+similar-name check costs a few milliseconds per row, so it is opt-in.
+
+    python -m components.bulk_import accounts.xlsx [--user-id N] [--batch-size 1000]
+"""
+import argparse
+import csv
+import io
+import os
+import time
+from dataclasses import dataclass, field
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from components.validation import validate_prospect_form
+from database.models import DEFAULT_USERNAME, DatabaseManager
+
+# Header spellings accepted for each field (compared lowercased, without spaces, dashes or underscores)
+COLUMN_ALIASES = {
+    'company_name': ('companyname', 'company', 'account', 'accountname', 'organization'),
+    'website': ('website', 'url', 'domain', 'web'),
+    'industry': ('industry', 'sector'),
+    'company_size': ('companysize', 'size', 'employees'),
+    'business_category': ('businesscategory', 'category'),
+    'meeting_objective': ('meetingobjective', 'objective'),
+    'context': ('context', 'description'),
+    'notes': ('notes', 'note', 'comments'),
+    'contact_name': ('contactname', 'primarycontact', 'primarycontactname', 'contact'),
+    'title': ('title', 'jobtitle', 'role', 'position'),
+    'email': ('email', 'emailaddress', 'contactemail'),
+    'phone': ('phone', 'phonenumber', 'telephone', 'mobile'),
+    'linkedin_url': ('linkedinurl', 'linkedin'),
+}
+
+PROSPECT_FIELDS = ('company_name', 'website', 'industry', 'company_size', 'business_category',
+                   'meeting_objective', 'context', 'notes')
+CONTACT_FIELDS = ('contact_name', 'title', 'email', 'phone', 'linkedin_url')
+
+DEFAULT_BATCH_SIZE = 1000
+# Keep at most this many row errors; the count of failed rows stays exact
+MAX_REPORTED_ERRORS = 1000
+
+
+@dataclass
+class ImportResult:
+    """Outcome of one import run"""
+    rows: int = 0
+    imported: int = 0
+    failed: int = 0
+    batches: int = 0
+    elapsed: float = 0.0
+    fraction: Optional[float] = None
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+    duplicates: int = 0
+    duplicate_warnings: List[Tuple[int, str]] = field(default_factory=list)
+    # Problems that did not stop any row, such as a failed duplicate check
+    warnings: List[str] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def add_error(self, row_number: int, message: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((row_number, message))
+
+    def add_duplicate(self, row_number: int, message: str):
+        self.duplicates += 1
+        if len(self.duplicate_warnings) < MAX_REPORTED_ERRORS:
+            self.duplicate_warnings.append((row_number, message))
+
+
+def _normalize_header(header: Any) -> str:
+    return ''.join(ch for ch in str(header or '').lower() if ch.isalnum())
+
+
+def map_columns(headers: List[Any]) -> Dict[int, str]:
+    """Map column positions to field names, ignoring unknown columns"""
+    lookup = {alias: name for name, aliases in COLUMN_ALIASES.items() for alias in aliases}
+    mapping = {}
+    for position, header in enumerate(headers):
+        name = lookup.get(_normalize_header(header))
+        if name is not None and name not in mapping.values():
+            mapping[position] = name
+    return mapping
+
+
+def _records(rows: Iterator[Tuple[Any, ...]], first_row_number: int) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """Turn raw rows (header first) into (row number, field dict) pairs"""
+    headers = next(rows, None)
+    if headers is None:
+        return
+    mapping = map_columns(list(headers))
+    if 'company_name' not in mapping.values():
+        raise ValueError("No company name column found; expected a header such as 'Company Name'")
+
+    for row_number, row in enumerate(rows, start=first_row_number + 1):
+        if not any(value not in (None, '') for value in row):
+            continue  # blank line
+        yield row_number, {
+            name: '' if position >= len(row) or row[position] is None else str(row[position]).strip()
+            for position, name in mapping.items()
+        }
+
+
+def iter_csv_records(source: IO[bytes], encoding: str = 'utf-8-sig',
+                     on_position: Optional[Callable[[int], None]] = None) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """Stream records from a CSV file opened in binary mode"""
+    text = io.TextIOWrapper(source, encoding=encoding, newline='')
+    try:
+        sample = text.read(64 * 1024)
+        dialect = csv.Sniffer().sniff(sample, delimiters=',;\t|') if sample else csv.excel
+    except csv.Error:
+        dialect = csv.excel
+    text.seek(0)
+
+    def rows() -> Iterator[Tuple[Any, ...]]:
+        for row in csv.reader(text, dialect):
+            if on_position is not None:
+                on_position(source.tell())
+            yield tuple(row)
+
+    try:
+        yield from _records(rows(), first_row_number=1)
+    finally:
+        # Leave the caller's file open
+        text.detach()
+
+
+def iter_xlsx_records(source: IO[bytes], sheet: Optional[str] = None,
+                      on_progress: Optional[Callable[[int, Optional[int]], None]] = None
+                      ) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """Stream records from the first (or named) worksheet of an XLSX file"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet else workbook.worksheets[0]
+        total = worksheet.max_row
+
+        def rows() -> Iterator[Tuple[Any, ...]]:
+            for row_number, row in enumerate(worksheet.iter_rows(values_only=True), start=1):
+                if on_progress is not None:
+                    on_progress(row_number, total)
+                yield row
+
+        yield from _records(rows(), first_row_number=1)
+    finally:
+        workbook.close()
+
+
+def build_prospect(record: Dict[str, str], default_meeting_objective: Optional[str] = None
+                   ) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+    """Validate a record with the New Prospect form rules and shape it for create_prospects_with_contacts"""
+    meeting_objective = record.get('meeting_objective') or default_meeting_objective or ''
+    errors = validate_prospect_form(
+        record.get('company_name', ''),
+        meeting_objective,
+        record.get('contact_name', ''),
+        record.get('email', '')
+    )
+    if errors:
+        return None, errors
+
+    prospect = {name: record.get(name) or None for name in PROSPECT_FIELDS}
+    prospect['meeting_objective'] = meeting_objective
+    contact = {name: record.get(name) or None for name in CONTACT_FIELDS}
+    contact['is_primary'] = True
+    prospect['contacts'] = [contact]
+    return prospect, []
+
+
+def import_prospects(db: DatabaseManager, user_id: int, source: IO[bytes], filename: str,
+                     batch_size: int = DEFAULT_BATCH_SIZE, default_meeting_objective: Optional[str] = None,
+                     on_progress: Optional[Callable[[ImportResult], None]] = None,
+                     fuzzy_duplicates: bool = False) -> ImportResult:
+    """Import prospects with their primary contacts from a CSV or XLSX file object"""
+    result = ImportResult()
+    started = time.perf_counter()
+    extension = os.path.splitext(filename)[1].lower()
+
+    if extension in ('.xlsx', '.xlsm'):
+        def xlsx_progress(row_number: int, total: Optional[int]):
+            result.fraction = min(row_number / total, 1.0) if total else None
+        records = iter_xlsx_records(source, on_progress=xlsx_progress)
+    elif extension in ('.csv', '.txt', '.tsv'):
+        source.seek(0, os.SEEK_END)
+        size = source.tell()
+        source.seek(0)
+
+        def csv_progress(position: int):
+            result.fraction = min(position / size, 1.0) if size else None
+        records = iter_csv_records(source, on_position=csv_progress)
+    else:
+        raise ValueError(f"Unsupported file type '{extension}'; upload a .csv or .xlsx file")
+
+    batch: List[Dict[str, Any]] = []
+    batch_rows: List[int] = []
+
+    def flag_duplicates():
+        matches = db.find_exact_duplicate_prospects(
+            user_id, [(prospect['company_name'], prospect.get('website')) for prospect in batch]
+        )
+        for row_number, prospect, match in zip(batch_rows, batch, matches):
+            if match is None and fuzzy_duplicates:
+                similar = db.find_duplicate_prospects(user_id, prospect['company_name'], limit=1)
+                match = similar[0] if similar else None
+            if match is not None:
+                where = 'an earlier row' if match['id'] is None else 'an existing prospect'
+                result.add_duplicate(row_number, f"{match['reason'].capitalize()} as {where}: {match['company_name']}")
+
+    def flush():
+        # Only advisory, so a failed check does not hold up the import
+        try:
+            flag_duplicates()
+        except Exception as e:
+            result.warnings.append(f"Duplicate check failed for rows {batch_rows[0]}-{batch_rows[-1]}: {e}")
+        try:
+            db.create_prospects_with_contacts(user_id, batch)
+            result.imported += len(batch)
+        except Exception:
+            # One bad row rolls back the whole batch; retry row by row to find it
+            for row_number, prospect in zip(batch_rows, batch):
+                try:
+                    db.create_prospects_with_contacts(user_id, [prospect])
+                    result.imported += 1
+                except Exception as e:
+                    result.add_error(row_number, f"Insert failed: {e}")
+        result.batches += 1
+        result.elapsed = time.perf_counter() - started
+        batch.clear()
+        batch_rows.clear()
+        if on_progress is not None:
+            on_progress(result)
+
+    for row_number, record in records:
+        result.rows += 1
+        prospect, errors = build_prospect(record, default_meeting_objective)
+        if errors:
+            result.add_error(row_number, '; '.join(errors))
+            continue
+        batch.append(prospect)
+        batch_rows.append(row_number)
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+    result.fraction = 1.0
+    result.elapsed = time.perf_counter() - started
+    if on_progress is not None:
+        on_progress(result)
+    return result
+
+
+def bulk_import_component():
+    """Streamlit page for importing prospects from a CSV or Excel file"""
+    import streamlit as st
+    from auth import get_current_user
+    from components.simple_prospect import MEETING_OBJECTIVES
+    from database.models import db
+
+    st.markdown("""
+    <div class="main-container">
+        <h1 style="text-align: center; margin-bottom: 2rem;">📥 Bulk Import</h1>
+        <p style="text-align: center; color: #666; margin-bottom: 3rem; font-size: 1.1rem;">
+            Import a territory's accounts from a CSV or Excel file
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    current_user = get_current_user()
+    if not current_user:
+        st.error("User not authenticated")
+        return
+
+    st.markdown(
+        "One row per prospect with a header row. Recognised columns: **Company Name**, Website, Industry, "
+        "Company Size, Business Category, Meeting Objective, Context, Notes, and the primary contact's "
+        "**Contact Name**, Title, **Email**, Phone, LinkedIn. Bold columns are required."
+    )
+
+    uploaded = st.file_uploader("Prospect file", type=['csv', 'xlsx'])
+    col1, col2 = st.columns(2)
+    with col1:
+        default_objective = st.selectbox(
+            "Meeting objective for rows without one",
+            options=MEETING_OBJECTIVES,
+            help="Used when the file has no Meeting Objective column or the cell is empty"
+        )
+    with col2:
+        batch_size = st.number_input(
+            "Rows per transaction", min_value=100, max_value=20000, value=DEFAULT_BATCH_SIZE, step=100
+        )
+    fuzzy_duplicates = st.checkbox(
+        "Also flag similarly named companies",
+        help="Same name and same website are always flagged; this also catches typos and extra words, "
+             "at a few milliseconds per row"
+    )
+
+    if uploaded is None or not st.button("📥 Import Prospects", use_container_width=True):
+        return
+
+    progress_bar = st.progress(0.0, text="Reading file...")
+    status = st.empty()
+
+    def show_progress(result: ImportResult):
+        fraction = result.fraction if result.fraction is not None else 0.0
+        progress_bar.progress(fraction, text=f"{result.rows:,} rows read, {result.imported:,} imported")
+        status.caption(f"{result.rows_per_second:,.0f} rows/s · {result.failed:,} rows with errors")
+
+    try:
+        result = import_prospects(
+            db, current_user['id'], uploaded, uploaded.name,
+            batch_size=int(batch_size),
+            default_meeting_objective=default_objective,
+            on_progress=show_progress,
+            fuzzy_duplicates=fuzzy_duplicates
+        )
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        return
+
+    show_progress(result)
+    st.success(
+        f"✅ Imported {result.imported:,} of {result.rows:,} rows in {result.elapsed:.1f}s "
+        f"({result.rows_per_second:,.0f} rows/s)"
+    )
+    if result.failed:
+        st.warning(f"{result.failed:,} rows were skipped")
+        st.dataframe(
+            [{'Row': row_number, 'Error': message} for row_number, message in result.errors],
+            use_container_width=True,
+            hide_index=True
+        )
+        if result.failed > len(result.errors):
+            st.caption(f"Showing the first {len(result.errors):,} errors")
+    if result.duplicates:
+        st.warning(f"{result.duplicates:,} imported rows may be duplicates")
+        st.dataframe(
+            [{'Row': row_number, 'Possible duplicate': message} for row_number, message in result.duplicate_warnings],
+            use_container_width=True,
+            hide_index=True
+        )
+    for message in result.warnings:
+        st.warning(message)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('path')
+    parser.add_argument('--db', default='nbp_sales.db')
+    parser.add_argument('--user-id', type=int, help='default: the sales_rep login')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--meeting-objective', help='default for rows without one')
+    parser.add_argument('--fuzzy-duplicates', action='store_true', help='also flag similarly named companies')
+    args = parser.parse_args()
+
+    manager = DatabaseManager(args.db, maintenance=False)
+    try:
+        if args.user_id is None:
+            args.user_id = manager.ensure_user(DEFAULT_USERNAME)
+        with open(args.path, 'rb') as source:
+            result = import_prospects(
+                manager, args.user_id, source, args.path,
+                batch_size=args.batch_size,
+                default_meeting_objective=args.meeting_objective,
+                on_progress=lambda r: print(f"\r{r.rows:,} rows, {r.imported:,} imported, "
+                                            f"{r.rows_per_second:,.0f} rows/s", end='', flush=True),
+                fuzzy_duplicates=args.fuzzy_duplicates
+            )
+    finally:
+        manager.close()
+
+    print(f"\nImported {result.imported:,} of {result.rows:,} rows in {result.elapsed:.2f}s, "
+          f"{result.failed:,} failed")
+    for row_number, message in result.errors[:20]:
+        print(f"  row {row_number}: {message}")
+    if result.duplicates:
+        print(f"{result.duplicates:,} possible duplicates")
+        for row_number, message in result.duplicate_warnings[:20]:
+            print(f"  row {row_number}: {message}")
+    for message in result.warnings:
+        print(f"Warning: {message}")
+
+
+if __name__ == '__main__':
+    main()
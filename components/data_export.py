@@ -0,0 +1,60 @@
+import os
+import tempfile
+
+import streamlit as st
+
+from auth import get_current_user
+from database.export import DATASETS, FORMATS, available_formats, export
+from database.models import db
+
+DATASET_LABELS = {
+    'prospects': "Prospects",
+    'scripts': "Generated reports and scripts",
+}
+
+
+def data_export_component():
+    """Export the current user's prospects or generated reports"""
+    st.markdown("""
+    <div class="main-container">
+        <h1 style="text-align: center; margin-bottom: 2rem;">📤 Export Data</h1>
+        <p style="text-align: center; color: #666; margin-bottom: 3rem; font-size: 1.1rem;">
+            Download your prospects or generated reports as CSV, Excel or Parquet
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    current_user = get_current_user()
+    if not current_user:
+        st.error("User not authenticated")
+        return
+
+    col1, col2 = st.columns(2)
+    with col1:
+        dataset = st.selectbox("Data", options=list(DATASETS), format_func=DATASET_LABELS.get)
+    with col2:
+        fmt = st.selectbox("Format", options=available_formats(), format_func=str.upper)
+
+    if not st.button("📤 Prepare Export", use_container_width=True):
+        return
+
+    # The export streams to a temporary file; Streamlit then serves that file's contents
+    mime, extension = FORMATS[fmt]
+    with tempfile.NamedTemporaryFile(suffix=extension, delete=False) as out:
+        path = out.name
+    try:
+        with st.spinner("Exporting..."):
+            with open(path, 'wb') as out:
+                rows = export(db, dataset, fmt, out, current_user['id'])
+        with open(path, 'rb') as exported:
+            st.download_button(
+                f"⬇️ Download {rows:,} rows",
+                data=exported,
+                file_name=f"nbp_{dataset}{extension}",
+                mime=mime,
+                use_container_width=True
+            )
+    except Exception as e:
+        st.error(f"❌ Export failed: {str(e)}")
+    finally:
+        os.unlink(path)
@@ -0,0 +1,134 @@
+"""Process-wide OpenAI clients with pooled keep-alive connections.
+
+Building an ``openai.OpenAI`` client creates a fresh HTTP connection
+pool, so a client per call (or per Streamlit rerun) pays for a new TCP
+and TLS handshake every time. ``get_openai_client`` returns one shared
+client for each API key and configuration. Every report generation in
+the process reuses its connections.
+
+The clients ignore proxy settings from the environment (``trust_env``
+off), which is what the old per-call environment juggling was for. A
+custom CA bundle, which would otherwise come from ``SSL_CERT_FILE``, can
+be passed as ``verify``.
+
+Clients are thread-safe. They are closed at interpreter exit or with
+``close_openai_clients()``.
+"""
+import atexit
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Union
+
+import httpx
+import openai
+
+DEFAULT_TIMEOUT = 60.0
+DEFAULT_MAX_RETRIES = 2
+# Connections kept open between requests, and for how long (seconds) an idle one is kept
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_KEEPALIVE = 10
+DEFAULT_KEEPALIVE_EXPIRY = 120.0
+
+
+@dataclass(frozen=True)
+class ClientConfig:
+    """Everything that distinguishes one shared client from another"""
+    api_key: str = field(repr=False)
+    base_url: Optional[str] = None
+    timeout: float = DEFAULT_TIMEOUT
+    max_retries: int = DEFAULT_MAX_RETRIES
+    max_connections: int = DEFAULT_MAX_CONNECTIONS
+    max_keepalive: int = DEFAULT_MAX_KEEPALIVE
+    keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY
+    verify: Union[bool, str] = True
+
+
+def _http_client_options(config: ClientConfig) -> Dict[str, Any]:
+    return {
+        'timeout': httpx.Timeout(config.timeout, connect=min(config.timeout, 10.0)),
+        'limits': httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive,
+            keepalive_expiry=config.keepalive_expiry
+        ),
+        'trust_env': False,
+        'verify': config.verify,
+    }
+
+
+def build_client(config: ClientConfig) -> openai.OpenAI:
+    """A new client with its own tuned connection pool (use get_openai_client to share one)"""
+    return openai.OpenAI(
+        api_key=config.api_key,
+        base_url=config.base_url,
+        max_retries=config.max_retries,
+        http_client=openai.DefaultHttpxClient(**_http_client_options(config))
+    )
+
+
+def build_async_client(config: ClientConfig) -> openai.AsyncOpenAI:
+    """A new asyncio client with the same pool settings.
+
+    Async connections belong to the event loop that opened them, so these
+    are not shared through the registry: create one per run and close it
+    before the loop ends.
+    """
+    return openai.AsyncOpenAI(
+        api_key=config.api_key,
+        base_url=config.base_url,
+        max_retries=config.max_retries,
+        http_client=openai.DefaultAsyncHttpxClient(**_http_client_options(config))
+    )
+
+
+class ClientRegistry:
+    """Shared clients keyed by ClientConfig"""
+
+    def __init__(self):
+        self._clients: Dict[ClientConfig, openai.OpenAI] = {}
+        self._lock = threading.Lock()
+        self._stats = {'created': 0, 'reused': 0}
+
+    def get(self, config: ClientConfig) -> openai.OpenAI:
+        client = self._clients.get(config)
+        if client is not None:
+            self._stats['reused'] += 1
+            return client
+        with self._lock:
+            client = self._clients.get(config)
+            if client is None:
+                client = build_client(config)
+                self._clients[config] = client
+                self._stats['created'] += 1
+            else:
+                self._stats['reused'] += 1
+            return client
+
+    def close(self):
+        """Close every client's connection pool"""
+        with self._lock:
+            clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            client.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {'clients': len(self._clients), **self._stats}
+
+
+_registry = ClientRegistry()
+atexit.register(_registry.close)
+
+
+def get_openai_client(api_key: str, base_url: Optional[str] = None, **options: Any) -> openai.OpenAI:
+    """The shared client for this API key and configuration (see ClientConfig for options)"""
+    return _registry.get(ClientConfig(api_key=api_key, base_url=base_url, **options))
+
+
+def close_openai_clients():
+    """Close all shared clients; later calls create new ones"""
+    _registry.close()
+
+
+def client_stats() -> Dict[str, Any]:
+    """How many shared clients exist and how often they were created or reused"""
+    return _registry.stats()
@@ -0,0 +1,308 @@
+"""Shared limiter for OpenAI requests per minute, tokens per minute and concurrency.
+
+Every report request, from the page (threads) or a batch job (asyncio
+tasks), takes a permit from the same ``RateLimiter`` before calling the
+API:
+
+- two token buckets hold the request and token budgets. A request's cost
+  is its estimated prompt tokens plus ``max_tokens``, and the unused part
+  is refunded once the response reports its actual usage
+- a concurrency limit adapts AIMD-style. It starts at
+  ``initial_concurrency`` and each success raises it by ``1/limit``, so
+  by about one per round of requests, up to ``max_concurrency``. A 429
+  multiplies it by ``decrease_factor`` (a half). This happens at most once
+  per ``decrease_interval``, so one burst of 429s counts once
+- a 429's ``Retry-After`` (or ``retry-after-ms``) pauses every caller
+  until it has passed, and the request is retried. A 429 for an exhausted
+  quota (``insufficient_quota``) is raised at once instead: waiting does
+  not clear it
+
+Clients used through the limiter should have ``max_retries=0``. Otherwise
+the client retries 429s itself and the limiter never sees them.
+
+The process-wide limiter comes from ``get_rate_limiter()`` and is sized
+by ``NBP_OPENAI_RPM``, ``NBP_OPENAI_TPM`` and
+``NBP_OPENAI_MAX_CONCURRENCY``.
+"""
+import asyncio
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import openai
+
+DEFAULT_RPM = int(os.getenv('NBP_OPENAI_RPM', '500'))
+DEFAULT_TPM = int(os.getenv('NBP_OPENAI_TPM', '200000'))
+DEFAULT_MAX_CONCURRENCY = int(os.getenv('NBP_OPENAI_MAX_CONCURRENCY', '16'))
+# Start low and grow: opening at the maximum sends a burst of 429s first
+DEFAULT_INITIAL_CONCURRENCY = 4
+DEFAULT_ATTEMPTS = 5
+# Pause after a 429 that carries no Retry-After
+DEFAULT_RETRY_AFTER = 1.0
+
+# Rough chat token accounting: ~4 characters per token plus per-message framing
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+REPLY_PRIMING_TOKENS = 3
+
+
+def estimate_tokens(messages: List[Dict[str, Any]], max_tokens: int = 0) -> int:
+    """Upper-bound token cost of a chat request: its prompt plus the reply budget"""
+    prompt = REPLY_PRIMING_TOKENS
+    for message in messages:
+        prompt += MESSAGE_OVERHEAD_TOKENS + math.ceil(len(str(message.get('content') or '')) / CHARS_PER_TOKEN)
+    return prompt + (max_tokens or 0)
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds a 429 asks us to wait, from retry-after-ms or retry-after (None if absent)"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    for header, divisor in (('retry-after-ms', 1000), ('retry-after', 1)):
+        value = headers.get(header)
+        if value is None:
+            continue
+        try:
+            return max(0.0, float(value) / divisor)
+        except ValueError:
+            continue
+    return None
+
+
+def quota_exhausted(error: Exception) -> bool:
+    """True for the 429 OpenAI sends when the account is out of credit"""
+    return getattr(error, 'code', None) == 'insufficient_quota'
+
+
+def usage_tokens(result: Any) -> Optional[int]:
+    """total_tokens of a completion, or of a usage object returned directly"""
+    usage = getattr(result, 'usage', result)
+    return getattr(usage, 'total_tokens', None)
+
+
+class TokenBucket:
+    """Capacity refilled continuously over one minute; not thread-safe on its own"""
+
+    def __init__(self, per_minute: float, now: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = now
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, amount: float) -> float:
+        """Seconds until amount is available (a request larger than capacity waits for a full bucket)"""
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate) if self.rate else math.inf
+
+
+@dataclass
+class Permit:
+    """A granted request: what it reserved from the token budget"""
+    tokens: int
+    granted_at: float
+
+
+class RateLimiter:
+    """Token-bucket RPM/TPM limits with an AIMD concurrency limit, shared by threads and event loops"""
+
+    def __init__(self, rpm: int = DEFAULT_RPM, tpm: int = DEFAULT_TPM,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY, min_concurrency: int = 1,
+                 initial_concurrency: Optional[int] = None, decrease_factor: float = 0.5,
+                 decrease_interval: float = 1.0):
+        now = time.monotonic()
+        self.requests = TokenBucket(rpm, now)
+        self.tokens = TokenBucket(tpm, now)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit = float(min(initial_concurrency or DEFAULT_INITIAL_CONCURRENCY, max_concurrency))
+        self.decrease_factor = decrease_factor
+        self.decrease_interval = decrease_interval
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        # Event loop futures waiting for a slot; woken on every release
+        self._async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._stats = {'granted': 0, 'waited': 0, 'wait_time': 0.0, 'rate_limited': 0,
+                       'decreases': 0, 'tokens_refunded': 0}
+
+    # Granting
+    def _try_grant(self, tokens: int) -> Tuple[Optional[Permit], Optional[float]]:
+        """A permit now, or how long to wait before trying again (None: wait for a release)"""
+        now = time.monotonic()
+        if now < self.paused_until:
+            return None, self.paused_until - now
+        if self.in_flight >= int(self.limit):
+            return None, None
+        self.requests.refill(now)
+        self.tokens.refill(now)
+        wait = max(self.requests.wait_for(1), self.tokens.wait_for(tokens))
+        if wait > 0:
+            return None, wait
+        self.requests.level -= 1
+        self.tokens.level -= tokens
+        self.in_flight += 1
+        self._stats['granted'] += 1
+        return Permit(tokens, now), 0.0
+
+    def acquire(self, tokens: int) -> Permit:
+        """Block the calling thread until a request costing `tokens` may be sent"""
+        started = time.monotonic()
+        with self._changed:
+            while True:
+                permit, wait = self._try_grant(tokens)
+                if permit is not None:
+                    self._record_wait(started)
+                    return permit
+                self._changed.wait(wait)
+
+    async def acquire_async(self, tokens: int) -> Permit:
+        """Wait without blocking the event loop until a request costing `tokens` may be sent"""
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                permit, wait = self._try_grant(tokens)
+                if permit is not None:
+                    self._record_wait(started)
+                    return permit
+                future = loop.create_future()
+                self._async_waiters.append((loop, future))
+            try:
+                await asyncio.wait_for(future, wait)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                with self._lock:
+                    if (loop, future) in self._async_waiters:
+                        self._async_waiters.remove((loop, future))
+
+    def _record_wait(self, started: float):
+        waited = time.monotonic() - started
+        if waited > 0.001:
+            self._stats['waited'] += 1
+            self._stats['wait_time'] += waited
+
+    # Settling
+    def release(self, permit: Permit, tokens_used: Optional[int] = None, rate_limited: bool = False,
+                retry_after: Optional[float] = None):
+        """Return a permit with the request's outcome, adapting the limits"""
+        with self._changed:
+            now = time.monotonic()
+            self.in_flight -= 1
+            if rate_limited:
+                self._stats['rate_limited'] += 1
+                self.paused_until = max(self.paused_until, now + (retry_after or DEFAULT_RETRY_AFTER))
+                # A 429 response consumed no tokens
+                self._refund(permit.tokens, now)
+                if now - self._last_decrease >= self.decrease_interval:
+                    self.limit = max(float(self.min_concurrency), self.limit * self.decrease_factor)
+                    self._last_decrease = now
+                    self._stats['decreases'] += 1
+            else:
+                if tokens_used is not None and tokens_used < permit.tokens:
+                    self._refund(permit.tokens - tokens_used, now)
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+            self._changed.notify_all()
+            waiters, self._async_waiters = self._async_waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_wake, future)
+
+    def _refund(self, tokens: int, now: float):
+        self.tokens.refill(now)
+        self.tokens.level = min(self.tokens.capacity, self.tokens.level + tokens)
+        self._stats['tokens_refunded'] += tokens
+
+    # Calling through the limiter
+    def call(self, func: Callable[[], Any], tokens: int, attempts: int = DEFAULT_ATTEMPTS,
+             count_tokens: Callable[[Any], Optional[int]] = usage_tokens) -> Any:
+        """Run func() under a permit, retrying 429s after their Retry-After; the last 429 is raised"""
+        for attempt in range(attempts):
+            permit = self.acquire(tokens)
+            try:
+                result = func()
+            except openai.RateLimitError as e:
+                if quota_exhausted(e):
+                    # A billing problem, not load: no tokens spent, no pause, no retry
+                    self.release(permit, tokens_used=0)
+                    raise
+                self.release(permit, rate_limited=True, retry_after=retry_after(e))
+                if attempt == attempts - 1:
+                    raise
+                continue
+            except BaseException:
+                self.release(permit)
+                raise
+            self.release(permit, tokens_used=count_tokens(result))
+            return result
+
+    async def call_async(self, func: Callable[[], Awaitable[Any]], tokens: int, attempts: int = DEFAULT_ATTEMPTS,
+                         count_tokens: Callable[[Any], Optional[int]] = usage_tokens) -> Any:
+        """call() for coroutines: await func() under a permit, retrying 429s"""
+        for attempt in range(attempts):
+            permit = await self.acquire_async(tokens)
+            try:
+                result = await func()
+            except openai.RateLimitError as e:
+                if quota_exhausted(e):
+                    # A billing problem, not load: no tokens spent, no pause, no retry
+                    self.release(permit, tokens_used=0)
+                    raise
+                self.release(permit, rate_limited=True, retry_after=retry_after(e))
+                if attempt == attempts - 1:
+                    raise
+                continue
+            except BaseException:
+                self.release(permit)
+                raise
+            self.release(permit, tokens_used=count_tokens(result))
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            return {
+                **self._stats,
+                'concurrency_limit': round(self.limit, 2),
+                'in_flight': self.in_flight,
+                'requests_available': int(self.requests.level),
+                'tokens_available': int(self.tokens.level),
+                'paused_for': max(0.0, self.paused_until - now),
+            }
+
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """The limiter every OpenAI request in this process shares"""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter()
+    return _limiter
+
+
+def configure_rate_limiter(**options: Any) -> RateLimiter:
+    """Replace the shared limiter (see RateLimiter for options); requests already waiting keep the old one"""
+    global _limiter
+    with _limiter_lock:
+        _limiter = RateLimiter(**options)
+    return _limiter
@@ -1,9 +1,10 @@
+import sqlite3
 import streamlit as st
-import pandas as pd
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from database.models import db
 from auth import get_current_user
+from components.validation import validate_prospect_form
 
 # Meeting objectives
 MEETING_OBJECTIVES = [
@@ -183,99 +184,147 @@ def simple_prospect_component():
                 st.error("Please fill in all required fields (marked with *)")
                 return
             
+            # Create prospect data
+            prospect_data = {
+                'company_name': company_name,
+                'website': website,
+                'industry': industry,
+                'company_size': company_size,
+                'meeting_objective': meeting_objective,
+                'context': context
+            }
+            
+            # Primary contact
+            contact_data = {
+                'contact_name': primary_contact_name,
+                'title': primary_title,
+                'email': primary_email,
+                'phone': primary_phone,
+                'is_primary': True
+            }
+            
+            # Look for likely duplicates before saving, so the rep can open the existing record instead
+            st.session_state.pop('pending_prospect', None)
             try:
-                # Create prospect data
-                prospect_data = {
-                    'company_name': company_name,
-                    'website': website,
-                    'industry': industry,
-                    'company_size': company_size,
-                    'meeting_objective': meeting_objective,
-                    'context': context
-                }
-                
-                # Save prospect to database
-                prospect_id = db.create_prospect(current_user['id'], prospect_data)
-                
-                # Create primary contact
-                contact_data = {
-                    'contact_name': primary_contact_name,
-                    'title': primary_title,
-                    'email': primary_email,
-                    'phone': primary_phone,
-                    'is_primary': True
-                }
-                
-                db.create_contact(prospect_id, contact_data)
-                
-                # Success message with enhanced styling
-                st.markdown(f"""
-                <div class="success-message">
-                    <h4>✅ Prospect Created Successfully!</h4>
-                    <p><strong>{company_name}</strong> has been added to your prospects.</p>
-                    <p><strong>Meeting Objective:</strong> {meeting_objective}</p>
-                    <p><strong>Primary Contact:</strong> {primary_contact_name} ({primary_email})</p>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Store prospect info for AI report generation
-                st.session_state.current_prospect = {
-                    'id': prospect_id,
-                    'company_name': company_name,
-                    'industry': industry,
-                    'meeting_objective': meeting_objective,
-                    'primary_contact': primary_contact_name,
-                    'context': context
-                }
-                
-                # Next steps with enhanced design
-                st.markdown("""
-                <div class="red-bg-text" style="background: linear-gradient(135deg, #28a745 0%, #20c997 100%); 
-                            color: white; padding: 2rem; border-radius: 15px; margin: 2rem 0; 
-                            box-shadow: 0 8px 25px rgba(40,167,69,0.3); border: 2px solid #28a745;">
-                    <h3 style="margin: 0 0 1rem 0; display: flex; align-items: center; gap: 0.5rem; color: white;">
-                        🚀 Next Steps
-                    </h3>
-                    <div style="display: grid; gap: 1rem;">
-                        <div style="display: flex; align-items: center; gap: 0.8rem;">
-                            <div style="background: rgba(255,255,255,0.2); padding: 0.5rem; border-radius: 50%;">1</div>
-                            <div style="color: white;"><strong>Generate AI Report:</strong> Go to 'AI Report Generation' to create a personalized NBP report</div>
-                        </div>
-                        <div style="display: flex; align-items: center; gap: 0.8rem;">
-                            <div style="background: rgba(255,255,255,0.2); padding: 0.5rem; border-radius: 50%;">2</div>
-                            <div style="color: white;"><strong>Review Prospect:</strong> All prospect information has been saved to the database</div>
-                        </div>
-                        <div style="display: flex; align-items: center; gap: 0.8rem;">
-                            <div style="background: rgba(255,255,255,0.2); padding: 0.5rem; border-radius: 50%;">3</div>
-                            <div style="color: white;"><strong>Follow Up:</strong> Use the generated report for your meeting preparation</div>
-                        </div>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Auto-navigate to AI Report Generation
-                st.session_state.page = "AI Report Generation"
-                st.rerun()
-                
-            except Exception as e:
-                st.error(f"❌ Error creating prospect: {str(e)}")
+                duplicates = db.find_duplicate_prospects(current_user['id'], company_name, website)
+            except sqlite3.Error:
+                duplicates = []  # the check is advisory; never block a save on it
+            
+            if not duplicates:
+                create_prospect(current_user, prospect_data, contact_data)
+                return
+            st.session_state.pending_prospect = {
+                'prospect': prospect_data,
+                'contact': contact_data,
+                'duplicates': duplicates
+            }
+    
+    # Outside the form, so the choice survives the rerun a button click causes
+    pending = st.session_state.get('pending_prospect')
+    if pending:
+        duplicate_choice(current_user, pending)
 
-def validate_prospect_form(company_name: str, meeting_objective: str, primary_contact_name: str, primary_email: str) -> List[str]:
-    """Validate prospect form data"""
-    errors = []
+def duplicate_choice(current_user: Dict[str, Any], pending: Dict[str, Any]):
+    """Let the rep open a likely duplicate or create the new prospect anyway"""
+    st.warning(
+        "⚠️ This prospect may already exist:\n\n" + "\n".join(
+            f"- **{match['company_name']}** ({match['reason']}, added {match['created_at']})"
+            for match in pending['duplicates']
+        )
+    )
     
-    if not company_name.strip():
-        errors.append("Company name is required")
+    columns = st.columns(len(pending['duplicates']) + 1)
+    for column, match in zip(columns, pending['duplicates']):
+        with column:
+            if st.button(f"📂 Open {match['company_name']}", key=f"open_existing_{match['id']}",
+                         use_container_width=True):
+                del st.session_state.pending_prospect
+                open_prospect(match['id'])
+    with columns[-1]:
+        if st.button("➕ Create anyway", key="create_anyway", use_container_width=True):
+            del st.session_state.pending_prospect
+            create_prospect(current_user, pending['prospect'], pending['contact'])
+
+def open_prospect(prospect_id: int):
+    """Select an existing prospect and continue to AI report generation"""
+    prospect = db.get_prospect_by_id(prospect_id)
+    if prospect is None:
+        st.error("❌ That prospect no longer exists.")
+        return
+    contacts = db.get_prospect_contacts(prospect_id)
+    primary = next((contact for contact in contacts if contact['is_primary']), None)
+    if primary is None and len(contacts):
+        primary = contacts[0]
     
-    if not meeting_objective:
-        errors.append("Meeting objective is required")
+    st.session_state.current_prospect = {
+        'id': prospect['id'],
+        'company_name': prospect['company_name'],
+        'industry': prospect['industry'],
+        'meeting_objective': prospect['meeting_objective'],
+        'primary_contact': primary['contact_name'] if primary is not None else '',
+        'context': prospect['context'] or ''
+    }
+    st.session_state.page = "AI Report Generation"
+    st.rerun()
+
+def create_prospect(current_user: Dict[str, Any], prospect_data: Dict[str, Any], contact_data: Dict[str, Any]):
+    """Save a new prospect with its primary contact and continue to AI report generation"""
+    try:
+        # Save prospect and primary contact in one transaction
+        prospect_id = db.create_prospect_with_contacts(current_user['id'], prospect_data, [contact_data])
+    except sqlite3.IntegrityError:
+        # Foreign keys are enforced, so this means the signed-in user has no users row
+        st.error("❌ Your account could not be found in the database. Please sign out and sign in again.")
+        return
+    except Exception as e:
+        st.error(f"❌ Error creating prospect: {str(e)}")
+        return
     
-    if not primary_contact_name.strip():
-        errors.append("Primary contact name is required")
+    # Success message with enhanced styling
+    st.markdown(f"""
+    <div class="success-message">
+        <h4>✅ Prospect Created Successfully!</h4>
+        <p><strong>{prospect_data['company_name']}</strong> has been added to your prospects.</p>
+        <p><strong>Meeting Objective:</strong> {prospect_data['meeting_objective']}</p>
+        <p><strong>Primary Contact:</strong> {contact_data['contact_name']} ({contact_data['email']})</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Store prospect info for AI report generation
+    st.session_state.current_prospect = {
+        'id': prospect_id,
+        'company_name': prospect_data['company_name'],
+        'industry': prospect_data['industry'],
+        'meeting_objective': prospect_data['meeting_objective'],
+        'primary_contact': contact_data['contact_name'],
+        'context': prospect_data['context']
+    }
     
-    if not primary_email.strip():
-        errors.append("Primary contact email is required")
-    elif '@' not in primary_email:
-        errors.append("Please enter a valid email address")
+    # Next steps with enhanced design
+    st.markdown("""
+    <div class="red-bg-text" style="background: linear-gradient(135deg, #28a745 0%, #20c997 100%); 
+                color: white; padding: 2rem; border-radius: 15px; margin: 2rem 0; 
+                box-shadow: 0 8px 25px rgba(40,167,69,0.3); border: 2px solid #28a745;">
+        <h3 style="margin: 0 0 1rem 0; display: flex; align-items: center; gap: 0.5rem; color: white;">
+            🚀 Next Steps
+        </h3>
+        <div style="display: grid; gap: 1rem;">
+            <div style="display: flex; align-items: center; gap: 0.8rem;">
+                <div style="background: rgba(255,255,255,0.2); padding: 0.5rem; border-radius: 50%;">1</div>
+                <div style="color: white;"><strong>Generate AI Report:</strong> Go to 'AI Report Generation' to create a personalized NBP report</div>
+            </div>
+            <div style="display: flex; align-items: center; gap: 0.8rem;">
+                <div style="background: rgba(255,255,255,0.2); padding: 0.5rem; border-radius: 50%;">2</div>
+                <div style="color: white;"><strong>Review Prospect:</strong> All prospect information has been saved to the database</div>
+            </div>
+            <div style="display: flex; align-items: center; gap: 0.8rem;">
+                <div style="background: rgba(255,255,255,0.2); padding: 0.5rem; border-radius: 50%;">3</div>
+                <div style="color: white;"><strong>Follow Up:</strong> Use the generated report for your meeting preparation</div>
+            </div>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
     
-    return errors 
\ No newline at end of file
+    # Auto-navigate to AI Report Generation
+    st.session_state.page = "AI Report Generation"
+    st.rerun()
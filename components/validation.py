@@ -0,0 +1,22 @@
+from typing import List
+
+
+def validate_prospect_form(company_name: str, meeting_objective: str, primary_contact_name: str, primary_email: str) -> List[str]:
+    """Validate prospect form data"""
+    errors = []
+    
+    if not company_name.strip():
+        errors.append("Company name is required")
+    
+    if not meeting_objective:
+        errors.append("Meeting objective is required")
+    
+    if not primary_contact_name.strip():
+        errors.append("Primary contact name is required")
+    
+    if not primary_email.strip():
+        errors.append("Primary contact email is required")
+    elif '@' not in primary_email:
+        errors.append("Please enter a valid email address")
+    
+    return errors
@@ -0,0 +1,314 @@
+"""Asyncio facade over DatabaseManager.
+
+SQLite calls block, so coroutines must not make them on the event loop.
+``AsyncDatabaseManager`` exposes the same CRUD, search and statistics
+methods as awaitables. Reads run on a pool of reader threads, which WAL lets
+proceed alongside the writer. Writes go to a single writer thread: SQLite
+allows one writer at a time anyway, and queueing them in Python costs less
+than making them wait on the busy timeout. The writer also commits the
+writes that queued up behind each other in one transaction, each under its
+own savepoint so a failing call is rolled back alone. Callers are answered
+only after that commit.
+
+At most ``max_pending`` calls may be queued or running at once. Callers
+beyond that wait on a semaphore rather than piling work onto the threads,
+which keeps memory and latency bounded when requests arrive faster than the
+database drains them.
+
+    adb = AsyncDatabaseManager()
+    prospects = await adb.get_user_prospects(user_id)
+    await adb.aclose()
+"""
+import asyncio
+import functools
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from .models import DatabaseManager
+from .rows import RowSet
+
+
+def _read(name: str) -> Callable:
+    method = getattr(DatabaseManager, name)
+
+    @functools.wraps(method)
+    async def call(self, *args, **kwargs):
+        return await self._submit(self._readers, getattr(self.db, name), args, kwargs)
+    return call
+
+
+def _write(name: str, batch: bool = True) -> Callable:
+    method = getattr(DatabaseManager, name)
+
+    @functools.wraps(method)
+    async def call(self, *args, **kwargs):
+        return await self._submit(self._writer, getattr(self.db, name), args, kwargs, batch=batch)
+    return call
+
+
+def _iterate(name: str) -> Callable:
+    method = getattr(DatabaseManager, name)
+
+    @functools.wraps(method)
+    async def call(self, *args, **kwargs) -> AsyncIterator[RowSet]:
+        pages = getattr(self.db, name)(*args, **kwargs)
+        while True:
+            page = await self._submit(self._readers, next, (pages, None), {})
+            if page is None:
+                return
+            yield page
+    return call
+
+
+class _WriteJob:
+    __slots__ = ('func', 'batch', 'future')
+
+    def __init__(self, func: Callable[[], Any], batch: bool):
+        self.func = func
+        self.batch = batch
+        self.future: Future = Future()
+
+
+class _Writer:
+    """Single writer thread that group-commits queued write calls"""
+
+    def __init__(self, db: DatabaseManager, max_batch: int):
+        self.db = db
+        self.max_batch = max_batch
+        self._queue: 'queue.Queue[Optional[_WriteJob]]' = queue.Queue()
+        self._counters = {'transactions': 0, 'writes': 0, 'largest_batch': 0}
+        self._thread = threading.Thread(target=self._loop, name='db-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, func: Callable[[], Any], batch: bool = True) -> Future:
+        job = _WriteJob(func, batch)
+        self._queue.put(job)
+        return job.future
+
+    def _loop(self):
+        carried: Optional[_WriteJob] = None
+        while True:
+            job = carried or self._queue.get()
+            carried = None
+            if job is None:
+                return
+            if not job.batch:
+                # Maintenance-style calls manage their own transactions
+                self._run_alone(job)
+                continue
+
+            jobs = [job]
+            while len(jobs) < self.max_batch:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None or not job.batch:
+                    carried = job
+                    break
+                jobs.append(job)
+            self._run_batch(jobs)
+
+    def _run_alone(self, job: _WriteJob):
+        try:
+            job.future.set_result(job.func())
+        except BaseException as e:
+            job.future.set_exception(e)
+
+    def _run_batch(self, jobs: List[_WriteJob]):
+        outcomes = []
+        conn = self.db.get_connection()
+        try:
+            if not conn.in_transaction:
+                conn.execute('BEGIN IMMEDIATE')
+            for job in jobs:
+                conn.execute('SAVEPOINT write_job')
+                try:
+                    outcomes.append((True, job.func()))
+                except Exception as e:
+                    conn.execute('ROLLBACK TO write_job')
+                    outcomes.append((False, e))
+                conn.execute('RELEASE write_job')
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            outcomes = [(False, e)] * len(jobs)
+        finally:
+            conn.close()
+
+        # The methods dropped their cache keys before this commit; a reader may
+        # have cached the old row since, so apply the change log once more
+        self.db.invalidation.poll(force=True)
+        self._counters['transactions'] += 1
+        self._counters['writes'] += len(jobs)
+        self._counters['largest_batch'] = max(self._counters['largest_batch'], len(jobs))
+        for job, (ok, value) in zip(jobs, outcomes):
+            if ok:
+                job.future.set_result(value)
+            else:
+                job.future.set_exception(value)
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self._counters)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+
+class AsyncDatabaseManager:
+    """Awaitable DatabaseManager backed by one writer thread and a pool of reader threads"""
+
+    def __init__(self, db: Optional[DatabaseManager] = None, readers: int = 4,
+                 max_pending: int = 64, max_batch: int = 64, **manager_options):
+        if db is None:
+            # Readers, the writer and the analytics and maintenance threads each hold a connection
+            manager_options.setdefault('pool_size', readers + 3)
+            db = DatabaseManager(**manager_options)
+            self._owns_db = True
+        else:
+            self._owns_db = False
+        self.db = db
+        self.max_pending = max_pending
+        self._writer = _Writer(db, max_batch)
+        self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix='db-reader')
+        # One semaphore per event loop, created on first use inside it
+        self._slots: Dict[int, asyncio.Semaphore] = {}
+        self._lock = threading.Lock()
+        self._counters = {'calls': 0, 'waited': 0, 'pending': 0, 'peak_pending': 0, 'wait_time': 0.0}
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            slots = self._slots.get(id(loop))
+            if slots is None:
+                slots = self._slots[id(loop)] = asyncio.Semaphore(self.max_pending)
+            return slots
+
+    async def _submit(self, executor, func: Callable, args, kwargs, batch: bool = True) -> Any:
+        slots = self._semaphore()
+        if slots.locked():
+            self._counters['waited'] += 1
+            started = time.perf_counter()
+            await slots.acquire()
+            self._counters['wait_time'] += time.perf_counter() - started
+        else:
+            await slots.acquire()
+        self._counters['calls'] += 1
+        self._counters['pending'] += 1
+        self._counters['peak_pending'] = max(self._counters['peak_pending'], self._counters['pending'])
+        try:
+            call = functools.partial(func, *args, **kwargs)
+            if executor is self._writer:
+                return await asyncio.wrap_future(self._writer.submit(call, batch))
+            return await asyncio.get_running_loop().run_in_executor(executor, call)
+        finally:
+            self._counters['pending'] -= 1
+            slots.release()
+
+    async def read(self, func: Callable[[DatabaseManager], Any]) -> Any:
+        """Run func(db) on a reader thread; several reads in one call cost a single thread hop"""
+        return await self._submit(self._readers, func, (self.db,), {})
+
+    async def write(self, func: Callable[[DatabaseManager], Any]) -> Any:
+        """Run func(db) on the writer thread, committed along with the other queued writes"""
+        return await self._submit(self._writer, func, (self.db,), {})
+
+    # Users
+    create_user = _write('create_user')
+    ensure_user = _write('ensure_user')
+    get_user_by_username = _read('get_user_by_username')
+    get_user_by_id = _read('get_user_by_id')
+
+    # Prospects
+    create_prospect = _write('create_prospect')
+    create_prospect_with_contacts = _write('create_prospect_with_contacts')
+    create_prospects_with_contacts = _write('create_prospects_with_contacts')
+    get_user_prospects = _read('get_user_prospects')
+    iter_user_prospects = _iterate('iter_user_prospects')
+    get_prospect_by_id = _read('get_prospect_by_id')
+    update_prospect = _write('update_prospect')
+    find_duplicate_prospects = _read('find_duplicate_prospects')
+    find_exact_duplicate_prospects = _read('find_exact_duplicate_prospects')
+    delete_prospect = _write('delete_prospect')
+
+    # Contacts
+    create_contact = _write('create_contact')
+    get_prospect_contacts = _read('get_prospect_contacts')
+    update_contact = _write('update_contact')
+    delete_contact = _write('delete_contact')
+
+    # Generated scripts
+    create_generated_script = _write('create_generated_script')
+    create_generated_scripts = _write('create_generated_scripts')
+    get_prospect_scripts = _read('get_prospect_scripts')
+    get_user_scripts = _read('get_user_scripts')
+    iter_user_scripts = _iterate('iter_user_scripts')
+    get_generated_scripts = _read('get_generated_scripts')
+    iter_generated_scripts = _iterate('iter_generated_scripts')
+    get_script_storage_stats = _read('get_script_storage_stats')
+
+    # AI response cache
+    get_cached_ai_response = _read('get_cached_ai_response')
+    cache_ai_response = _write('cache_ai_response')
+    flush_ai_cache_usage = _write('flush_ai_cache_usage')
+    evict_ai_response_cache = _write('evict_ai_response_cache', batch=False)
+    clear_ai_response_cache = _write('clear_ai_response_cache', batch=False)
+    get_ai_cache_stats = _read('get_ai_cache_stats')
+
+    # Search
+    search = _read('search')
+    optimize_search = _write('optimize_search', batch=False)
+
+    # Analytics
+    get_user_analytics = _read('get_user_analytics')
+    iter_user_analytics = _iterate('iter_user_analytics')
+    roll_up_analytics = _write('roll_up_analytics', batch=False)
+    run_analytics_maintenance = _write('run_analytics_maintenance', batch=False)
+    get_user_activity_summary = _read('get_user_activity_summary')
+    get_user_action_totals = _read('get_user_action_totals')
+
+    # Statistics and maintenance
+    get_user_statistics = _read('get_user_statistics')
+    get_database_stats = _read('get_database_stats')
+    run_maintenance = _write('run_maintenance', batch=False)
+    get_maintenance_runs = _read('get_maintenance_runs')
+    rebuild_counters = _write('rebuild_counters', batch=False)
+    verify_counters = _read('verify_counters')
+
+    def log_analytics(self, user_id: int, action_type: str, action_data: Optional[str] = None) -> bool:
+        """Queue an analytics event (never blocks, so no await needed)"""
+        return self.db.log_analytics(user_id, action_type, action_data)
+
+    def record_ai_cache_bypass(self):
+        """Count a forced regeneration (in memory, so no await needed)"""
+        self.db.record_ai_cache_bypass()
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get the in-process cache statistics (in memory, so no await needed)"""
+        return self.db.get_cache_stats()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get call, backpressure wait, queue depth and group-commit counters"""
+        return {'max_pending': self.max_pending, **self._counters, 'writer': self._writer.stats()}
+
+    async def aclose(self):
+        """Wait for queued calls, stop the threads and close the manager if this facade created it"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.close)
+
+    def close(self):
+        """Blocking counterpart of aclose() for synchronous shutdown code"""
+        self._writer.close()
+        self._readers.shutdown(wait=True)
+        if self._owns_db:
+            self.db.close()
+
+    async def __aenter__(self) -> 'AsyncDatabaseManager':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
@@ -0,0 +1,152 @@
+import atexit
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from .analytics_store import Event, insert_events
+
+if TYPE_CHECKING:
+    from .models import DatabaseManager
+
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+
+
+class AnalyticsSink:
+    """Buffered, asynchronous writer for analytics events.
+
+    ``log()`` only appends to an in-memory queue, so it never waits on SQLite.
+    A background thread writes queued events to their monthly partitions,
+    one transaction per batch, whenever ``batch_size`` events are waiting or
+    ``flush_interval`` seconds have passed, and once more at shutdown. The queue
+    holds at most ``max_queue`` events; beyond that the drop policy discards
+    either the oldest queued event or the new one.
+    """
+
+    def __init__(self, db: 'DatabaseManager', batch_size: int = 200, flush_interval: float = 2.0,
+                 max_queue: int = 10000, drop_policy: str = DROP_OLDEST):
+        if drop_policy not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"drop_policy must be '{DROP_OLDEST}' or '{DROP_NEWEST}'")
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.drop_policy = drop_policy
+
+        self._queue: deque = deque()
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._counters = {'enqueued': 0, 'flushed': 0, 'dropped': 0, 'failed': 0, 'batches': 0}
+
+    def log(self, user_id: int, action_type: str, action_data: Optional[str] = None) -> bool:
+        """Queue an event; returns False if the drop policy discarded it"""
+        # Stamp the event now in the same UTC format as CURRENT_TIMESTAMP
+        created_at = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        event = (user_id, action_type, action_data, created_at)
+
+        with self._cond:
+            if self._stopping:
+                self._counters['dropped'] += 1
+                return False
+            if len(self._queue) >= self.max_queue:
+                self._counters['dropped'] += 1
+                if self.drop_policy == DROP_NEWEST:
+                    return False
+                self._queue.popleft()
+            self._queue.append(event)
+            self._counters['enqueued'] += 1
+            if len(self._queue) >= self.batch_size:
+                self._cond.notify()
+
+        if self._thread is None:
+            self._start()
+        return True
+
+    def _start(self):
+        with self._cond:
+            if self._thread is not None or self._stopping:
+                return
+            self._thread = threading.Thread(target=self._run, name='analytics-sink', daemon=True)
+            self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                while not self._stopping and len(self._queue) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                stopping = self._stopping
+            self.flush()
+            if stopping:
+                return
+
+    def flush(self) -> int:
+        """Write every queued event now and return how many were written"""
+        written = 0
+        # One writer at a time keeps batches in arrival order
+        with self._write_lock:
+            while True:
+                # Take everything queued so a backlog still costs one commit
+                with self._cond:
+                    batch = list(self._queue)
+                    self._queue.clear()
+                if not batch:
+                    return written
+                try:
+                    with self.db.connection() as conn:
+                        insert_events(conn, batch)
+                except sqlite3.IntegrityError:
+                    # An event for a user that does not exist fails the whole
+                    # batch; write the events one by one so only it is lost
+                    written += self._write_each(batch)
+                    continue
+                except sqlite3.Error as e:
+                    with self._cond:
+                        self._counters['failed'] += len(batch)
+                    print(f"Error writing analytics batch: {e}")
+                    return written
+                written += len(batch)
+                with self._cond:
+                    self._counters['flushed'] += len(batch)
+                    self._counters['batches'] += 1
+
+    def _write_each(self, batch: List[Event]) -> int:
+        """Write events in separate transactions, skipping those that fail; returns the number written"""
+        written = 0
+        for event in batch:
+            try:
+                with self.db.connection() as conn:
+                    insert_events(conn, [event])
+                written += 1
+            except sqlite3.Error as e:
+                with self._cond:
+                    self._counters['failed'] += 1
+                print(f"Error writing analytics event {event[1]!r} for user {event[0]}: {e}")
+        with self._cond:
+            self._counters['flushed'] += written
+            self._counters['batches'] += 1
+        return written
+
+    def close(self, timeout: float = 10.0):
+        """Stop the background thread after a final flush"""
+        with self._cond:
+            self._stopping = True
+            thread = self._thread
+            self._cond.notify_all()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get queue depth and enqueued/flushed/dropped/failed counters"""
+        with self._cond:
+            return {'pending': len(self._queue), **self._counters}
@@ -0,0 +1,277 @@
+"""Monthly-partitioned analytics storage with daily rollups and retention.
+
+Raw events live in one table per calendar month (``analytics_2026_10``),
+listed in ``analytics_partitions``. ``analytics`` is a read-only UNION ALL
+view over every partition, rebuilt whenever one is added or dropped, so
+existing readers keep working; writers go through ``insert_events``.
+
+``roll_up`` folds raw events into ``analytics_daily`` (one count per user,
+day and action type) and ``apply_retention`` drops whole partitions older
+than the retention window once they have been rolled up. Dashboards read
+the rollups, which are kept indefinitely.
+
+    python -m database.analytics_store [--db nbp_sales.db] [--retention-days 365]
+"""
+import argparse
+import sqlite3
+from datetime import date, datetime, timedelta, timezone
+from itertools import groupby
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+ANALYTICS_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS analytics_partitions (
+    month TEXT PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS analytics_daily (
+    user_id INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    action_type TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (user_id, day, action_type)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS analytics_rollup_state (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    last_day TEXT NOT NULL
+);
+'''
+
+_COLUMNS = 'id, user_id, action_type, action_data, created_at'
+
+_PARTITION_TABLE = '''
+    CREATE TABLE IF NOT EXISTS {name} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        action_type TEXT NOT NULL,
+        action_data TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )
+'''
+
+Event = Tuple[Optional[int], str, Optional[str], str]
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def month_of(created_at: str) -> str:
+    """Get the 'YYYY-MM' partition key for a 'YYYY-MM-DD HH:MM:SS' timestamp"""
+    return created_at[:7]
+
+
+def partition_name(month: str) -> str:
+    """Get the table name of the partition holding a 'YYYY-MM' month"""
+    year, mon = month.split('-')
+    if not (year.isdigit() and mon.isdigit() and len(year) == 4 and len(mon) == 2):
+        raise ValueError(f"Invalid analytics month: {month!r}")
+    return f'analytics_{year}_{mon}'
+
+
+def _next_month(month: str) -> date:
+    year, mon = (int(part) for part in month.split('-'))
+    return date(year + mon // 12, mon % 12 + 1, 1)
+
+
+def list_partitions(conn: sqlite3.Connection) -> List[Tuple[str, str]]:
+    """Get (month, table name) for every partition, oldest first"""
+    return conn.execute('SELECT month, name FROM analytics_partitions ORDER BY month').fetchall()
+
+
+def _top_id(conn: sqlite3.Connection) -> int:
+    """Highest event id handed out by any partition"""
+    row = conn.execute('''
+        SELECT MAX(seq) FROM sqlite_sequence
+        WHERE name IN (SELECT name FROM analytics_partitions)
+    ''').fetchone()
+    return row[0] or 0
+
+
+def rebuild_view(conn: sqlite3.Connection):
+    """Recreate the ``analytics`` view over the current set of partitions"""
+    names = [name for _, name in list_partitions(conn)]
+    conn.execute('DROP VIEW IF EXISTS analytics')
+    if names:
+        body = '\nUNION ALL\n'.join(f'SELECT {_COLUMNS} FROM {name}' for name in names)
+    else:
+        body = (
+            'SELECT NULL AS id, NULL AS user_id, NULL AS action_type, '
+            'NULL AS action_data, NULL AS created_at WHERE 0'
+        )
+    conn.execute(f'CREATE VIEW analytics AS\n{body}')
+
+
+def ensure_partition(conn: sqlite3.Connection, month: str, min_seq: int = 0) -> str:
+    """Create the partition for a month if needed and return its table name.
+
+    New partitions continue the id sequence of the existing ones so event ids
+    stay unique across the whole ``analytics`` view.
+    """
+    name = partition_name(month)
+    row = conn.execute('SELECT name FROM analytics_partitions WHERE month = ?', (month,)).fetchone()
+    if row is not None:
+        return row[0]
+
+    seq = max(_top_id(conn), min_seq)
+    conn.execute(_PARTITION_TABLE.format(name=name))
+    conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{name}_user_created ON {name} (user_id, created_at)')
+    conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{name}_created ON {name} (created_at)')
+    conn.execute('INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)', (name, seq))
+    conn.execute('INSERT INTO analytics_partitions (month, name) VALUES (?, ?)', (month, name))
+    rebuild_view(conn)
+    return name
+
+
+def insert_events(conn: sqlite3.Connection, events: Sequence[Event]) -> int:
+    """Write (user_id, action_type, action_data, created_at) events to their partitions"""
+    ordered = sorted(events, key=lambda event: event[3])
+    for month, group in groupby(ordered, key=lambda event: month_of(event[3])):
+        name = ensure_partition(conn, month)
+        # Late events for an older month must not reuse ids from newer partitions
+        top = _top_id(conn)
+        conn.execute('UPDATE sqlite_sequence SET seq = ? WHERE name = ? AND seq < ?', (top, name, top))
+        conn.executemany(
+            f'INSERT INTO {name} (user_id, action_type, action_data, created_at) VALUES (?, ?, ?, ?)',
+            list(group)
+        )
+    return len(ordered)
+
+
+def rollup_watermark(conn: sqlite3.Connection) -> str:
+    """First day the next ``roll_up`` recounts; rollups from this day on may miss recent events"""
+    row = conn.execute("SELECT date(last_day, '-1 day') FROM analytics_rollup_state WHERE id = 1").fetchone()
+    return row[0] if row else '0000-01-01'
+
+
+def roll_up(conn: sqlite3.Connection, since: Optional[str] = None) -> int:
+    """Recount events per user, day and action type into ``analytics_daily``.
+
+    Starts one day before the previous run (or at ``since``, a 'YYYY-MM-DD'
+    day) so events flushed just after midnight are still counted. Returns
+    the number of rollup rows written. The caller handles the transaction.
+    """
+    if since is None:
+        since = rollup_watermark(conn)
+
+    written = 0
+    for month, name in list_partitions(conn):
+        if _next_month(month).isoformat() <= since:
+            continue
+        cursor = conn.execute(f'''
+            INSERT INTO analytics_daily (user_id, day, action_type, count)
+            SELECT user_id, date(created_at), action_type, COUNT(*)
+            FROM {name}
+            WHERE created_at >= ? AND user_id IS NOT NULL
+            GROUP BY user_id, date(created_at), action_type
+            ON CONFLICT (user_id, day, action_type) DO UPDATE SET count = excluded.count
+        ''', (since,))
+        written += cursor.rowcount
+
+    conn.execute('''
+        INSERT INTO analytics_rollup_state (id, last_day) VALUES (1, ?)
+        ON CONFLICT (id) DO UPDATE SET last_day = excluded.last_day
+    ''', (_utc_now().date().isoformat(),))
+    return written
+
+
+def apply_retention(conn: sqlite3.Connection, retention_days: int) -> List[str]:
+    """Drop partitions whose whole month is older than the retention window.
+
+    Only months already covered by ``roll_up`` are dropped, and never the
+    current one. Returns the dropped table names. The caller handles the
+    transaction.
+    """
+    if retention_days < 0:
+        raise ValueError("retention_days must not be negative")
+    row = conn.execute("SELECT date(last_day, '-1 day') FROM analytics_rollup_state WHERE id = 1").fetchone()
+    if row is None:
+        return []
+
+    cutoff = min((_utc_now() - timedelta(days=retention_days)).date().isoformat(), row[0])
+    current = _utc_now().strftime('%Y-%m')
+    dropped = []
+    for month, name in list_partitions(conn):
+        if month == current or _next_month(month).isoformat() > cutoff:
+            continue
+        conn.execute(f'DROP TABLE IF EXISTS {name}')
+        conn.execute('DELETE FROM analytics_partitions WHERE month = ?', (month,))
+        dropped.append(name)
+
+    if dropped:
+        # Keep the id sequence going even if every older partition is gone
+        ensure_partition(conn, current)
+        rebuild_view(conn)
+    return dropped
+
+
+def migrate_legacy_table(conn: sqlite3.Connection):
+    """Move rows from the single ``analytics`` table into monthly partitions"""
+    legacy = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'analytics'"
+    ).fetchone()
+
+    if legacy is not None:
+        # Move the table aside so the view can take its name
+        conn.execute('ALTER TABLE analytics RENAME TO analytics_legacy')
+        row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'analytics_legacy'").fetchone()
+        legacy_seq = row[0] if row else 0
+        # Rows without a usable timestamp would fall outside every partition;
+        # date them at the migration instead of dropping them
+        conn.execute('''
+            UPDATE analytics_legacy SET created_at = CURRENT_TIMESTAMP
+            WHERE created_at IS NULL OR created_at NOT GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]*'
+        ''')
+        months = [r[0] for r in conn.execute('SELECT DISTINCT substr(created_at, 1, 7) FROM analytics_legacy')]
+        for month in sorted(months):
+            # Every partition starts above the legacy ids, which keep their values
+            name = ensure_partition(conn, month, legacy_seq)
+            conn.execute(f'''
+                INSERT INTO {name} ({_COLUMNS})
+                SELECT {_COLUMNS} FROM analytics_legacy
+                WHERE created_at >= ? AND created_at < ?
+            ''', (month, _next_month(month).isoformat()))
+        conn.execute('DROP TABLE analytics_legacy')
+
+    ensure_partition(conn, _utc_now().strftime('%Y-%m'))
+    rebuild_view(conn)
+    roll_up(conn, since='0000-01-01')
+
+
+def partition_stats(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    """Get month, table name and row count for every partition"""
+    return [
+        {'month': month, 'name': name,
+         'rows': conn.execute(f'SELECT COUNT(*) FROM {name}').fetchone()[0]}
+        for month, name in list_partitions(conn)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', default='nbp_sales.db')
+    parser.add_argument('--retention-days', type=int, default=None,
+                        help='drop raw partitions older than this (default: the configured policy)')
+    args = parser.parse_args()
+
+    from database.models import DatabaseManager
+
+    manager = DatabaseManager(args.db)
+    result = manager.run_analytics_maintenance(args.retention_days)
+    print(f"Rolled up {result['rolled_up']} daily rows")
+    for name in result['dropped']:
+        print(f"Dropped {name}")
+    conn = manager.get_connection()
+    try:
+        for partition in partition_stats(conn):
+            print(f"{partition['name']}: {partition['rows']} rows")
+    finally:
+        conn.close()
+        manager.close()
+
+
+if __name__ == '__main__':
+    main()
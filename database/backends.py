@@ -0,0 +1,122 @@
+"""Where the database lives.
+
+A backend opens SQLite connections to one database. ``DatabaseManager``,
+its pool and the invalidation bus all connect through it:
+
+- ``SQLiteFileBackend``: a database file on disk (the default,
+  ``nbp_sales.db``)
+- ``SQLiteMemoryBackend``: a named in-memory database shared by every
+  connection in the process, for tests and benchmarks that should not
+  touch the disk. It lasts until the backend is closed.
+
+Backends are chosen with a URL, taken from ``NBP_DATABASE_URL`` when not
+given explicitly: ``sqlite:///path/to/file.db``, ``memory:`` (a private
+database) or ``memory://name`` (shared by every manager opened with that
+name). A plain path is read as a file.
+
+The in-memory backend uses SQLite's ``memdb`` VFS rather than
+``mode=memory&cache=shared``. Shared-cache connections lock whole tables
+and fail with "database table is locked" instead of waiting on the busy
+timeout, so concurrent writers from the pool would error out.
+"""
+import os
+import sqlite3
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Optional, Union
+
+DEFAULT_DATABASE = 'nbp_sales.db'
+
+
+class StorageBackend(ABC):
+    """Opens connections to one SQLite database"""
+    # Short name of the backend type, such as 'file'
+    kind: str
+    # False when the data is gone once the backend is closed
+    persistent = True
+
+    @property
+    @abstractmethod
+    def location(self) -> str:
+        """What to pass to sqlite3.connect()"""
+
+    @property
+    def uri(self) -> bool:
+        return False
+
+    def connect(self, **kwargs: Any) -> sqlite3.Connection:
+        """Open a connection usable from any thread; keyword arguments go to sqlite3.connect()"""
+        kwargs.setdefault('check_same_thread', False)
+        return sqlite3.connect(self.location, uri=self.uri, **kwargs)
+
+    def close(self):
+        """Release anything the backend holds open"""
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self.location!r})'
+
+
+class SQLiteFileBackend(StorageBackend):
+    """A database file on disk"""
+    kind = 'file'
+
+    def __init__(self, path: str = DEFAULT_DATABASE):
+        self.path = path
+
+    @property
+    def location(self) -> str:
+        return self.path
+
+
+class SQLiteMemoryBackend(StorageBackend):
+    """A named in-memory database shared by all connections in this process.
+
+    SQLite frees an in-memory database when its last connection closes, so
+    the backend keeps one connection open until ``close()``.
+    """
+    kind = 'memory'
+    persistent = False
+
+    def __init__(self, name: Optional[str] = None):
+        self.name = name or f'nbp-{uuid.uuid4().hex}'
+        self._anchor: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def location(self) -> str:
+        # A leading slash is what makes a memdb database visible to other connections
+        return f'file:/{self.name}?vfs=memdb'
+
+    @property
+    def uri(self) -> bool:
+        return True
+
+    def connect(self, **kwargs: Any) -> sqlite3.Connection:
+        with self._lock:
+            if self._anchor is None:
+                self._anchor = super().connect()
+        return super().connect(**kwargs)
+
+    def close(self):
+        with self._lock:
+            if self._anchor is not None:
+                self._anchor.close()
+                self._anchor = None
+
+
+def get_backend(database: Union[str, StorageBackend, None] = None) -> StorageBackend:
+    """Resolve a backend URL or path (or NBP_DATABASE_URL when omitted) to a StorageBackend"""
+    if isinstance(database, StorageBackend):
+        return database
+
+    spec = database or os.getenv('NBP_DATABASE_URL') or DEFAULT_DATABASE
+    if spec.startswith('memory:'):
+        return SQLiteMemoryBackend(spec[len('memory:'):].lstrip('/') or None)
+    if spec.startswith('sqlite:///'):
+        return SQLiteFileBackend(spec[len('sqlite:///'):])
+    if '://' in spec:
+        raise ValueError(
+            f"Unknown database URL '{spec}'. Use sqlite:///path, memory: or memory://name"
+        )
+    return SQLiteFileBackend(spec)
@@ -0,0 +1,328 @@
+"""Compressed, content-addressed storage for generated script bodies.
+
+Script text is stored once per distinct body in ``script_blobs``, keyed by
+its SHA-256 and compressed with zstd when the ``zstandard`` package is
+installed (zlib otherwise). ``generated_scripts.content_hash`` points at the
+blob and ``content`` is left empty. Triggers keep each blob's ``refcount``
+equal to the number of scripts using it and delete blobs nobody uses.
+
+The schema itself is plain SQL, so any SQLite client can delete or update
+scripts. Script search keeps its own copy of the text in ``scripts_fts``:
+the app indexes a body when it writes it (``index_script``), and the
+triggers only drop or relabel index rows. Readers select
+``SCRIPT_TEXT_COLUMNS``, which inflates bodies in Python, through the
+``inflate()`` function ``register_functions`` installs on app
+connections, and only for the rows returned.
+
+    python -m database.blobs [--db nbp_sales.db] [--vacuum]
+"""
+import argparse
+import hashlib
+import os
+import sqlite3
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+CODEC_RAW = 'raw'
+CODEC_ZLIB = 'zlib'
+CODEC_ZSTD = 'zstd'
+
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 9
+
+BLOBS_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS script_blobs (
+    hash TEXT PRIMARY KEY,
+    codec TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    stored_size INTEGER NOT NULL,
+    refcount INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+ALTER TABLE generated_scripts ADD COLUMN content_hash TEXT REFERENCES script_blobs (hash);
+
+CREATE INDEX IF NOT EXISTS idx_scripts_content_hash ON generated_scripts (content_hash);
+
+-- These index the inline text, which is about to be emptied
+DROP TRIGGER IF EXISTS trg_scripts_fts_insert;
+DROP TRIGGER IF EXISTS trg_scripts_fts_delete;
+DROP TRIGGER IF EXISTS trg_scripts_fts_update;
+'''
+
+# Superseded by SCRIPT_INDEX_SCHEMA: the view and triggers called inflate(),
+# which other SQLite clients do not have
+SCRIPT_STORE_SCHEMA = '''
+CREATE VIEW IF NOT EXISTS generated_scripts_text AS
+SELECT gs.id, gs.prospect_id, gs.user_id, gs.script_type,
+       COALESCE(inflate(b.codec, b.body), gs.content) AS content,
+       gs.ai_model, gs.tokens_used, gs.created_at
+FROM generated_scripts gs
+LEFT JOIN script_blobs b ON b.hash = gs.content_hash;
+
+DROP TABLE IF EXISTS scripts_fts;
+
+CREATE VIRTUAL TABLE scripts_fts USING fts5(
+    script_type, content, user_id,
+    content = 'generated_scripts_text', content_rowid = 'id',
+    tokenize = 'porter unicode61 remove_diacritics 2', prefix = '2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_scripts_store_insert AFTER INSERT ON generated_scripts
+BEGIN
+    UPDATE script_blobs SET refcount = refcount + 1 WHERE hash = NEW.content_hash;
+    INSERT INTO scripts_fts (rowid, script_type, content, user_id)
+    SELECT id, script_type, content, user_id FROM generated_scripts_text WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_scripts_store_delete AFTER DELETE ON generated_scripts
+BEGIN
+    INSERT INTO scripts_fts (scripts_fts, rowid, script_type, content, user_id)
+    VALUES (
+        'delete', OLD.id, OLD.script_type,
+        COALESCE((SELECT inflate(codec, body) FROM script_blobs WHERE hash = OLD.content_hash), OLD.content),
+        OLD.user_id
+    );
+    UPDATE script_blobs SET refcount = refcount - 1 WHERE hash = OLD.content_hash;
+    DELETE FROM script_blobs WHERE hash = OLD.content_hash AND refcount <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_scripts_store_update
+AFTER UPDATE OF user_id, script_type, content, content_hash ON generated_scripts
+BEGIN
+    INSERT INTO scripts_fts (scripts_fts, rowid, script_type, content, user_id)
+    VALUES (
+        'delete', OLD.id, OLD.script_type,
+        COALESCE((SELECT inflate(codec, body) FROM script_blobs WHERE hash = OLD.content_hash), OLD.content),
+        OLD.user_id
+    );
+    UPDATE script_blobs SET refcount = refcount + 1 WHERE hash = NEW.content_hash;
+    UPDATE script_blobs SET refcount = refcount - 1 WHERE hash = OLD.content_hash;
+    DELETE FROM script_blobs WHERE hash = OLD.content_hash AND refcount <= 0;
+    INSERT INTO scripts_fts (rowid, script_type, content, user_id)
+    SELECT id, script_type, content, user_id FROM generated_scripts_text WHERE id = NEW.id;
+END;
+'''
+
+# scripts_fts stores the text it indexes, so removing or relabelling a row
+# needs no decompression. Inline text (content_hash NULL, e.g. rows written
+# by other tools) is indexed by the triggers; blob text by index_script.
+SCRIPT_INDEX_SCHEMA = '''
+DROP TRIGGER IF EXISTS trg_scripts_store_insert;
+DROP TRIGGER IF EXISTS trg_scripts_store_delete;
+DROP TRIGGER IF EXISTS trg_scripts_store_update;
+DROP VIEW IF EXISTS generated_scripts_text;
+DROP TABLE IF EXISTS scripts_fts;
+
+CREATE VIRTUAL TABLE scripts_fts USING fts5(
+    script_type, content, user_id,
+    tokenize = 'porter unicode61 remove_diacritics 2', prefix = '2 3'
+);
+
+CREATE TRIGGER trg_scripts_store_insert AFTER INSERT ON generated_scripts
+BEGIN
+    UPDATE script_blobs SET refcount = refcount + 1 WHERE hash = NEW.content_hash;
+    INSERT INTO scripts_fts (rowid, script_type, content, user_id)
+    SELECT NEW.id, NEW.script_type, NEW.content, NEW.user_id WHERE NEW.content_hash IS NULL;
+END;
+
+CREATE TRIGGER trg_scripts_store_delete AFTER DELETE ON generated_scripts
+BEGIN
+    DELETE FROM scripts_fts WHERE rowid = OLD.id;
+    UPDATE script_blobs SET refcount = refcount - 1 WHERE hash = OLD.content_hash;
+    DELETE FROM script_blobs WHERE hash = OLD.content_hash AND refcount <= 0;
+END;
+
+CREATE TRIGGER trg_scripts_store_update
+AFTER UPDATE OF user_id, script_type, content, content_hash ON generated_scripts
+BEGIN
+    UPDATE script_blobs SET refcount = refcount + 1 WHERE hash = NEW.content_hash;
+    UPDATE script_blobs SET refcount = refcount - 1 WHERE hash = OLD.content_hash;
+    DELETE FROM script_blobs WHERE hash = OLD.content_hash AND refcount <= 0;
+    UPDATE scripts_fts SET script_type = NEW.script_type, user_id = NEW.user_id WHERE rowid = NEW.id;
+    UPDATE scripts_fts SET content = NEW.content WHERE rowid = NEW.id AND NEW.content_hash IS NULL;
+END;
+'''
+
+# Script rows with their text, for queries over SCRIPT_TEXT_SOURCE
+SCRIPT_TEXT_COLUMNS = '''
+    gs.id, gs.prospect_id, gs.user_id, gs.script_type,
+    COALESCE(inflate(b.codec, b.body), gs.content) AS content,
+    gs.ai_model, gs.tokens_used, gs.created_at
+'''
+SCRIPT_TEXT_SOURCE = 'generated_scripts gs LEFT JOIN script_blobs b ON b.hash = gs.content_hash'
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 hex digest of a script body"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def compress(text: str) -> Tuple[str, bytes]:
+    """Compress a script body, returning (codec, body)"""
+    raw = text.encode('utf-8')
+    if zstandard is not None:
+        codec, body = CODEC_ZSTD, zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    else:
+        codec, body = CODEC_ZLIB, zlib.compress(raw, ZLIB_LEVEL)
+    # Very short bodies can grow when compressed
+    if len(body) >= len(raw):
+        return CODEC_RAW, raw
+    return codec, body
+
+
+def inflate(codec: Optional[str], body: Optional[bytes]) -> Optional[str]:
+    """Decompress a stored body back to text (NULL in, NULL out)"""
+    if codec is None or body is None:
+        return None
+    if codec == CODEC_ZLIB:
+        raw = zlib.decompress(body)
+    elif codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Script body is zstd-compressed but the zstandard package is not installed")
+        raw = zstandard.ZstdDecompressor().decompress(body)
+    elif codec == CODEC_RAW:
+        raw = body
+    else:
+        raise ValueError(f"Unknown script codec: {codec}")
+    return raw.decode('utf-8')
+
+
+def register_functions(conn: sqlite3.Connection):
+    """Install the inflate() SQL function used by SCRIPT_TEXT_COLUMNS (and migrations before 19)"""
+    conn.create_function('inflate', 2, inflate, deterministic=True)
+
+
+def store_blob(conn: sqlite3.Connection, text: str) -> str:
+    """Store a script body (once per distinct text) and return its hash.
+
+    The blob starts unreferenced; inserting the script that points at it
+    raises its refcount. The caller handles the transaction.
+    """
+    digest = content_hash(text)
+    exists = conn.execute('SELECT 1 FROM script_blobs WHERE hash = ?', (digest,)).fetchone()
+    if exists is None:
+        codec, body = compress(text)
+        conn.execute(
+            '''
+            INSERT INTO script_blobs (hash, codec, body, size, stored_size, refcount)
+            VALUES (?, ?, ?, ?, ?, 0)
+            ON CONFLICT (hash) DO NOTHING
+            ''',
+            (digest, codec, body, len(text.encode('utf-8')), len(body))
+        )
+    return digest
+
+
+def index_script(conn: sqlite3.Connection, script_id: int, script_type: str, text: str, user_id: int):
+    """Add a script's text to the search index (caller handles the transaction)"""
+    conn.execute(
+        'INSERT INTO scripts_fts (rowid, script_type, content, user_id) VALUES (?, ?, ?, ?)',
+        (script_id, script_type, text, user_id)
+    )
+
+
+def reindex_scripts(conn: sqlite3.Connection, batch_size: int = 500):
+    """Index the text of every script, inflating blobs in Python (caller handles the transaction)"""
+    conn.execute('DELETE FROM scripts_fts')
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            '''
+            SELECT gs.id, gs.script_type, gs.content, gs.user_id, b.codec, b.body
+            FROM generated_scripts gs LEFT JOIN script_blobs b ON b.hash = gs.content_hash
+            WHERE gs.id > ? ORDER BY gs.id LIMIT ?
+            ''',
+            (last_id, batch_size)
+        ).fetchall()
+        if not rows:
+            break
+        conn.executemany(
+            'INSERT INTO scripts_fts (rowid, script_type, content, user_id) VALUES (?, ?, ?, ?)',
+            [
+                (script_id, script_type, content if codec is None else inflate(codec, body), user_id)
+                for script_id, script_type, content, user_id, codec, body in rows
+            ]
+        )
+        last_id = rows[-1][0]
+
+
+def migrate_inline_content(conn: sqlite3.Connection, batch_size: int = 500):
+    """Move inline script bodies into script_blobs (caller handles the transaction)"""
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            '''
+            SELECT id, content FROM generated_scripts
+            WHERE content_hash IS NULL AND id > ? ORDER BY id LIMIT ?
+            ''',
+            (last_id, batch_size)
+        ).fetchall()
+        if not rows:
+            break
+        conn.executemany(
+            "UPDATE generated_scripts SET content = '', content_hash = ? WHERE id = ?",
+            [(store_blob(conn, content or ''), script_id) for script_id, content in rows]
+        )
+        last_id = rows[-1][0]
+
+    conn.execute('''
+        UPDATE script_blobs
+        SET refcount = (SELECT COUNT(*) FROM generated_scripts WHERE content_hash = script_blobs.hash)
+    ''')
+    conn.execute('DELETE FROM script_blobs WHERE refcount = 0')
+
+
+def storage_stats(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """Get logical, deduplicated and compressed byte counts for script bodies"""
+    row = conn.execute('''
+        SELECT COUNT(*), COALESCE(SUM(size * refcount), 0), COALESCE(SUM(size), 0),
+               COALESCE(SUM(stored_size), 0), COALESCE(SUM(refcount), 0)
+        FROM script_blobs
+    ''').fetchone()
+    blobs, logical, unique, stored, references = row
+    return {
+        'blobs': blobs,
+        'references': references,
+        'logical_bytes': logical,
+        'unique_bytes': unique,
+        'stored_bytes': stored,
+        'dedup_ratio': logical / unique if unique else 1.0,
+        'compression_ratio': unique / stored if stored else 1.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', default='nbp_sales.db')
+    parser.add_argument('--vacuum', action='store_true', help='VACUUM afterwards and report the file size change')
+    args = parser.parse_args()
+
+    from database.models import DatabaseManager
+
+    manager = DatabaseManager(args.db)
+    conn = manager.get_connection()
+    try:
+        stats = storage_stats(conn)
+        print(f"{stats['references']} scripts share {stats['blobs']} stored bodies")
+        print(f"Script text: {stats['logical_bytes']:,} bytes, {stats['unique_bytes']:,} after dedup "
+              f"({stats['dedup_ratio']:.2f}x), {stats['stored_bytes']:,} compressed "
+              f"({stats['compression_ratio']:.2f}x)")
+        if args.vacuum:
+            before = os.path.getsize(args.db)
+            conn.execute('VACUUM')
+            after = os.path.getsize(args.db)
+            print(f"Database file: {before:,} -> {after:,} bytes")
+    finally:
+        conn.close()
+        manager.close()
+
+
+if __name__ == '__main__':
+    main()
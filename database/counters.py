@@ -0,0 +1,209 @@
+"""Incrementally maintained row counters for the statistics dashboards.
+
+Triggers installed by migration 5 keep ``user_counters`` (per user) and
+``global_counters`` (whole database) current on every insert, delete and
+owner change, so statistics are a primary-key lookup instead of COUNT(*)
+scans. ``rebuild_counters`` recomputes them from scratch and
+``verify_counters`` reports any drift.
+
+    python -m database.counters [--db nbp_sales.db] [--rebuild]
+"""
+import argparse
+import sqlite3
+import sys
+from typing import Any, Dict, List
+
+GLOBAL_COUNTERS = ('users', 'prospects', 'contacts', 'scripts')
+
+COUNTERS_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS user_counters (
+    user_id INTEGER PRIMARY KEY,
+    prospects INTEGER NOT NULL DEFAULT 0,
+    contacts INTEGER NOT NULL DEFAULT 0,
+    scripts INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS global_counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL DEFAULT 0
+);
+
+-- Users
+CREATE TRIGGER IF NOT EXISTS trg_users_count_insert AFTER INSERT ON users
+BEGIN
+    UPDATE global_counters SET value = value + 1 WHERE name = 'users';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_users_count_delete AFTER DELETE ON users
+BEGIN
+    UPDATE global_counters SET value = value - 1 WHERE name = 'users';
+END;
+
+-- Prospects
+CREATE TRIGGER IF NOT EXISTS trg_prospects_count_insert AFTER INSERT ON prospects
+BEGIN
+    UPDATE global_counters SET value = value + 1 WHERE name = 'prospects';
+    INSERT INTO user_counters (user_id, prospects)
+        SELECT NEW.user_id, 1 WHERE NEW.user_id IS NOT NULL
+        ON CONFLICT (user_id) DO UPDATE SET prospects = prospects + 1;
+END;
+
+-- BEFORE so the prospect's contacts can still be counted, whether or not
+-- they are deleted along with it
+CREATE TRIGGER IF NOT EXISTS trg_prospects_count_delete BEFORE DELETE ON prospects
+BEGIN
+    UPDATE global_counters SET value = value - 1 WHERE name = 'prospects';
+    UPDATE user_counters
+    SET prospects = prospects - 1,
+        contacts = contacts - (SELECT COUNT(*) FROM additional_contacts WHERE prospect_id = OLD.id)
+    WHERE user_id = OLD.user_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_prospects_count_reassign AFTER UPDATE OF user_id ON prospects
+WHEN OLD.user_id IS NOT NEW.user_id
+BEGIN
+    UPDATE user_counters
+    SET prospects = prospects - 1,
+        contacts = contacts - (SELECT COUNT(*) FROM additional_contacts WHERE prospect_id = NEW.id)
+    WHERE user_id = OLD.user_id;
+    INSERT INTO user_counters (user_id, prospects, contacts)
+        SELECT NEW.user_id, 1, (SELECT COUNT(*) FROM additional_contacts WHERE prospect_id = NEW.id)
+        WHERE NEW.user_id IS NOT NULL
+        ON CONFLICT (user_id) DO UPDATE SET
+            prospects = prospects + 1,
+            contacts = contacts + excluded.contacts;
+END;
+
+-- Contacts count towards the user who owns their prospect
+CREATE TRIGGER IF NOT EXISTS trg_contacts_count_insert AFTER INSERT ON additional_contacts
+BEGIN
+    UPDATE global_counters SET value = value + 1 WHERE name = 'contacts';
+    UPDATE user_counters SET contacts = contacts + 1
+    WHERE user_id = (SELECT user_id FROM prospects WHERE id = NEW.prospect_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_contacts_count_delete AFTER DELETE ON additional_contacts
+BEGIN
+    UPDATE global_counters SET value = value - 1 WHERE name = 'contacts';
+    UPDATE user_counters SET contacts = contacts - 1
+    WHERE user_id = (SELECT user_id FROM prospects WHERE id = OLD.prospect_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_contacts_count_reassign AFTER UPDATE OF prospect_id ON additional_contacts
+WHEN OLD.prospect_id IS NOT NEW.prospect_id
+BEGIN
+    UPDATE user_counters SET contacts = contacts - 1
+    WHERE user_id = (SELECT user_id FROM prospects WHERE id = OLD.prospect_id);
+    UPDATE user_counters SET contacts = contacts + 1
+    WHERE user_id = (SELECT user_id FROM prospects WHERE id = NEW.prospect_id);
+END;
+
+-- Generated scripts
+CREATE TRIGGER IF NOT EXISTS trg_scripts_count_insert AFTER INSERT ON generated_scripts
+BEGIN
+    UPDATE global_counters SET value = value + 1 WHERE name = 'scripts';
+    INSERT INTO user_counters (user_id, scripts)
+        SELECT NEW.user_id, 1 WHERE NEW.user_id IS NOT NULL
+        ON CONFLICT (user_id) DO UPDATE SET scripts = scripts + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_scripts_count_delete AFTER DELETE ON generated_scripts
+BEGIN
+    UPDATE global_counters SET value = value - 1 WHERE name = 'scripts';
+    UPDATE user_counters SET scripts = scripts - 1 WHERE user_id = OLD.user_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_scripts_count_reassign AFTER UPDATE OF user_id ON generated_scripts
+WHEN OLD.user_id IS NOT NEW.user_id
+BEGIN
+    UPDATE user_counters SET scripts = scripts - 1 WHERE user_id = OLD.user_id;
+    INSERT INTO user_counters (user_id, scripts)
+        SELECT NEW.user_id, 1 WHERE NEW.user_id IS NOT NULL
+        ON CONFLICT (user_id) DO UPDATE SET scripts = scripts + 1;
+END;
+'''
+
+# Counts recomputed from the base tables, one row per user
+_ACTUAL_USER_COUNTS = '''
+    SELECT user_id, SUM(prospects) AS prospects, SUM(contacts) AS contacts, SUM(scripts) AS scripts
+    FROM (
+        SELECT user_id, COUNT(*) AS prospects, 0 AS contacts, 0 AS scripts
+        FROM prospects WHERE user_id IS NOT NULL GROUP BY user_id
+        UNION ALL
+        SELECT p.user_id, 0, COUNT(*), 0
+        FROM additional_contacts ac JOIN prospects p ON ac.prospect_id = p.id
+        WHERE p.user_id IS NOT NULL GROUP BY p.user_id
+        UNION ALL
+        SELECT user_id, 0, 0, COUNT(*)
+        FROM generated_scripts WHERE user_id IS NOT NULL GROUP BY user_id
+    )
+    GROUP BY user_id
+'''
+
+_ACTUAL_GLOBAL_COUNTS = '''
+    SELECT 'users', COUNT(*) FROM users
+    UNION ALL SELECT 'prospects', COUNT(*) FROM prospects
+    UNION ALL SELECT 'contacts', COUNT(*) FROM additional_contacts
+    UNION ALL SELECT 'scripts', COUNT(*) FROM generated_scripts
+'''
+
+
+def rebuild_counters(conn: sqlite3.Connection):
+    """Recompute every counter from the base tables (caller handles the transaction)"""
+    conn.execute('DELETE FROM user_counters')
+    conn.execute(f'''
+        INSERT INTO user_counters (user_id, prospects, contacts, scripts)
+        {_ACTUAL_USER_COUNTS}
+    ''')
+    conn.execute(f'INSERT OR REPLACE INTO global_counters (name, value) {_ACTUAL_GLOBAL_COUNTS}')
+
+
+def verify_counters(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    """Compare stored counters with fresh counts and list every mismatch"""
+    mismatches = []
+
+    stored = {row[0]: row[1:] for row in conn.execute(
+        'SELECT user_id, prospects, contacts, scripts FROM user_counters'
+    )}
+    actual = {row[0]: row[1:] for row in conn.execute(_ACTUAL_USER_COUNTS)}
+    for user_id in sorted(set(stored) | set(actual)):
+        have = stored.get(user_id, (0, 0, 0))
+        want = actual.get(user_id, (0, 0, 0))
+        for name, h, w in zip(('prospects', 'contacts', 'scripts'), have, want):
+            if h != w:
+                mismatches.append({'scope': 'user', 'user_id': user_id, 'counter': name,
+                                   'stored': h, 'actual': w})
+
+    stored_global = dict(conn.execute('SELECT name, value FROM global_counters'))
+    for name, value in conn.execute(_ACTUAL_GLOBAL_COUNTS):
+        if stored_global.get(name) != value:
+            mismatches.append({'scope': 'global', 'user_id': None, 'counter': name,
+                               'stored': stored_global.get(name), 'actual': value})
+
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', default='nbp_sales.db')
+    parser.add_argument('--rebuild', action='store_true', help='rebuild the counters before verifying')
+    args = parser.parse_args()
+
+    from database.models import DatabaseManager
+
+    manager = DatabaseManager(args.db)
+    if args.rebuild:
+        manager.rebuild_counters()
+        print("Counters rebuilt")
+
+    mismatches = manager.verify_counters()
+    for m in mismatches:
+        scope = f"user {m['user_id']}" if m['scope'] == 'user' else 'global'
+        print(f"{scope}: {m['counter']} stored={m['stored']} actual={m['actual']}")
+    print(f"{len(mismatches)} mismatched counters")
+    manager.close()
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
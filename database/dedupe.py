@@ -0,0 +1,246 @@
+"""Duplicate prospect detection.
+
+Every prospect stores three lookup columns, computed in Python on write:
+
+- ``normalized_name``: the company name lowercased, without accents,
+  punctuation or legal suffixes, so "ACME, Inc." and "Acme" compare equal
+- ``name_reversed``: ``normalized_name`` spelled backwards
+- ``website_domain``: the site's host name without ``www.``
+
+Same-website and same-name matches are single index lookups. Near-misses
+use a sorted-neighbourhood search: a typo leaves everything before it
+intact, so the misspelt name sorts next to the original in the
+``normalized_name`` index. A typo near the start leaves the end intact,
+so the name also sorts next to the original in the ``name_reversed``
+index. Reading ``NEIGHBOURS`` rows on each side of both positions gives
+a bounded set of candidates at any table size. Those candidates are
+scored in Python (see ``similarity``).
+
+A trigram FTS index was tried first. At 500k names almost every trigram
+is common, so picking selective trigrams took longer than the whole
+neighbourhood search.
+
+Matches are advisory: the New Prospect form shows them before saving and
+lets the rep open the existing prospect or create the new one anyway; bulk
+import inserts and lists them.
+"""
+import re
+import sqlite3
+import unicodedata
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Trailing words that do not distinguish one company from another
+LEGAL_SUFFIXES = {
+    'inc', 'incorporated', 'llc', 'llp', 'lp', 'ltd', 'limited', 'corp', 'corporation', 'co', 'company',
+    'plc', 'gmbh', 'ag', 'sa', 'sas', 'sarl', 'bv', 'nv', 'oy', 'ab', 'as', 'spa', 'srl', 'pty', 'pvt',
+    'pte', 'kk', 'group', 'holdings', 'holding'
+}
+
+DEDUPE_SCHEMA = '''
+ALTER TABLE prospects ADD COLUMN normalized_name TEXT;
+ALTER TABLE prospects ADD COLUMN name_reversed TEXT;
+ALTER TABLE prospects ADD COLUMN website_domain TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_prospects_user_normalized ON prospects (user_id, normalized_name);
+CREATE INDEX IF NOT EXISTS idx_prospects_user_reversed ON prospects (user_id, name_reversed, normalized_name);
+CREATE INDEX IF NOT EXISTS idx_prospects_user_domain ON prospects (user_id, website_domain)
+WHERE website_domain IS NOT NULL;
+'''
+
+_WORD_RE = re.compile(r'[a-z0-9]+')
+_HOST_END_RE = re.compile(r'[/?#]')
+
+# Rows read on each side of the name's position in both indexes
+NEIGHBOURS = 25
+
+# Bound parameters per IN (...) lookup in find_exact_duplicates
+LOOKUP_CHUNK = 500
+
+DEFAULT_THRESHOLD = 0.6
+
+REASON_WEBSITE = 'same website'
+REASON_NAME = 'same name'
+REASON_SIMILAR = 'similar name'
+
+
+@lru_cache(maxsize=4096)
+def normalize_company_name(name: Optional[str]) -> Optional[str]:
+    """Lowercase, strip accents, punctuation and legal suffixes ("ACME, Inc." -> "acme")"""
+    if not name:
+        return None
+    if not name.isascii():
+        name = unicodedata.normalize('NFKD', name)
+        name = ''.join(ch for ch in name if not unicodedata.combining(ch))
+    tokens = _WORD_RE.findall(name.lower().replace('&', ' and '))
+    if len(tokens) > 1 and tokens[0] == 'the':
+        tokens = tokens[1:]
+    while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES:
+        tokens.pop()
+    return ' '.join(tokens) or None
+
+
+@lru_cache(maxsize=4096)
+def website_domain(url: Optional[str]) -> Optional[str]:
+    """Host name of a website without scheme, port or leading www. ("https://www.Acme.com/about" -> "acme.com")"""
+    if not url:
+        return None
+    host = url.strip().lower()
+    if '://' in host:
+        host = host.split('://', 1)[1]
+    host = _HOST_END_RE.split(host, 1)[0].rsplit('@', 1)[-1].split(':', 1)[0].rstrip('.')
+    if '.' not in host:
+        return None
+    if host.startswith('www.'):
+        host = host[4:]
+    return host
+
+
+def name_keys(company_name: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """(normalized_name, name_reversed) for a company name"""
+    normalized = normalize_company_name(company_name)
+    return normalized, normalized[::-1] if normalized else None
+
+
+def trigrams(normalized: str) -> Set[str]:
+    """Trigrams of a name padded like pg_trgm, so short names and word ends still yield several"""
+    padded = f'  {normalized} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a: str, b: str) -> float:
+    """Similarity of two normalized names from 0 to 1, averaging trigram Jaccard and containment.
+
+    Containment (shared trigrams over the smaller set) lets "globex" match
+    "globex industries"; Jaccard keeps one short common word such as
+    "bank" from matching every bank.
+    """
+    if a == b:
+        return 1.0
+    ta, tb = trigrams(a), trigrams(b)
+    shared = len(ta & tb)
+    return (shared / len(ta | tb) + shared / min(len(ta), len(tb))) / 2
+
+
+def backfill(conn: sqlite3.Connection, batch_size: int = 1000):
+    """Fill the lookup columns for existing prospects (caller handles the transaction)"""
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            'SELECT id, company_name, website FROM prospects WHERE id > ? ORDER BY id LIMIT ?',
+            (last_id, batch_size)
+        ).fetchall()
+        if not rows:
+            break
+        conn.executemany(
+            'UPDATE prospects SET normalized_name = ?, name_reversed = ?, website_domain = ? WHERE id = ?',
+            [(*name_keys(name), website_domain(website), prospect_id) for prospect_id, name, website in rows]
+        )
+        last_id = rows[-1][0]
+
+
+def _neighbours(conn: sqlite3.Connection, user_id: int, column: str, key: str) -> List[Tuple[int, str]]:
+    """Rows just after and just before ``key`` in a name index"""
+    return conn.execute(
+        f'''
+        SELECT * FROM (
+            SELECT id, normalized_name FROM prospects
+            WHERE user_id = ? AND {column} >= ? ORDER BY {column} LIMIT ?
+        )
+        UNION ALL
+        SELECT * FROM (
+            SELECT id, normalized_name FROM prospects
+            WHERE user_id = ? AND {column} < ? ORDER BY {column} DESC LIMIT ?
+        )
+        ''',
+        (user_id, key, NEIGHBOURS, user_id, key, NEIGHBOURS)
+    ).fetchall()
+
+
+def find_duplicates(conn: sqlite3.Connection, user_id: int, company_name: Optional[str],
+                    website: Optional[str] = None, limit: int = 5,
+                    threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """A user's existing prospects that look like the given company, best match first"""
+    normalized, reversed_name = name_keys(company_name)
+    domain = website_domain(website)
+    matches: Dict[int, Tuple[float, str]] = {}
+
+    if domain:
+        for prospect_id, in conn.execute(
+            'SELECT id FROM prospects WHERE user_id = ? AND website_domain = ? LIMIT ?',
+            (user_id, domain, limit)
+        ):
+            matches[prospect_id] = (1.0, REASON_WEBSITE)
+
+    if normalized:
+        candidates = dict(_neighbours(conn, user_id, 'normalized_name', normalized))
+        candidates.update(_neighbours(conn, user_id, 'name_reversed', reversed_name))
+        for prospect_id, other in candidates.items():
+            if prospect_id in matches or other is None:
+                continue
+            score = similarity(normalized, other)
+            if score >= threshold:
+                matches[prospect_id] = (score, REASON_NAME if other == normalized else REASON_SIMILAR)
+
+    if not matches:
+        return []
+    best = sorted(matches.items(), key=lambda item: (-item[1][0], item[0]))[:limit]
+    placeholders = ', '.join('?' * len(best))
+    details = {
+        row[0]: row for row in conn.execute(
+            f'SELECT id, company_name, website, created_at FROM prospects WHERE id IN ({placeholders})',
+            [prospect_id for prospect_id, _ in best]
+        )
+    }
+    return [
+        {
+            'id': prospect_id,
+            'company_name': details[prospect_id][1],
+            'website': details[prospect_id][2],
+            'created_at': details[prospect_id][3],
+            'score': round(score, 3),
+            'reason': reason,
+        }
+        for prospect_id, (score, reason) in best
+    ]
+
+
+def _existing(conn: sqlite3.Connection, user_id: int, column: str, keys: List[str]) -> Dict[str, Tuple[int, str]]:
+    found: Dict[str, Tuple[int, str]] = {}
+    for start in range(0, len(keys), LOOKUP_CHUNK):
+        chunk = keys[start:start + LOOKUP_CHUNK]
+        placeholders = ', '.join('?' * len(chunk))
+        for key, prospect_id, company_name in conn.execute(
+            f'SELECT {column}, id, company_name FROM prospects WHERE user_id = ? AND {column} IN ({placeholders})',
+            (user_id, *chunk)
+        ):
+            found.setdefault(key, (prospect_id, company_name))
+    return found
+
+
+def find_exact_duplicates(conn: sqlite3.Connection, user_id: int,
+                          companies: List[Tuple[str, Optional[str]]]) -> List[Optional[Dict[str, Any]]]:
+    """Same-website or same-name match for each (company_name, website), in one pass for a whole batch.
+
+    Entries also match earlier entries of the same list (``id`` is None then),
+    which catches a file that lists an account twice.
+    """
+    keys = [(name_keys(name)[0], website_domain(website)) for name, website in companies]
+    by_domain = _existing(conn, user_id, 'website_domain', sorted({d for _, d in keys if d}))
+    by_name = _existing(conn, user_id, 'normalized_name', sorted({n for n, _ in keys if n}))
+
+    results: List[Optional[Dict[str, Any]]] = []
+    for (name, _), (normalized, domain) in zip(companies, keys):
+        if domain in by_domain:
+            prospect_id, company_name = by_domain[domain]
+            results.append({'id': prospect_id, 'company_name': company_name, 'reason': REASON_WEBSITE})
+        elif normalized in by_name:
+            prospect_id, company_name = by_name[normalized]
+            results.append({'id': prospect_id, 'company_name': company_name, 'reason': REASON_NAME})
+        else:
+            results.append(None)
+        if domain:
+            by_domain.setdefault(domain, (None, name))
+        if normalized:
+            by_name.setdefault(normalized, (None, name))
+    return results
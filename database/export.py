@@ -0,0 +1,222 @@
+"""Streaming export of prospects and generated scripts.
+
+Rows are read with the keyset-paginated ``iter_user_*`` methods, one chunk
+at a time, and written out as each chunk arrives, so memory use depends on
+``chunk_size`` and not on how many rows are exported. Formats:
+
+- ``csv``: UTF-8 with a byte-order mark so Excel detects the encoding
+- ``xlsx``: openpyxl write-only workbook
+- ``parquet`` and ``arrow`` (Arrow IPC stream): only when the optional
+  ``pyarrow`` package is installed
+
+    python -m database.export prospects --format xlsx -o prospects.xlsx
+"""
+import argparse
+import io
+import sys
+from dataclasses import dataclass
+from typing import IO, Any, Callable, Dict, Iterator, List, Tuple
+
+from .models import DEFAULT_USERNAME, DatabaseManager
+from .rows import RowSet
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# Excel rejects control characters in cells and stops at 32,767 characters per cell
+XLSX_MAX_CELL = 32767
+
+_pyarrow = None
+
+
+def _load_pyarrow():
+    """Import the optional pyarrow package on first use; None when it is not installed"""
+    global _pyarrow
+    if _pyarrow is None:
+        try:
+            import pyarrow
+            import pyarrow.ipc
+            import pyarrow.parquet
+            _pyarrow = pyarrow
+        except ImportError:
+            _pyarrow = False
+    return _pyarrow or None
+
+
+@dataclass(frozen=True)
+class ExportDataset:
+    """Something a user can export: its columns (name, declared type) and how to page through it"""
+    name: str
+    columns: Tuple[Tuple[str, str], ...]
+    pages: Callable[[DatabaseManager, int, int], Iterator[RowSet]]
+
+
+# Listed rather than read from the table, so lookup columns that migrations
+# add (normalized_name, website_domain, content_hash, ...) stay out of exports
+PROSPECT_COLUMNS = (
+    ('id', 'INTEGER'), ('user_id', 'INTEGER'), ('company_name', 'TEXT'), ('website', 'TEXT'),
+    ('industry', 'TEXT'), ('company_size', 'TEXT'), ('business_category', 'TEXT'),
+    ('meeting_objective', 'TEXT'), ('context', 'TEXT'), ('notes', 'TEXT'),
+    ('created_at', 'TIMESTAMP'), ('updated_at', 'TIMESTAMP'),
+)
+
+SCRIPT_COLUMNS = (
+    ('id', 'INTEGER'), ('prospect_id', 'INTEGER'), ('user_id', 'INTEGER'), ('script_type', 'TEXT'),
+    ('content', 'TEXT'), ('ai_model', 'TEXT'), ('tokens_used', 'INTEGER'), ('created_at', 'TIMESTAMP'),
+)
+
+DATASETS: Dict[str, ExportDataset] = {
+    'prospects': ExportDataset(
+        'prospects', PROSPECT_COLUMNS,
+        lambda db, user_id, chunk_size: db.iter_user_prospects(user_id, chunk_size=chunk_size)
+    ),
+    'scripts': ExportDataset(
+        'scripts', SCRIPT_COLUMNS,
+        lambda db, user_id, chunk_size: db.iter_user_scripts(user_id, chunk_size=chunk_size, include_content=True)
+    ),
+}
+
+FORMATS = {
+    'csv': ('text/csv', '.csv'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', '.xlsx'),
+    'parquet': ('application/vnd.apache.parquet', '.parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', '.arrow'),
+}
+
+
+def available_formats() -> List[str]:
+    """Formats that can be written with the installed packages"""
+    return [name for name in FORMATS if name in ('csv', 'xlsx') or _load_pyarrow() is not None]
+
+
+def project(pages: Iterator[RowSet], names: List[str]) -> Iterator[RowSet]:
+    """Each page cut down to the named columns, in that order"""
+    for page in pages:
+        yield RowSet(tuple(names), [tuple(row[name] for name in names) for row in page.rows])
+
+
+def write_csv(pages: Iterator[RowSet], out: IO[bytes], columns: List[str]) -> int:
+    """Write pages as CSV; returns the number of rows"""
+    import csv
+
+    text = io.TextIOWrapper(out, encoding='utf-8-sig', newline='')
+    try:
+        writer, rows = csv.writer(text), 0
+        writer.writerow(columns)
+        for page in pages:
+            writer.writerows(page.rows)
+            rows += len(page)
+        text.flush()
+        return rows
+    finally:
+        # Leave the caller's stream open
+        text.detach()
+
+
+def write_xlsx(pages: Iterator[RowSet], out: IO[bytes], columns: List[str], sheet_title: str = 'Export') -> int:
+    """Write pages to a single-sheet workbook; returns the number of rows"""
+    from openpyxl import Workbook
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+    def cell(value: Any) -> Any:
+        if isinstance(value, str):
+            return ILLEGAL_CHARACTERS_RE.sub('', value)[:XLSX_MAX_CELL]
+        return value
+
+    # Write-only workbooks stream rows to a temporary file instead of keeping cells in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_title)
+    sheet.append(columns)
+    rows = 0
+    for page in pages:
+        for row in page.rows:
+            sheet.append([cell(value) for value in row])
+        rows += len(page)
+    workbook.save(out)
+    return rows
+
+
+def arrow_schema(columns: Tuple[Tuple[str, str], ...]) -> 'pyarrow.Schema':
+    """Arrow types for declared SQLite column types, so every chunk gets the same schema"""
+    pyarrow = _load_pyarrow()
+
+    def arrow_type(decl: str):
+        if 'INT' in decl:
+            return pyarrow.int64()
+        if any(name in decl for name in ('REAL', 'FLOA', 'DOUB')):
+            return pyarrow.float64()
+        return pyarrow.string()
+
+    return pyarrow.schema([(name, arrow_type(decl)) for name, decl in columns])
+
+
+def write_arrow(pages: Iterator[RowSet], out: IO[bytes], schema: 'pyarrow.Schema', parquet: bool) -> int:
+    """Write pages as Parquet (one row group per chunk) or as an Arrow IPC stream"""
+    pyarrow = _load_pyarrow()
+    if parquet:
+        writer = pyarrow.parquet.ParquetWriter(out, schema, compression='zstd')
+    else:
+        writer = pyarrow.ipc.new_stream(out, schema)
+    rows = 0
+    try:
+        for page in pages:
+            columns = zip(*page.rows)
+            writer.write_batch(pyarrow.RecordBatch.from_arrays(
+                [pyarrow.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema
+            ))
+            rows += len(page)
+    finally:
+        writer.close()
+    return rows
+
+
+def export(db: DatabaseManager, dataset: str, fmt: str, out: IO[bytes], user_id: int,
+           chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Stream one of a user's datasets to a binary file object; returns the number of rows"""
+    if dataset not in DATASETS:
+        raise ValueError(f"Unknown dataset '{dataset}'. Choose one of: {', '.join(DATASETS)}")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}'. Choose one of: {', '.join(FORMATS)}")
+    if fmt not in available_formats():
+        raise ValueError(f"The '{fmt}' format needs the pyarrow package")
+
+    spec = DATASETS[dataset]
+    names = [name for name, _ in spec.columns]
+    pages = project(spec.pages(db, user_id, chunk_size), names)
+    if fmt == 'csv':
+        return write_csv(pages, out, names)
+    if fmt == 'xlsx':
+        return write_xlsx(pages, out, names, sheet_title=spec.name.title())
+    return write_arrow(pages, out, arrow_schema(spec.columns), parquet=(fmt == 'parquet'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('dataset', choices=list(DATASETS))
+    parser.add_argument('--format', default='csv', choices=list(FORMATS))
+    parser.add_argument('--user-id', type=int, help='default: the sales_rep login')
+    parser.add_argument('--db', default='nbp_sales.db')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('-o', '--output', help='output file (default: stdout)')
+    args = parser.parse_args()
+
+    manager = DatabaseManager(args.db, maintenance=False)
+    try:
+        if args.user_id is None:
+            args.user_id = manager.ensure_user(DEFAULT_USERNAME)
+        if args.output:
+            with open(args.output, 'wb') as out:
+                rows = export(manager, args.dataset, args.format, out, args.user_id, args.chunk_size)
+            print(f"Exported {rows:,} {args.dataset} to {args.output}", file=sys.stderr)
+        else:
+            rows = export(manager, args.dataset, args.format, sys.stdout.buffer, args.user_id, args.chunk_size)
+            sys.stdout.buffer.flush()
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(2)
+    finally:
+        manager.close()
+
+
+if __name__ == '__main__':
+    main()
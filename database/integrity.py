@@ -0,0 +1,106 @@
+"""Referential integrity: orphan cleanup and ON DELETE CASCADE.
+
+Every pooled connection runs with ``PRAGMA foreign_keys = ON`` (see
+``profiles.py``). The original schema declared its foreign keys without
+actions, so deleting a prospect left its contacts and scripts behind.
+``rebuild_with_cascade`` recreates those child tables with
+``ON DELETE CASCADE`` on ``prospect_id`` using SQLite's rebuild procedure.
+The table definition, indexes, triggers and AUTOINCREMENT position are all
+carried over. Cascaded deletes fire the child tables' triggers, so counters,
+search indexes, blob reference counts and the cache change log stay
+correct.
+"""
+import re
+import sqlite3
+from typing import Any, Dict, List
+
+CASCADE_TABLES = ('additional_contacts', 'generated_scripts')
+
+_PROSPECT_FK = re.compile(
+    r'(FOREIGN\s+KEY\s*\(\s*prospect_id\s*\)\s*REFERENCES\s+prospects\s*\(\s*id\s*\))(?!\s*ON\s+DELETE)',
+    re.IGNORECASE
+)
+
+
+def cleanup_orphans(conn: sqlite3.Connection) -> Dict[str, int]:
+    """Delete contacts and scripts whose prospect no longer exists; returns rows removed per table.
+
+    Plain DELETEs, so the usual triggers keep counters, search and blobs in step.
+    """
+    removed = {}
+    for table in CASCADE_TABLES:
+        cursor = conn.execute(f'''
+            DELETE FROM {table}
+            WHERE prospect_id IS NOT NULL AND prospect_id NOT IN (SELECT id FROM prospects)
+        ''')
+        removed[table] = cursor.rowcount
+    return removed
+
+
+def _rebuild_table(conn: sqlite3.Connection, table: str):
+    create_sql, = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()
+    cascaded_sql, replaced = _PROSPECT_FK.subn(r'\1 ON DELETE CASCADE', create_sql)
+    if not replaced:
+        return  # already cascading
+
+    # Indexes and triggers are dropped with the table; keep their definitions
+    dependents = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL",
+        (table,)
+    ).fetchall()
+    seq = conn.execute('SELECT seq FROM sqlite_sequence WHERE name = ?', (table,)).fetchone()
+
+    staging = f'{table}_rebuild'
+    conn.execute(re.sub(
+        rf'^\s*CREATE\s+TABLE\s+(IF\s+NOT\s+EXISTS\s+)?"?{table}"?',
+        f'CREATE TABLE {staging}', cascaded_sql, count=1, flags=re.IGNORECASE
+    ))
+    conn.execute(f'INSERT INTO {staging} SELECT * FROM {table}')
+    conn.execute(f'DROP TABLE {table}')
+    conn.execute(f'ALTER TABLE {staging} RENAME TO {table}')
+    for sql, in dependents:
+        conn.execute(sql)
+    if seq is not None:
+        conn.execute('UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?', (seq[0], table))
+
+
+def rebuild_with_cascade(conn: sqlite3.Connection):
+    """Recreate the prospect child tables with ON DELETE CASCADE.
+
+    Runs as a non-transactional migration because foreign keys can only be
+    switched off outside a transaction; it opens its own.
+    """
+    enforced = conn.execute('PRAGMA foreign_keys').fetchone()[0]
+    conn.execute('PRAGMA foreign_keys = OFF')
+    # Views (generated_scripts_text) and triggers on other tables name these
+    # tables; legacy renaming leaves them alone instead of re-validating the
+    # schema while a table is briefly missing
+    conn.execute('PRAGMA legacy_alter_table = ON')
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for table in CASCADE_TABLES:
+                _rebuild_table(conn, table)
+            violations = [
+                row for row in conn.execute('PRAGMA foreign_key_check')
+                if row[0] in CASCADE_TABLES and row[2] == 'prospects'
+            ]
+            if violations:
+                raise sqlite3.IntegrityError(f"{len(violations)} rows still reference missing prospects")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    finally:
+        conn.execute('PRAGMA legacy_alter_table = OFF')
+        conn.execute(f'PRAGMA foreign_keys = {"ON" if enforced else "OFF"}')
+
+
+def foreign_key_report(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    """List rows whose foreign keys point at missing parents"""
+    return [
+        {'table': table, 'rowid': rowid, 'parent': parent, 'fk_index': fk_index}
+        for table, rowid, parent, fk_index in conn.execute('PRAGMA foreign_key_check')
+    ]
@@ -0,0 +1,178 @@
+"""Cross-process cache invalidation through a trigger-fed change log.
+
+Triggers append a row to ``cache_changes`` for every prospect or contact
+write, whichever process makes it. Each ``DatabaseManager`` polls with a
+dedicated connection. The poll first checks ``PRAGMA data_version``, which
+only changes when another connection commits. Only then does it read the
+new change rows and drop the matching cache keys.
+
+Old rows are pruned after ``retention`` seconds. A process that has fallen
+further behind than that can no longer tell what changed, so it clears its
+whole cache instead.
+"""
+import sqlite3
+import threading
+import time
+from typing import Callable, Hashable, List, Optional, Union
+
+from .backends import StorageBackend, get_backend
+from .cache import LRUCache
+
+CHANGE_LOG_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS cache_changes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    key INTEGER NOT NULL,
+    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_cache_changes_changed ON cache_changes (changed_at);
+
+-- Prospects: the row itself, and on delete its contact list too
+CREATE TRIGGER IF NOT EXISTS trg_prospects_changes_insert AFTER INSERT ON prospects
+BEGIN
+    INSERT INTO cache_changes (kind, key) VALUES ('prospect', NEW.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_prospects_changes_update AFTER UPDATE ON prospects
+BEGIN
+    INSERT INTO cache_changes (kind, key) VALUES ('prospect', NEW.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_prospects_changes_delete AFTER DELETE ON prospects
+BEGIN
+    INSERT INTO cache_changes (kind, key) VALUES ('prospect', OLD.id), ('contacts', OLD.id);
+END;
+
+-- Contacts are cached per prospect
+CREATE TRIGGER IF NOT EXISTS trg_contacts_changes_insert AFTER INSERT ON additional_contacts
+BEGIN
+    INSERT INTO cache_changes (kind, key)
+    SELECT 'contacts', NEW.prospect_id WHERE NEW.prospect_id IS NOT NULL;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_contacts_changes_update AFTER UPDATE ON additional_contacts
+BEGIN
+    INSERT INTO cache_changes (kind, key)
+    SELECT 'contacts', OLD.prospect_id WHERE OLD.prospect_id IS NOT NULL
+    UNION
+    SELECT 'contacts', NEW.prospect_id WHERE NEW.prospect_id IS NOT NULL;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_contacts_changes_delete AFTER DELETE ON additional_contacts
+BEGIN
+    INSERT INTO cache_changes (kind, key)
+    SELECT 'contacts', OLD.prospect_id WHERE OLD.prospect_id IS NOT NULL;
+END;
+'''
+
+
+def _last_change_id(conn: sqlite3.Connection) -> int:
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'cache_changes'").fetchone()
+    return row[0] if row else 0
+
+
+def prune_changes(conn: sqlite3.Connection, retention: float) -> int:
+    """Delete change rows older than retention seconds and return how many went"""
+    cursor = conn.execute(
+        "DELETE FROM cache_changes WHERE changed_at < datetime('now', ?)",
+        (f'-{int(retention)} seconds',)
+    )
+    return cursor.rowcount
+
+
+class InvalidationBus:
+    """Applies other processes' prospect and contact writes to a local cache.
+
+    ``poll()`` is cheap enough to call before every cached read. It does
+    nothing until ``poll_interval`` seconds have passed since the last
+    check, and only queries the change log when ``data_version`` moved.
+    """
+
+    def __init__(self, db_path: Union[str, StorageBackend], cache: LRUCache, poll_interval: float = 0.25,
+                 retention: float = 3600.0, prune_interval: float = 600.0,
+                 connect: Optional[Callable[[], sqlite3.Connection]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.cache = cache
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.prune_interval = prune_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        if connect is None:
+            # No busy wait: a poll that finds the database locked is simply retried later
+            backend = get_backend(db_path)
+            connect = lambda: backend.connect(timeout=0, isolation_level=None)
+        self._conn = connect()
+        self._data_version = self._conn.execute('PRAGMA data_version').fetchone()[0]
+        # Everything committed so far is already reflected in an empty cache
+        self._last_id = _last_change_id(self._conn)
+        self._last_poll = self._clock()
+        self._last_prune = self._clock()
+        self._counters = {'polls': 0, 'checks': 0, 'invalidated': 0, 'resets': 0}
+
+    def poll(self, force: bool = False) -> int:
+        """Invalidate cache keys changed by other connections; returns how many changes were applied"""
+        now = self._clock()
+        if not force and now - self._last_poll < self.poll_interval:
+            return 0
+        # One poller at a time; other threads just read on
+        if not self._lock.acquire(blocking=False):
+            return 0
+        try:
+            self._last_poll = now
+            self._counters['polls'] += 1
+            try:
+                version = self._conn.execute('PRAGMA data_version').fetchone()[0]
+                if version == self._data_version:
+                    return 0
+                self._counters['checks'] += 1
+                applied = self._apply_changes()
+            except sqlite3.OperationalError:
+                return 0
+            self._data_version = version
+            if now - self._last_prune >= self.prune_interval:
+                self._prune()
+                self._last_prune = now
+            return applied
+        finally:
+            self._lock.release()
+
+    def _apply_changes(self) -> int:
+        conn = self._conn
+        top = _last_change_id(conn)
+        if top <= self._last_id:
+            return 0
+
+        if conn.execute('SELECT 1 FROM cache_changes WHERE id = ?', (self._last_id + 1,)).fetchone() is None:
+            # The next change we need was already pruned
+            self.cache.clear()
+            self._counters['resets'] += 1
+            missed, self._last_id = top - self._last_id, top
+            return missed
+
+        rows = conn.execute(
+            'SELECT id, kind, key FROM cache_changes WHERE id > ? AND id <= ? ORDER BY id',
+            (self._last_id, top)
+        ).fetchall()
+        keys: List[Hashable] = list({(kind, key) for _, kind, key in rows})
+        self.cache.invalidate_many(keys)
+        self._last_id = top
+        self._counters['invalidated'] += len(rows)
+        return len(rows)
+
+    def _prune(self):
+        try:
+            prune_changes(self._conn, self.retention)
+        except sqlite3.OperationalError:
+            # Busy writers win; try again next interval
+            pass
+
+    def close(self):
+        """Close the polling connection"""
+        with self._lock:
+            self._conn.close()
+
+    def stats(self):
+        """Get poll, change-log read, invalidation and full-reset counters"""
+        return {'last_change_id': self._last_id, **self._counters}
@@ -0,0 +1,294 @@
+"""Idle-time database maintenance.
+
+``MaintenanceScheduler`` runs a background thread that wakes every
+``check_interval`` seconds. When no pooled connection has been in use for
+``idle_after`` seconds, it runs whichever tasks are due:
+
+- ``enable_incremental_vacuum`` switches the file to ``auto_vacuum =
+  INCREMENTAL`` with a one-off full VACUUM. Migration 15 only does this
+  itself for small databases, so startup never waits on rewriting a big one
+- ``incremental_vacuum`` returns free pages to the filesystem in small steps
+- ``analyze`` refreshes the planner statistics with a bounded ``analysis_limit``
+- ``optimize`` runs ``PRAGMA optimize``
+- ``analytics`` rolls up analytics and applies the retention window
+- ``ai_cache`` writes the AI cache hit and miss counts and drops expired and
+  over-budget cached AI responses
+
+Every run is recorded in ``maintenance_runs`` with its duration and the bytes
+it reclaimed. The table is also how due times are shared: a task is claimed by
+inserting its row under the write lock, so several processes serving the same
+database do not all vacuum at once.
+
+    python -m database.maintenance [--db nbp_sales.db] [--task analyze ...]
+"""
+import argparse
+import atexit
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+from .rows import RowSet, query_rows
+
+if TYPE_CHECKING:
+    from .models import DatabaseManager
+
+MAINTENANCE_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS maintenance_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task TEXT NOT NULL,
+    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    duration_ms REAL,
+    bytes_before INTEGER,
+    bytes_after INTEGER,
+    reclaimed_bytes INTEGER,
+    status TEXT NOT NULL DEFAULT 'running',
+    error TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_maintenance_runs_task ON maintenance_runs (task, started_at);
+'''
+
+STATUS_RUNNING = 'running'
+STATUS_OK = 'ok'
+STATUS_SKIPPED = 'skipped'
+STATUS_FAILED = 'failed'
+
+# Pages freed per incremental_vacuum step, and the time one run may spend on it
+VACUUM_STEP_PAGES = 256
+VACUUM_TIME_BUDGET = 2.0
+
+# Largest database migration 15 VACUUMs at startup; bigger files are
+# converted by the enable_incremental_vacuum task once the app is idle
+STARTUP_VACUUM_MAX_BYTES = 8 * 1024 * 1024
+
+# Rows sampled per index by ANALYZE; keeps it fast on large tables
+ANALYSIS_LIMIT = 1000
+
+
+@dataclass(frozen=True)
+class MaintenanceTask:
+    """A maintenance job and how often it should run.
+
+    ``run`` gets a pooled connection outside any transaction and returns
+    False when it had nothing to do.
+    """
+    name: str
+    interval: float
+    run: Callable[[sqlite3.Connection], Optional[bool]]
+
+
+def database_bytes(conn: sqlite3.Connection) -> int:
+    """Size of the main database in bytes (page_count x page_size)"""
+    page_count = conn.execute('PRAGMA page_count').fetchone()[0]
+    page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+    return page_count * page_size
+
+
+def enable_incremental_vacuum(conn: sqlite3.Connection) -> bool:
+    """Switch the file to auto_vacuum = INCREMENTAL (False if it already is).
+
+    The mode only takes effect through a full VACUUM, which rewrites the
+    whole database and holds the write lock while it does.
+    """
+    if conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2:
+        return False
+    # The requested mode belongs to this connection, so set it right before the VACUUM
+    conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+    conn.execute('VACUUM')
+    return True
+
+
+def incremental_vacuum(conn: sqlite3.Connection, step_pages: int = VACUUM_STEP_PAGES,
+                       time_budget: float = VACUUM_TIME_BUDGET) -> bool:
+    """Release free pages in small steps until none are left or the time budget is spent"""
+    if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+        return False  # only INCREMENTAL databases keep free pages around for this
+    if not conn.execute('PRAGMA freelist_count').fetchone()[0]:
+        return False
+
+    deadline = time.monotonic() + time_budget
+    # Each step is its own short write transaction so foreground writers can interleave
+    while conn.execute('PRAGMA freelist_count').fetchone()[0] and time.monotonic() < deadline:
+        conn.execute(f'PRAGMA incremental_vacuum({int(step_pages)})').fetchall()
+    return True
+
+
+def analyze(conn: sqlite3.Connection, analysis_limit: int = ANALYSIS_LIMIT):
+    """Refresh sqlite_stat1 with a sampled ANALYZE"""
+    conn.execute(f'PRAGMA analysis_limit = {int(analysis_limit)}')
+    conn.execute('ANALYZE')
+    conn.commit()
+
+
+def optimize(conn: sqlite3.Connection):
+    """Let SQLite re-analyze whatever recent queries showed to be stale"""
+    conn.execute('PRAGMA optimize').fetchall()
+    conn.commit()
+
+
+def default_tasks(db: 'DatabaseManager') -> List[MaintenanceTask]:
+    """The standard task list for a DatabaseManager"""
+    def analytics(conn: sqlite3.Connection):
+        db.run_analytics_maintenance()
+
+    def ai_cache(conn: sqlite3.Connection):
+        return db.evict_ai_response_cache() > 0
+
+    return [
+        MaintenanceTask('enable_incremental_vacuum', 24 * 3600.0, enable_incremental_vacuum),
+        MaintenanceTask('incremental_vacuum', 3600.0, incremental_vacuum),
+        MaintenanceTask('analyze', 24 * 3600.0, analyze),
+        MaintenanceTask('optimize', 3600.0, optimize),
+        MaintenanceTask('analytics', 3600.0, analytics),
+        MaintenanceTask('ai_cache', 3600.0, ai_cache),
+    ]
+
+
+class MaintenanceScheduler:
+    """Runs maintenance tasks on a daemon thread while the database is idle"""
+
+    def __init__(self, db: 'DatabaseManager', tasks: Optional[List[MaintenanceTask]] = None,
+                 idle_after: float = 30.0, check_interval: float = 15.0):
+        self.db = db
+        self.tasks = tasks if tasks is not None else default_tasks(db)
+        self.idle_after = idle_after
+        self.check_interval = check_interval
+        self._stop = threading.Event()
+        self._run_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._counters = {'checks': 0, 'busy': 0, 'runs': 0, 'failures': 0}
+
+    def start(self):
+        """Start the background thread (no-op if already running)"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name='db-maintenance', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the background thread, letting a running task finish"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _loop(self):
+        while not self._stop.wait(self.check_interval):
+            self._counters['checks'] += 1
+            if self.db.pool.idle_for() < self.idle_after:
+                self._counters['busy'] += 1
+                continue
+            try:
+                self.run_pending()
+            except Exception as e:
+                print(f"Error running database maintenance: {e}")
+
+    def run_pending(self, force: bool = False) -> List[Dict[str, Any]]:
+        """Run every due task (all of them with force=True) and return their run records"""
+        results = []
+        with self._run_lock:
+            for task in self.tasks:
+                if self._stop.is_set():
+                    break
+                # Only keep going while nobody else is using the database
+                if not force and results and self.db.pool.stats()['in_use']:
+                    break
+                run_id = self._claim(task, force)
+                if run_id is not None:
+                    results.append(self._run(task, run_id))
+        return results
+
+    def _claim(self, task: MaintenanceTask, force: bool) -> Optional[int]:
+        """Record a run as started unless one started within the task's interval"""
+        with self.db.connection() as conn:
+            if not conn.in_transaction:
+                conn.execute('BEGIN IMMEDIATE')
+            if not force:
+                recent = conn.execute(
+                    "SELECT 1 FROM maintenance_runs WHERE task = ? AND started_at > datetime('now', ?)",
+                    (task.name, f'-{int(task.interval)} seconds')
+                ).fetchone()
+                if recent is not None:
+                    return None
+            cursor = conn.execute('INSERT INTO maintenance_runs (task) VALUES (?)', (task.name,))
+            return cursor.lastrowid
+
+    def _run(self, task: MaintenanceTask, run_id: int) -> Dict[str, Any]:
+        conn = self.db.get_connection()
+        try:
+            before = database_bytes(conn)
+            started = time.perf_counter()
+            status, error = STATUS_OK, None
+            try:
+                if task.run(conn) is False:
+                    status = STATUS_SKIPPED
+            except Exception as e:
+                if conn.in_transaction:
+                    conn.rollback()
+                status, error = STATUS_FAILED, str(e)
+                self._counters['failures'] += 1
+            duration_ms = (time.perf_counter() - started) * 1000
+            after = database_bytes(conn)
+            record = {
+                'id': run_id, 'task': task.name, 'status': status, 'error': error,
+                'duration_ms': duration_ms, 'bytes_before': before, 'bytes_after': after,
+                'reclaimed_bytes': before - after
+            }
+            conn.execute(
+                '''
+                UPDATE maintenance_runs
+                SET status = ?, error = ?, duration_ms = ?, bytes_before = ?, bytes_after = ?,
+                    reclaimed_bytes = ?
+                WHERE id = ?
+                ''',
+                (status, error, duration_ms, before, after, before - after, run_id)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        self._counters['runs'] += 1
+        return record
+
+    def stats(self) -> Dict[str, Any]:
+        """Get check, busy-skip, run and failure counters"""
+        return {'running': self._thread is not None, **self._counters}
+
+
+def recent_runs(conn: sqlite3.Connection, limit: int = 20) -> RowSet:
+    """Get the latest maintenance runs, newest first"""
+    return query_rows(
+        conn,
+        'SELECT * FROM maintenance_runs ORDER BY id DESC LIMIT ?',
+        (limit,)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', default='nbp_sales.db')
+    parser.add_argument('--task', action='append', help='run only these tasks (default: all)')
+    args = parser.parse_args()
+
+    from database.models import DatabaseManager
+
+    manager = DatabaseManager(args.db, maintenance=False)
+    try:
+        scheduler = MaintenanceScheduler(manager)
+        if args.task:
+            scheduler.tasks = [task for task in scheduler.tasks if task.name in args.task]
+        for run in scheduler.run_pending(force=True):
+            line = f"{run['task']:<20} {run['status']:<8} {run['duration_ms']:8.1f} ms"
+            if run['reclaimed_bytes']:
+                line += f"  reclaimed {run['reclaimed_bytes']:,} bytes"
+            if run['error']:
+                line += f"  ({run['error']})"
+            print(line)
+    finally:
+        manager.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+import sqlite3
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from .counters import COUNTERS_SCHEMA, rebuild_counters
+from .analytics_store import ANALYTICS_SCHEMA, migrate_legacy_table
+from .search import SEARCH_SCHEMA, rebuild_search_indexes
+from .blobs import BLOBS_SCHEMA, SCRIPT_INDEX_SCHEMA, SCRIPT_STORE_SCHEMA, migrate_inline_content, reindex_scripts
+from .invalidation import CHANGE_LOG_SCHEMA
+from .integrity import cleanup_orphans, rebuild_with_cascade
+from .maintenance import MAINTENANCE_SCHEMA, STARTUP_VACUUM_MAX_BYTES, database_bytes, enable_incremental_vacuum
+from .dedupe import DEDUPE_SCHEMA, backfill
+from .response_cache import RESPONSE_CACHE_SCHEMA
+
+
+@dataclass(frozen=True)
+class Migration:
+    """A single, ordered schema change.
+
+    Either ``sql`` (a script of one or more statements) or ``apply`` (a
+    callable taking the connection) performs the change. Transactional
+    migrations run inside BEGIN IMMEDIATE together with their
+    ``schema_version`` row; set ``transactional=False`` for steps such as
+    VACUUM that SQLite refuses to run inside a transaction.
+    """
+    version: int
+    description: str
+    sql: Optional[str] = None
+    apply: Optional[Callable[[sqlite3.Connection], None]] = None
+    transactional: bool = True
+
+
+def enable_incremental_vacuum_if_small(conn: sqlite3.Connection):
+    """Convert small databases now; the full VACUUM on a large one is left to idle-time maintenance"""
+    if database_bytes(conn) <= STARTUP_VACUUM_MAX_BYTES:
+        enable_incremental_vacuum(conn)
+
+
+def index_script_text(conn: sqlite3.Connection):
+    """Fill the self-contained script index, then reset every index's ranking"""
+    reindex_scripts(conn)
+    rebuild_search_indexes(conn)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(
+        1,
+        'Index prospects by owner and recency',
+        sql='CREATE INDEX IF NOT EXISTS idx_prospects_user_created ON prospects (user_id, created_at)'
+    ),
+    Migration(
+        2,
+        'Index contacts by prospect in display order',
+        sql='''
+            CREATE INDEX IF NOT EXISTS idx_contacts_prospect_order
+            ON additional_contacts (prospect_id, is_primary DESC, created_at ASC)
+        '''
+    ),
+    Migration(
+        3,
+        'Index generated scripts by prospect and by user',
+        sql='''
+            CREATE INDEX IF NOT EXISTS idx_scripts_prospect_created ON generated_scripts (prospect_id, created_at);
+            CREATE INDEX IF NOT EXISTS idx_scripts_user_created ON generated_scripts (user_id, created_at);
+        '''
+    ),
+    Migration(
+        4,
+        'Index analytics by user and recency',
+        sql='CREATE INDEX IF NOT EXISTS idx_analytics_user_created ON analytics (user_id, created_at)'
+    ),
+    Migration(
+        5,
+        'Trigger-maintained per-user and global row counters',
+        sql=COUNTERS_SCHEMA,
+        apply=rebuild_counters
+    ),
+    Migration(
+        6,
+        'Index generated scripts by recency for keyset pagination',
+        sql='CREATE INDEX IF NOT EXISTS idx_scripts_created ON generated_scripts (created_at)'
+    ),
+    Migration(
+        7,
+        'Monthly analytics partitions behind an analytics view, with daily rollups',
+        sql=ANALYTICS_SCHEMA,
+        apply=migrate_legacy_table
+    ),
+    Migration(
+        8,
+        'FTS5 search indexes over prospects, contacts and generated scripts',
+        sql=SEARCH_SCHEMA,
+        apply=rebuild_search_indexes
+    ),
+    Migration(
+        9,
+        'Compressed, deduplicated script bodies in script_blobs',
+        sql=BLOBS_SCHEMA,
+        apply=migrate_inline_content
+    ),
+    Migration(
+        10,
+        'Index script search through the inflating generated_scripts_text view',
+        sql=SCRIPT_STORE_SCHEMA,
+        apply=rebuild_search_indexes
+    ),
+    Migration(
+        11,
+        'Trigger-fed change log for cross-process cache invalidation',
+        sql=CHANGE_LOG_SCHEMA
+    ),
+    Migration(
+        12,
+        'Index the remaining foreign keys, which enforced constraints look up on parent writes',
+        sql='''
+            CREATE INDEX IF NOT EXISTS idx_sales_pitches_user ON sales_pitches (user_id);
+            CREATE INDEX IF NOT EXISTS idx_feedback_pitch ON feedback (pitch_id);
+        '''
+    ),
+    Migration(
+        13,
+        'Delete contacts and scripts left behind by deleted prospects',
+        apply=cleanup_orphans
+    ),
+    Migration(
+        14,
+        'Cascade prospect deletes to contacts and generated scripts',
+        apply=rebuild_with_cascade,
+        transactional=False
+    ),
+    Migration(
+        15,
+        'Incremental auto-vacuum so idle-time maintenance can return free pages',
+        apply=enable_incremental_vacuum_if_small,
+        transactional=False
+    ),
+    Migration(
+        16,
+        'Maintenance run history',
+        sql=MAINTENANCE_SCHEMA
+    ),
+    Migration(
+        17,
+        'Normalized company name, reversed name and website domain columns for duplicate detection',
+        sql=DEDUPE_SCHEMA,
+        apply=backfill
+    ),
+    Migration(
+        18,
+        'Persistent cache of AI responses keyed by a hash of the request',
+        sql=RESPONSE_CACHE_SCHEMA
+    ),
+    Migration(
+        19,
+        'Script search and blob triggers in plain SQL, without the inflate() function',
+        sql=SCRIPT_INDEX_SCHEMA,
+        apply=index_script_text
+    ),
+]
+
+
+def ensure_version_table(conn: sqlite3.Connection):
+    """Create the schema_version bookkeeping table"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.commit()
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Get the highest applied migration version (0 for a fresh database)"""
+    ensure_version_table(conn)
+    row = conn.execute('SELECT MAX(version) FROM schema_version').fetchone()
+    return row[0] or 0
+
+
+def _is_applied(conn: sqlite3.Connection, version: int) -> bool:
+    row = conn.execute('SELECT 1 FROM schema_version WHERE version = ?', (version,)).fetchone()
+    return row is not None
+
+
+def _record(conn: sqlite3.Connection, migration: Migration):
+    conn.execute(
+        'INSERT OR IGNORE INTO schema_version (version, description) VALUES (?, ?)',
+        (migration.version, migration.description)
+    )
+
+
+def _apply_body(conn: sqlite3.Connection, migration: Migration):
+    if migration.sql:
+        # executescript() would commit our open transaction first, so run
+        # the statements one by one through the same transaction
+        for statement in _split_statements(migration.sql):
+            conn.execute(statement)
+    if migration.apply:
+        migration.apply(conn)
+
+
+def _split_statements(script: str) -> List[str]:
+    """Split a SQL script into complete statements (trigger bodies stay intact)"""
+    statements, buffer = [], ''
+    for line in script.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            if buffer.strip():
+                statements.append(buffer.strip())
+            buffer = ''
+    if buffer.strip():
+        statements.append(buffer.strip())
+    return statements
+
+
+def run_migrations(conn: sqlite3.Connection, migrations: Optional[List[Migration]] = None) -> List[int]:
+    """Apply pending migrations in version order and return the versions applied"""
+    migrations = sorted(migrations if migrations is not None else MIGRATIONS, key=lambda m: m.version)
+    current = get_schema_version(conn)
+    applied = []
+
+    for migration in migrations:
+        if migration.version <= current:
+            continue
+
+        if not migration.transactional:
+            # Another process may have got here first
+            if _is_applied(conn, migration.version):
+                continue
+            _apply_body(conn, migration)
+            _record(conn, migration)
+            conn.commit()
+            applied.append(migration.version)
+            continue
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # Re-check under the write lock in case another process got here first
+            if _is_applied(conn, migration.version):
+                conn.rollback()
+                continue
+            _apply_body(conn, migration)
+            _record(conn, migration)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(migration.version)
+
+    return applied
@@ -1,23 +1,211 @@
 import sqlite3
-import pandas as pd
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Iterator, Tuple, Union
 import os
+import threading
+import time
+
+from .backends import StorageBackend, get_backend
+from .pool import ConnectionPool, PooledConnection
+from .profiles import StorageProfile, get_profile
+from .migrations import run_migrations
+from .counters import rebuild_counters, verify_counters
+from .rows import RowSet, query_one, query_rows
+from .analytics_sink import AnalyticsSink
+from . import analytics_store
+from .search import build_match_query, optimize_search_indexes, scoped_match
+from .blobs import (
+    SCRIPT_TEXT_COLUMNS, SCRIPT_TEXT_SOURCE, index_script, register_functions, storage_stats, store_blob
+)
+from .cache import LRUCache
+from .invalidation import InvalidationBus
+from .maintenance import MaintenanceScheduler, recent_runs
+from .dedupe import find_duplicates, find_exact_duplicates, name_keys, website_domain
+from . import response_cache
+
+_INSERT_PROSPECT_SQL = '''
+    INSERT INTO prospects (
+        user_id, company_name, website, industry, company_size,
+        business_category, meeting_objective, context, notes,
+        normalized_name, name_reversed, website_domain
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+_INSERT_CONTACT_SQL = '''
+    INSERT INTO additional_contacts (
+        prospect_id, contact_name, title, linkedin_url, email, phone, is_primary
+    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+def _prospect_params(user_id: int, prospect_data: Dict[str, Any]) -> Tuple:
+    """Bind values for _INSERT_PROSPECT_SQL"""
+    return (
+        user_id,
+        prospect_data['company_name'],
+        prospect_data.get('website'),
+        prospect_data.get('industry'),
+        prospect_data.get('company_size'),
+        prospect_data.get('business_category'),
+        prospect_data.get('meeting_objective'),
+        prospect_data.get('context'),
+        prospect_data.get('notes'),
+        *name_keys(prospect_data['company_name']),
+        website_domain(prospect_data.get('website'))
+    )
+
+
+def _contact_params(prospect_id: int, contact_data: Dict[str, Any]) -> Tuple:
+    """Bind values for _INSERT_CONTACT_SQL"""
+    return (
+        prospect_id,
+        contact_data['contact_name'],
+        contact_data.get('title'),
+        contact_data.get('linkedin_url'),
+        contact_data.get('email'),
+        contact_data.get('phone'),
+        contact_data.get('is_primary', False)
+    )
+
+
+def _autoincrement_seq(cursor: sqlite3.Cursor, table: str) -> int:
+    """Get the last id handed out by an AUTOINCREMENT table (0 if none yet)"""
+    row = cursor.execute('SELECT seq FROM sqlite_sequence WHERE name = ?', (table,)).fetchone()
+    return row[0] if row else 0
+
+
+# Keyset cursor that sorts after every real (created_at, id) pair, used for the first page
+_FIRST_PAGE_CURSOR = ('9999-12-31 23:59:59', 2 ** 63 - 1)
+
+
+def _keyset_params(after_created_at: Optional[str], after_id: Optional[int],
+                   limit: Optional[int]) -> Tuple[str, int, int]:
+    """Bind values for a `(created_at, id) < (?, ?) ... LIMIT ?` page query"""
+    if (after_created_at is None) != (after_id is None):
+        raise ValueError("after_created_at and after_id must be given together")
+    if after_created_at is None:
+        after_created_at, after_id = _FIRST_PAGE_CURSOR
+    # SQLite treats a negative LIMIT as no limit
+    return after_created_at, after_id, -1 if limit is None else limit
+
+
+def _iter_pages(fetch_page: Callable[..., RowSet], chunk_size: int) -> Iterator[RowSet]:
+    """Follow keyset pages until exhausted; each page borrows its own pooled connection"""
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    after_created_at, after_id = None, None
+    while True:
+        page = fetch_page(limit=chunk_size, after_created_at=after_created_at, after_id=after_id)
+        if page.empty:
+            return
+        yield page
+        if len(page) < chunk_size:
+            return
+        after_created_at, after_id = page[-1]['created_at'], page[-1]['id']
+
+
+# The hardcoded login (see auth.py)
+DEFAULT_USERNAME = 'sales_rep'
+
+# Raw analytics partitions older than this are dropped; empty disables retention
+DEFAULT_ANALYTICS_RETENTION_DAYS = os.getenv('NBP_ANALYTICS_RETENTION_DAYS', '365')
+
+# Dashboards re-run the rollup at most this often (seconds); in between they
+# count the days not yet rolled up from the raw events
+ROLLUP_INTERVAL = 60.0
+
 
 class DatabaseManager:
     """Database manager for NBP Sales Preparation Tool"""
     
-    def __init__(self, db_path: str = 'nbp_sales.db'):
-        self.db_path = db_path
+    def __init__(self, db_path: Union[str, StorageBackend, None] = None, pool_size: int = 8,
+                 pool_timeout: float = 30.0, health_check_interval: float = 30.0,
+                 profile: Union[str, StorageProfile, None] = None,
+                 analytics_retention_days: Optional[int] = None,
+                 cache_size: int = 1024, cache_ttl: float = 300.0,
+                 invalidation_poll_interval: float = 0.25,
+                 maintenance: bool = True, maintenance_idle_after: float = 30.0):
+        # A path, a backend URL such as 'memory:', or a backend object; NBP_DATABASE_URL when omitted
+        self.backend = get_backend(db_path)
+        self._owns_backend = not isinstance(db_path, StorageBackend)
+        self.db_path = self.backend.location
+        self.profile = get_profile(profile)
+        if analytics_retention_days is None and DEFAULT_ANALYTICS_RETENTION_DAYS:
+            analytics_retention_days = int(DEFAULT_ANALYTICS_RETENTION_DAYS)
+        self.analytics_retention_days = analytics_retention_days
+        self._last_rollup = 0.0
+        self.pool = ConnectionPool(
+            self.backend,
+            max_size=pool_size,
+            timeout=pool_timeout,
+            health_check_interval=health_check_interval,
+            on_connect=self._on_connect
+        )
+        self.analytics_sink = AnalyticsSink(self)
+        # Prospect and contact lookups; cache_size=0 disables caching
+        self.cache = LRUCache(max_entries=cache_size, ttl=cache_ttl)
+        # AI response cache hits and misses waiting for the next cache write
+        self.ai_cache_usage = response_cache.CacheUsage()
         self.init_database()
+        # Picks up prospect and contact writes made by other processes
+        self.invalidation = InvalidationBus(self.backend, self.cache, poll_interval=invalidation_poll_interval)
+        # Vacuum, ANALYZE and optimize once nothing has touched the pool for a while
+        self.maintenance = MaintenanceScheduler(self, idle_after=maintenance_idle_after)
+        if maintenance:
+            self.maintenance.start()
+    
+    def _on_connect(self, conn: sqlite3.Connection):
+        """Prepare each new pooled connection"""
+        self.profile.apply(conn)
+        register_functions(conn)
+    
+    def get_connection(self) -> PooledConnection:
+        """Get a pooled database connection; close() returns it to the pool"""
+        return self.pool.acquire()
+    
+    @contextmanager
+    def connection(self) -> Iterator[PooledConnection]:
+        """Borrow a pooled connection, committing on success and rolling back on error.
+        
+        Nested use on the same thread shares one connection and one transaction,
+        which is committed when the outermost block exits.
+        """
+        conn = self.get_connection()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            if not conn.nested:
+                conn.rollback()
+            raise
+        finally:
+            conn.close()
     
-    def get_connection(self):
-        """Get database connection"""
-        return sqlite3.connect(self.db_path)
+    def close(self):
+        """Stop maintenance, flush pending analytics and cache counts and close all pooled connections"""
+        self.maintenance.stop()
+        self.analytics_sink.close()
+        try:
+            self.flush_ai_cache_usage()
+        except sqlite3.Error as e:
+            print(f"Error writing AI cache statistics: {e}")
+        self.invalidation.close()
+        self.pool.close_all()
+        if self._owns_backend:
+            self.backend.close()
     
     def init_database(self):
         """Initialize database with required tables"""
-        conn = self.get_connection()
+        with self.connection() as conn:
+            self._create_tables(conn)
+            # Indexes and later schema changes
+            run_migrations(conn)
+        
+        self.run_analytics_maintenance()
+    
+    def _create_tables(self, conn: PooledConnection):
+        """Create the base tables of the original schema"""
         cursor = conn.cursor()
         
         # Users table
@@ -30,6 +218,12 @@ class DatabaseManager:
             )
         ''')
         
+        # Foreign keys are enforced, so the hardcoded login needs a users row. Its id
+        # is whatever the database gives it (1 in a new one); see ensure_user()
+        cursor.execute(
+            "INSERT OR IGNORE INTO users (username, password_hash) VALUES (?, '')", (DEFAULT_USERNAME,)
+        )
+        
         # Prospects table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS prospects (
@@ -61,7 +255,7 @@ class DatabaseManager:
                 phone TEXT,
                 is_primary BOOLEAN DEFAULT 0,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (prospect_id) REFERENCES prospects (id)
+                FOREIGN KEY (prospect_id) REFERENCES prospects (id) ON DELETE CASCADE
             )
         ''')
         
@@ -76,7 +270,7 @@ class DatabaseManager:
                 ai_model TEXT,
                 tokens_used INTEGER,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (prospect_id) REFERENCES prospects (id),
+                FOREIGN KEY (prospect_id) REFERENCES prospects (id) ON DELETE CASCADE,
                 FOREIGN KEY (user_id) REFERENCES users (id)
             )
         ''')
@@ -121,7 +315,6 @@ class DatabaseManager:
         ''')
         
         conn.commit()
-        conn.close()
     
     # User operations
     def create_user(self, username: str, password_hash: str) -> bool:
@@ -141,353 +334,726 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    def ensure_user(self, username: str) -> int:
+        """Get the id of a user, creating one without a password if none exists.
+        
+        Logins checked outside the database (the hardcoded credentials) use
+        this for the user_id they write with, so it always names a real row.
+        The user normally exists, so it is looked up first and the write lock
+        is only taken to create it.
+        """
+        conn = self.get_connection()
+        try:
+            row = conn.execute('SELECT id FROM users WHERE username = ?', (username,)).fetchone()
+        finally:
+            conn.close()
+        if row is not None:
+            return row[0]
+        with self.connection() as conn:
+            conn.execute("INSERT OR IGNORE INTO users (username, password_hash) VALUES (?, '')", (username,))
+            return conn.execute('SELECT id FROM users WHERE username = ?', (username,)).fetchone()[0]
+    
     def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
         """Get user by username"""
-        # For hardcoded auth, return hardcoded user data
-        if username == "sales_rep":
-            return {
-                "id": 1,
-                "username": "sales_rep",
-                "created_at": "2024-01-01"
-            }
-        
-        # Fallback to database lookup for other users
         conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM users WHERE username = ?', (username,))
-        result = cursor.fetchone()
-        conn.close()
-        
-        if result:
-            columns = [description[0] for description in cursor.description]
-            return dict(zip(columns, result))
-        return None
+        try:
+            return query_one(conn, 'SELECT * FROM users WHERE username = ?', (username,))
+        finally:
+            conn.close()
     
     def get_user_by_id(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Get user by ID"""
-        if user_id == 1:  # Hardcoded user
-            return {
-                "id": 1,
-                "username": "sales_rep",
-                "created_at": "2024-01-01"
-            }
-        
         conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM users WHERE id = ?', (user_id,))
-        result = cursor.fetchone()
-        conn.close()
-        
-        if result:
-            columns = [description[0] for description in cursor.description]
-            return dict(zip(columns, result))
-        return None
+        try:
+            return query_one(conn, 'SELECT * FROM users WHERE id = ?', (user_id,))
+        finally:
+            conn.close()
     
     # Prospect operations
     def create_prospect(self, user_id: int, prospect_data: Dict[str, Any]) -> int:
         """Create a new prospect"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.execute(_INSERT_PROSPECT_SQL, _prospect_params(user_id, prospect_data))
+            return cursor.lastrowid
+    
+    def create_prospect_with_contacts(self, user_id: int, prospect_data: Dict[str, Any],
+                                      contacts: Optional[List[Dict[str, Any]]] = None) -> int:
+        """Create a prospect and its contacts in a single transaction"""
+        if contacts is None:
+            contacts = prospect_data.get('contacts') or []
+        return self.create_prospects_with_contacts(user_id, [dict(prospect_data, contacts=contacts)])[0]
+    
+    def create_prospects_with_contacts(self, user_id: int, prospects: List[Dict[str, Any]]) -> List[int]:
+        """Create many prospects, each with an optional 'contacts' list, in a single transaction.
         
-        cursor.execute('''
-            INSERT INTO prospects (
-                user_id, company_name, website, industry, company_size,
-                business_category, meeting_objective, context, notes
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            user_id,
-            prospect_data['company_name'],
-            prospect_data.get('website'),
-            prospect_data.get('industry'),
-            prospect_data.get('company_size'),
-            prospect_data.get('business_category'),
-            prospect_data.get('meeting_objective'),
-            prospect_data.get('context'),
-            prospect_data.get('notes')
-        ))
+        Prospects and contacts are each written with one executemany(), so the
+        whole batch costs a single commit. Returns the new prospect IDs in input order.
+        """
+        if not prospects:
+            return []
         
-        prospect_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            if not conn.in_transaction:
+                # Take the write lock before reading the id sequence
+                cursor.execute('BEGIN IMMEDIATE')
+            
+            # Under the write lock AUTOINCREMENT hands out consecutive ids after the stored sequence
+            first_id = _autoincrement_seq(cursor, 'prospects') + 1
+            cursor.executemany(
+                _INSERT_PROSPECT_SQL,
+                [_prospect_params(user_id, prospect) for prospect in prospects]
+            )
+            last_id = _autoincrement_seq(cursor, 'prospects')
+            if last_id - first_id + 1 != len(prospects):
+                raise sqlite3.DatabaseError("Prospect ids were not allocated consecutively")
+            prospect_ids = list(range(first_id, last_id + 1))
+            
+            contact_rows = [
+                _contact_params(prospect_id, contact)
+                for prospect_id, prospect in zip(prospect_ids, prospects)
+                for contact in prospect.get('contacts') or []
+            ]
+            if contact_rows:
+                cursor.executemany(_INSERT_CONTACT_SQL, contact_rows)
         
-        return prospect_id
+        return prospect_ids
     
-    def get_user_prospects(self, user_id: int) -> pd.DataFrame:
-        """Get all prospects for a user"""
+    def get_user_prospects(self, user_id: int, limit: Optional[int] = None,
+                           after_created_at: Optional[str] = None,
+                           after_id: Optional[int] = None) -> RowSet:
+        """Get a user's prospects, newest first, optionally one keyset page at a time"""
         conn = self.get_connection()
-        prospects = pd.read_sql_query(
-            'SELECT * FROM prospects WHERE user_id = ? ORDER BY created_at DESC',
-            conn, params=[user_id]
+        try:
+            return query_rows(
+                conn,
+                '''
+                SELECT * FROM prospects
+                WHERE user_id = ? AND (created_at, id) < (?, ?)
+                ORDER BY created_at DESC, id DESC LIMIT ?
+                ''',
+                (user_id, *_keyset_params(after_created_at, after_id, limit))
+            )
+        finally:
+            conn.close()
+    
+    def iter_user_prospects(self, user_id: int, chunk_size: int = 500) -> Iterator[RowSet]:
+        """Stream a user's prospects in chunks, newest first"""
+        return _iter_pages(
+            lambda **page: self.get_user_prospects(user_id, **page), chunk_size
         )
-        conn.close()
-        return prospects
     
     def get_prospect_by_id(self, prospect_id: int) -> Optional[Dict[str, Any]]:
-        """Get prospect by ID"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM prospects WHERE id = ?', (prospect_id,))
-        result = cursor.fetchone()
-        conn.close()
+        """Get prospect by ID (served from the cache when possible)"""
+        def load():
+            conn = self.get_connection()
+            try:
+                return query_one(conn, 'SELECT * FROM prospects WHERE id = ?', (prospect_id,))
+            finally:
+                conn.close()
         
-        if result:
-            columns = [description[0] for description in cursor.description]
-            return dict(zip(columns, result))
-        return None
+        self.invalidation.poll()
+        result = self.cache.get_or_load(('prospect', prospect_id), load)
+        # Hand out a copy so callers cannot modify the cached dict
+        return dict(result) if result is not None else None
     
     def update_prospect(self, prospect_id: int, prospect_data: Dict[str, Any]) -> bool:
         """Update a prospect"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE prospects 
-            SET company_name = ?, website = ?, industry = ?, company_size = ?,
-                business_category = ?, meeting_objective = ?, context = ?, notes = ?,
-                updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        ''', (
-            prospect_data['company_name'],
-            prospect_data.get('website'),
-            prospect_data.get('industry'),
-            prospect_data.get('company_size'),
-            prospect_data.get('business_category'),
-            prospect_data.get('meeting_objective'),
-            prospect_data.get('context'),
-            prospect_data.get('notes'),
-            prospect_id
-        ))
-        
-        affected_rows = cursor.rowcount
-        conn.commit()
-        conn.close()
+        with self.connection() as conn:
+            cursor = conn.execute('''
+                UPDATE prospects 
+                SET company_name = ?, website = ?, industry = ?, company_size = ?,
+                    business_category = ?, meeting_objective = ?, context = ?, notes = ?,
+                    normalized_name = ?, name_reversed = ?, website_domain = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', (
+                prospect_data['company_name'],
+                prospect_data.get('website'),
+                prospect_data.get('industry'),
+                prospect_data.get('company_size'),
+                prospect_data.get('business_category'),
+                prospect_data.get('meeting_objective'),
+                prospect_data.get('context'),
+                prospect_data.get('notes'),
+                *name_keys(prospect_data['company_name']),
+                website_domain(prospect_data.get('website')),
+                prospect_id
+            ))
+            affected_rows = cursor.rowcount
+        self._invalidate_prospect(prospect_id)
         
         return affected_rows > 0
     
+    def find_duplicate_prospects(self, user_id: int, company_name: str, website: Optional[str] = None,
+                                 limit: int = 5) -> List[Dict[str, Any]]:
+        """Existing prospects of the user that look like this company (same website, same or similar name)"""
+        conn = self.get_connection()
+        try:
+            return find_duplicates(conn, user_id, company_name, website, limit=limit)
+        finally:
+            conn.close()
+    
+    def find_exact_duplicate_prospects(self, user_id: int, companies: List[Tuple[str, Optional[str]]]
+                                       ) -> List[Optional[Dict[str, Any]]]:
+        """Same-website or same-name match (or None) for each (company_name, website), checked as one batch"""
+        conn = self.get_connection()
+        try:
+            return find_exact_duplicates(conn, user_id, companies)
+        finally:
+            conn.close()
+    
     def delete_prospect(self, prospect_id: int) -> bool:
         """Delete a prospect"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('DELETE FROM prospects WHERE id = ?', (prospect_id,))
-        affected_rows = cursor.rowcount
-        conn.commit()
-        conn.close()
+        with self.connection() as conn:
+            affected_rows = conn.execute('DELETE FROM prospects WHERE id = ?', (prospect_id,)).rowcount
+        self._invalidate_prospect(prospect_id)
         
         return affected_rows > 0
     
+    def _invalidate_prospect(self, prospect_id: int):
+        """Drop a prospect and its contacts from the cache"""
+        self.cache.invalidate(('prospect', prospect_id), ('contacts', prospect_id))
+    
     # Contact operations
     def create_contact(self, prospect_id: int, contact_data: Dict[str, Any]) -> int:
         """Create a new contact"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO additional_contacts (
-                prospect_id, contact_name, title, linkedin_url, email, phone, is_primary
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            prospect_id,
-            contact_data['contact_name'],
-            contact_data.get('title'),
-            contact_data.get('linkedin_url'),
-            contact_data.get('email'),
-            contact_data.get('phone'),
-            contact_data.get('is_primary', False)
-        ))
-        
-        contact_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        with self.connection() as conn:
+            contact_id = conn.execute(_INSERT_CONTACT_SQL, _contact_params(prospect_id, contact_data)).lastrowid
+        self.cache.invalidate(('contacts', prospect_id))
         
         return contact_id
     
-    def get_prospect_contacts(self, prospect_id: int) -> pd.DataFrame:
-        """Get all contacts for a prospect"""
-        conn = self.get_connection()
-        contacts = pd.read_sql_query(
-            'SELECT * FROM additional_contacts WHERE prospect_id = ? ORDER BY is_primary DESC, created_at ASC',
-            conn, params=[prospect_id]
-        )
-        conn.close()
-        return contacts
+    def get_prospect_contacts(self, prospect_id: int) -> RowSet:
+        """Get all contacts for a prospect (served from the cache when possible)"""
+        def load():
+            conn = self.get_connection()
+            try:
+                return query_rows(
+                    conn,
+                    'SELECT * FROM additional_contacts WHERE prospect_id = ? ORDER BY is_primary DESC, created_at ASC',
+                    (prospect_id,)
+                )
+            finally:
+                conn.close()
+        
+        self.invalidation.poll()
+        contacts = self.cache.get_or_load(('contacts', prospect_id), load)
+        # Rows are immutable; a fresh RowSet keeps any to_frame() result out of the cache
+        return RowSet(contacts.columns, contacts.rows)
+    
+    def _contact_prospect_id(self, cursor: sqlite3.Cursor, contact_id: int) -> Optional[int]:
+        """Look up which prospect a contact belongs to, for cache invalidation"""
+        row = cursor.execute('SELECT prospect_id FROM additional_contacts WHERE id = ?', (contact_id,)).fetchone()
+        return row[0] if row else None
     
     def update_contact(self, contact_id: int, contact_data: Dict[str, Any]) -> bool:
         """Update a contact"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE additional_contacts 
-            SET contact_name = ?, title = ?, linkedin_url = ?, email = ?, phone = ?, is_primary = ?
-            WHERE id = ?
-        ''', (
-            contact_data['contact_name'],
-            contact_data.get('title'),
-            contact_data.get('linkedin_url'),
-            contact_data.get('email'),
-            contact_data.get('phone'),
-            contact_data.get('is_primary', False),
-            contact_id
-        ))
-        
-        affected_rows = cursor.rowcount
-        conn.commit()
-        conn.close()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            prospect_id = self._contact_prospect_id(cursor, contact_id)
+            cursor.execute('''
+                UPDATE additional_contacts 
+                SET contact_name = ?, title = ?, linkedin_url = ?, email = ?, phone = ?, is_primary = ?
+                WHERE id = ?
+            ''', (
+                contact_data['contact_name'],
+                contact_data.get('title'),
+                contact_data.get('linkedin_url'),
+                contact_data.get('email'),
+                contact_data.get('phone'),
+                contact_data.get('is_primary', False),
+                contact_id
+            ))
+            affected_rows = cursor.rowcount
+        self.cache.invalidate(('contacts', prospect_id))
         
         return affected_rows > 0
     
     def delete_contact(self, contact_id: int) -> bool:
         """Delete a contact"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('DELETE FROM additional_contacts WHERE id = ?', (contact_id,))
-        affected_rows = cursor.rowcount
-        conn.commit()
-        conn.close()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            prospect_id = self._contact_prospect_id(cursor, contact_id)
+            affected_rows = cursor.execute('DELETE FROM additional_contacts WHERE id = ?', (contact_id,)).rowcount
+        self.cache.invalidate(('contacts', prospect_id))
         
         return affected_rows > 0
     
     # Generated scripts operations
     def create_generated_script(self, prospect_id: int, user_id: int, script_data: Dict[str, Any]) -> int:
-        """Create a new generated script"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO generated_scripts (
-                prospect_id, user_id, script_type, content, ai_model, tokens_used
-            ) VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
-            prospect_id,
-            user_id,
-            script_data['script_type'],
-            script_data['content'],
-            script_data.get('ai_model'),
-            script_data.get('tokens_used')
-        ))
-        
-        script_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
-        return script_id
+        """Create a new generated script (its content goes to the compressed blob store)"""
+        with self.connection() as conn:
+            content_hash = store_blob(conn, script_data['content'])
+            cursor = conn.execute('''
+                INSERT INTO generated_scripts (
+                    prospect_id, user_id, script_type, content, content_hash, ai_model, tokens_used
+                ) VALUES (?, ?, ?, '', ?, ?, ?)
+            ''', (
+                prospect_id,
+                user_id,
+                script_data['script_type'],
+                content_hash,
+                script_data.get('ai_model'),
+                script_data.get('tokens_used')
+            ))
+            # Indexed here, while the text is at hand, so the schema never has to inflate it
+            index_script(conn, cursor.lastrowid, script_data['script_type'], script_data['content'], user_id)
+            return cursor.lastrowid
+    
+    def create_generated_scripts(self, user_id: int, scripts: List[Dict[str, Any]]) -> List[int]:
+        """Create many generated scripts, each with a 'prospect_id', in a single transaction"""
+        script_ids = []
+        with self.connection() as conn:
+            for script_data in scripts:
+                cursor = conn.execute('''
+                    INSERT INTO generated_scripts (
+                        prospect_id, user_id, script_type, content, content_hash, ai_model, tokens_used
+                    ) VALUES (?, ?, ?, '', ?, ?, ?)
+                ''', (
+                    script_data['prospect_id'],
+                    user_id,
+                    script_data['script_type'],
+                    store_blob(conn, script_data['content']),
+                    script_data.get('ai_model'),
+                    script_data.get('tokens_used')
+                ))
+                index_script(conn, cursor.lastrowid, script_data['script_type'], script_data['content'], user_id)
+                script_ids.append(cursor.lastrowid)
+        return script_ids
     
-    def get_prospect_scripts(self, prospect_id: int) -> pd.DataFrame:
+    def get_prospect_scripts(self, prospect_id: int, include_content: bool = True) -> RowSet:
         """Get all generated scripts for a prospect"""
+        if include_content:
+            # Bodies are only inflated for the rows returned
+            sql = f'''
+                SELECT {SCRIPT_TEXT_COLUMNS} FROM {SCRIPT_TEXT_SOURCE}
+                WHERE gs.prospect_id = ? ORDER BY gs.created_at DESC
+            '''
+        else:
+            sql = '''
+                SELECT id, prospect_id, user_id, script_type, ai_model, tokens_used, created_at
+                FROM generated_scripts WHERE prospect_id = ? ORDER BY created_at DESC
+            '''
         conn = self.get_connection()
-        scripts = pd.read_sql_query(
-            'SELECT * FROM generated_scripts WHERE prospect_id = ? ORDER BY created_at DESC',
-            conn, params=[prospect_id]
-        )
-        conn.close()
-        return scripts
+        try:
+            return query_rows(conn, sql, (prospect_id,))
+        finally:
+            conn.close()
     
-    def get_user_scripts(self, user_id: int) -> pd.DataFrame:
-        """Get all generated scripts for a user"""
+    def get_user_scripts(self, user_id: int, limit: Optional[int] = None,
+                         after_created_at: Optional[str] = None, after_id: Optional[int] = None,
+                         include_content: bool = True) -> RowSet:
+        """Get a user's generated scripts, newest first, optionally one keyset page at a time"""
+        if include_content:
+            sql = f'''
+                SELECT {SCRIPT_TEXT_COLUMNS} FROM {SCRIPT_TEXT_SOURCE}
+                WHERE gs.user_id = ? AND (gs.created_at, gs.id) < (?, ?)
+                ORDER BY gs.created_at DESC, gs.id DESC LIMIT ?
+            '''
+        else:
+            sql = '''
+                SELECT id, prospect_id, user_id, script_type, ai_model, tokens_used, created_at
+                FROM generated_scripts
+                WHERE user_id = ? AND (created_at, id) < (?, ?)
+                ORDER BY created_at DESC, id DESC LIMIT ?
+            '''
         conn = self.get_connection()
-        scripts = pd.read_sql_query(
-            'SELECT * FROM generated_scripts WHERE user_id = ? ORDER BY created_at DESC',
-            conn, params=[user_id]
+        try:
+            return query_rows(conn, sql, (user_id, *_keyset_params(after_created_at, after_id, limit)))
+        finally:
+            conn.close()
+    
+    def iter_user_scripts(self, user_id: int, chunk_size: int = 500,
+                          include_content: bool = False) -> Iterator[RowSet]:
+        """Stream a user's generated scripts in chunks, newest first"""
+        return _iter_pages(
+            lambda **page: self.get_user_scripts(user_id, include_content=include_content, **page),
+            chunk_size
         )
-        conn.close()
-        return scripts
     
-    # Analytics operations
-    def log_analytics(self, user_id: int, action_type: str, action_data: Optional[str] = None):
-        """Log user analytics"""
+    def get_generated_scripts(self, limit: Optional[int] = None,
+                              after_created_at: Optional[str] = None, after_id: Optional[int] = None,
+                              include_content: bool = True) -> RowSet:
+        """Get generated scripts of all users with prospect details, newest first"""
+        if include_content:
+            sql = f'''
+                SELECT 
+                    {SCRIPT_TEXT_COLUMNS},
+                    p.company_name,
+                    p.industry,
+                    p.meeting_objective
+                FROM {SCRIPT_TEXT_SOURCE}
+                LEFT JOIN prospects p ON gs.prospect_id = p.id
+                WHERE (gs.created_at, gs.id) < (?, ?)
+                ORDER BY gs.created_at DESC, gs.id DESC LIMIT ?
+            '''
+        else:
+            sql = '''
+                SELECT 
+                    gs.id, gs.prospect_id, gs.user_id, gs.script_type, gs.ai_model,
+                    gs.tokens_used, gs.created_at,
+                    p.company_name,
+                    p.industry,
+                    p.meeting_objective
+                FROM generated_scripts gs
+                LEFT JOIN prospects p ON gs.prospect_id = p.id
+                WHERE (gs.created_at, gs.id) < (?, ?)
+                ORDER BY gs.created_at DESC, gs.id DESC LIMIT ?
+            '''
         conn = self.get_connection()
-        cursor = conn.cursor()
+        try:
+            return query_rows(conn, sql, _keyset_params(after_created_at, after_id, limit))
+        finally:
+            conn.close()
+    
+    def iter_generated_scripts(self, chunk_size: int = 500,
+                               include_content: bool = False) -> Iterator[RowSet]:
+        """Stream generated scripts of all users in chunks, newest first"""
+        return _iter_pages(
+            lambda **page: self.get_generated_scripts(include_content=include_content, **page),
+            chunk_size
+        )
+    
+    # Search operations
+    def search(self, user_id: int, query: str, limit: int = 20) -> RowSet:
+        """Full-text search a user's prospects, contacts and generated scripts, best match first.
         
-        cursor.execute('''
-            INSERT INTO analytics (user_id, action_type, action_data)
-            VALUES (?, ?, ?)
-        ''', (user_id, action_type, action_data))
+        Each result has kind ('prospect', 'contact' or 'script'), id, prospect_id,
+        title, a snippet with matches in **bold**, and rank (lower is better).
+        """
+        match = build_match_query(query)
+        if match is None or limit < 1:
+            return RowSet(('kind', 'id', 'prospect_id', 'title', 'snippet', 'rank', 'created_at'), [])
         
-        conn.commit()
-        conn.close()
+        conn = self.get_connection()
+        try:
+            return query_rows(
+                conn,
+                '''
+                SELECT * FROM (
+                    SELECT 'prospect' AS kind, p.id, p.id AS prospect_id, p.company_name AS title,
+                           snippet(prospects_fts, -1, '**', '**', '…', 12) AS snippet,
+                           prospects_fts.rank, p.created_at
+                    FROM prospects_fts JOIN prospects p ON p.id = prospects_fts.rowid
+                    WHERE prospects_fts MATCH ?
+                    ORDER BY prospects_fts.rank LIMIT ?
+                )
+                UNION ALL
+                SELECT * FROM (
+                    SELECT 'contact', ac.id, ac.prospect_id, ac.contact_name,
+                           snippet(contacts_fts, -1, '**', '**', '…', 12),
+                           contacts_fts.rank, ac.created_at
+                    FROM contacts_fts
+                    JOIN additional_contacts ac ON ac.id = contacts_fts.rowid
+                    JOIN prospects p ON p.id = ac.prospect_id
+                    WHERE contacts_fts MATCH ? AND p.user_id = ?
+                    ORDER BY contacts_fts.rank LIMIT ?
+                )
+                UNION ALL
+                SELECT * FROM (
+                    SELECT 'script', gs.id, gs.prospect_id, gs.script_type,
+                           snippet(scripts_fts, -1, '**', '**', '…', 24),
+                           scripts_fts.rank, gs.created_at
+                    FROM scripts_fts JOIN generated_scripts gs ON gs.id = scripts_fts.rowid
+                    WHERE scripts_fts MATCH ?
+                    ORDER BY scripts_fts.rank LIMIT ?
+                )
+                ORDER BY rank LIMIT ?
+                ''',
+                (
+                    scoped_match('prospects_fts', match, user_id), limit,
+                    scoped_match('contacts_fts', match), user_id, limit,
+                    scoped_match('scripts_fts', match, user_id), limit,
+                    limit
+                )
+            )
+        finally:
+            conn.close()
     
-    def get_user_analytics(self, user_id: int) -> pd.DataFrame:
-        """Get analytics for a user"""
+    def get_script_storage_stats(self) -> Dict[str, Any]:
+        """Get logical vs deduplicated vs compressed sizes of stored script bodies"""
         conn = self.get_connection()
-        analytics = pd.read_sql_query(
-            'SELECT * FROM analytics WHERE user_id = ? ORDER BY created_at DESC',
-            conn, params=[user_id]
+        try:
+            return storage_stats(conn)
+        finally:
+            conn.close()
+    
+    def optimize_search(self):
+        """Merge the full-text indexes after heavy writes to keep searches fast"""
+        with self.connection() as conn:
+            optimize_search_indexes(conn)
+    
+    # AI response cache
+    def get_cached_ai_response(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get an unexpired cached AI response by its cache key.
+        
+        Only reads: the hit or miss is counted in memory and written with the
+        next cache write (see flush_ai_cache_usage).
+        """
+        conn = self.get_connection()
+        try:
+            cached = response_cache.lookup(conn, key)
+        finally:
+            conn.close()
+        if cached is None:
+            self.ai_cache_usage.miss()
+        else:
+            self.ai_cache_usage.hit(key, cached['tokens_used'])
+        return cached
+    
+    def cache_ai_response(self, key: str, model: str, content: str, tokens_used: int,
+                          ttl: Optional[float] = None) -> int:
+        """Cache an AI response and evict past the size limits; returns the entries evicted"""
+        with self.connection() as conn:
+            # Recent hits first, so eviction sees when entries were last used
+            response_cache.flush_usage(conn, self.ai_cache_usage)
+            return response_cache.store(
+                conn, key, model, content, tokens_used,
+                ttl=response_cache.DEFAULT_TTL if ttl is None else ttl
+            )
+    
+    def record_ai_cache_bypass(self):
+        """Count a forced regeneration that skipped the AI response cache (in memory, like hits)"""
+        self.ai_cache_usage.bypass()
+    
+    def flush_ai_cache_usage(self) -> int:
+        """Write the AI cache hits, misses and bypasses counted since the last cache write"""
+        with self.connection() as conn:
+            return response_cache.flush_usage(conn, self.ai_cache_usage)
+    
+    def evict_ai_response_cache(self) -> int:
+        """Drop expired cached AI responses and those beyond the size limits"""
+        with self.connection() as conn:
+            response_cache.flush_usage(conn, self.ai_cache_usage)
+            return response_cache.evict(conn)
+    
+    def clear_ai_response_cache(self) -> int:
+        """Delete every cached AI response"""
+        with self.connection() as conn:
+            return response_cache.clear(conn)
+    
+    def get_ai_cache_stats(self) -> Dict[str, Any]:
+        """Get hits, misses, bypasses, tokens saved and the size of the AI response cache"""
+        conn = self.get_connection()
+        try:
+            return response_cache.cache_stats(conn, self.ai_cache_usage.pending())
+        finally:
+            conn.close()
+    
+    # Analytics operations
+    def log_analytics(self, user_id: int, action_type: str, action_data: Optional[str] = None) -> bool:
+        """Log user analytics (queued and written in batches by the analytics sink)"""
+        return self.analytics_sink.log(user_id, action_type, action_data)
+    
+    def get_user_analytics(self, user_id: int, limit: Optional[int] = None,
+                           after_created_at: Optional[str] = None,
+                           after_id: Optional[int] = None) -> RowSet:
+        """Get a user's analytics events, newest first, optionally one keyset page at a time"""
+        # Include events still waiting in the sink
+        self.analytics_sink.flush()
+        conn = self.get_connection()
+        try:
+            return query_rows(
+                conn,
+                '''
+                SELECT * FROM analytics
+                WHERE user_id = ? AND (created_at, id) < (?, ?)
+                ORDER BY created_at DESC, id DESC LIMIT ?
+                ''',
+                (user_id, *_keyset_params(after_created_at, after_id, limit))
+            )
+        finally:
+            conn.close()
+    
+    def iter_user_analytics(self, user_id: int, chunk_size: int = 1000) -> Iterator[RowSet]:
+        """Stream a user's analytics events in chunks, newest first"""
+        return _iter_pages(
+            lambda **page: self.get_user_analytics(user_id, **page), chunk_size
         )
-        conn.close()
-        return analytics
+    
+    def roll_up_analytics(self) -> int:
+        """Fold recent analytics events into the daily per-user rollups"""
+        self.analytics_sink.flush()
+        with self.connection() as conn:
+            if not conn.in_transaction:
+                conn.execute('BEGIN IMMEDIATE')
+            written = analytics_store.roll_up(conn)
+        self._last_rollup = time.monotonic()
+        return written
+    
+    def run_analytics_maintenance(self, retention_days: Optional[int] = None) -> Dict[str, Any]:
+        """Roll up analytics and drop raw partitions past the retention window"""
+        if retention_days is None:
+            retention_days = self.analytics_retention_days
+        
+        self.analytics_sink.flush()
+        with self.connection() as conn:
+            if not conn.in_transaction:
+                conn.execute('BEGIN IMMEDIATE')
+            rolled_up = analytics_store.roll_up(conn)
+            dropped = []
+            if retention_days is not None:
+                dropped = analytics_store.apply_retention(conn, retention_days)
+        self._last_rollup = time.monotonic()
+        return {'rolled_up': rolled_up, 'dropped': dropped}
+    
+    def get_user_activity_summary(self, user_id: int, days: int = 30) -> RowSet:
+        """Get a user's daily action counts for the last `days` days.
+        
+        Days the rollup has finished come from the rollups; the days it will
+        recount next are counted from the raw events, so the user's latest
+        actions show up without waiting for the next rollup.
+        """
+        if time.monotonic() - self._last_rollup > ROLLUP_INTERVAL:
+            self.roll_up_analytics()
+        else:
+            # Include events still waiting in the sink
+            self.analytics_sink.flush()
+        conn = self.get_connection()
+        try:
+            start = conn.execute("SELECT date('now', ?)", (f'-{days} days',)).fetchone()[0]
+            watermark = analytics_store.rollup_watermark(conn)
+            return query_rows(
+                conn,
+                '''
+                SELECT day, action_type, count FROM analytics_daily
+                WHERE user_id = ? AND day >= ? AND day < ?
+                UNION ALL
+                SELECT date(created_at), action_type, COUNT(*) FROM analytics
+                WHERE user_id = ? AND created_at >= ?
+                GROUP BY date(created_at), action_type
+                ORDER BY day DESC, action_type
+                ''',
+                (user_id, start, watermark, user_id, max(start, watermark))
+            )
+        finally:
+            conn.close()
+    
+    def get_user_action_totals(self, user_id: int, days: int = 30) -> Dict[str, int]:
+        """Get a user's action counts per action type for the last `days` days"""
+        totals: Dict[str, int] = {}
+        for row in self.get_user_activity_summary(user_id, days):
+            totals[row['action_type']] = totals.get(row['action_type'], 0) + row['count']
+        return totals
     
     # Statistics operations
     def get_user_statistics(self, user_id: int) -> Dict[str, Any]:
         """Get comprehensive statistics for a user"""
         conn = self.get_connection()
+        try:
+            # Counters are kept current by triggers; the recent prospects ride along
+            # on the same query, one row each (or a single row of NULLs)
+            rows = conn.execute('''
+                SELECT c.prospects, c.contacts, c.scripts, r.company_name, r.created_at
+                FROM (SELECT ? AS user_id) AS u
+                LEFT JOIN user_counters c ON c.user_id = u.user_id
+                LEFT JOIN (
+                    SELECT company_name, created_at FROM prospects
+                    WHERE user_id = ? ORDER BY created_at DESC LIMIT 5
+                ) AS r
+                ORDER BY r.created_at DESC
+            ''', (user_id, user_id)).fetchall()
+        finally:
+            conn.close()
         
-        # Total prospects
-        prospect_count = pd.read_sql_query(
-            'SELECT COUNT(*) as count FROM prospects WHERE user_id = ?',
-            conn, params=[user_id]
-        ).iloc[0]['count']
-        
-        # Total contacts
-        contact_count = pd.read_sql_query('''
-            SELECT COUNT(*) as count 
-            FROM additional_contacts ac
-            JOIN prospects p ON ac.prospect_id = p.id
-            WHERE p.user_id = ?
-        ''', conn, params=[user_id]).iloc[0]['count']
-        
-        # Total scripts
-        script_count = pd.read_sql_query(
-            'SELECT COUNT(*) as count FROM generated_scripts WHERE user_id = ?',
-            conn, params=[user_id]
-        ).iloc[0]['count']
-        
-        # Recent prospects
-        recent_prospects = pd.read_sql_query(
-            'SELECT company_name, created_at FROM prospects WHERE user_id = ? ORDER BY created_at DESC LIMIT 5',
-            conn, params=[user_id]
-        )
-        
-        conn.close()
-        
+        prospect_count, contact_count, script_count = rows[0][:3]
         return {
-            'total_prospects': prospect_count,
-            'total_contacts': contact_count,
-            'total_scripts': script_count,
-            'recent_prospects': recent_prospects.to_dict('records')
+            'total_prospects': prospect_count or 0,
+            'total_contacts': contact_count or 0,
+            'total_scripts': script_count or 0,
+            'recent_prospects': [
+                {'company_name': row[3], 'created_at': row[4]}
+                for row in rows if row[3] is not None
+            ]
         }
     
     def get_database_stats(self) -> Dict[str, Any]:
         """Get overall database statistics"""
         conn = self.get_connection()
-        
-        # Total users
-        total_users = pd.read_sql_query('SELECT COUNT(*) as count FROM users', conn).iloc[0]['count']
-        
-        # Total prospects
-        total_prospects = pd.read_sql_query('SELECT COUNT(*) as count FROM prospects', conn).iloc[0]['count']
-        
-        # Total contacts
-        total_contacts = pd.read_sql_query('SELECT COUNT(*) as count FROM additional_contacts', conn).iloc[0]['count']
-        
-        # Total scripts
-        total_scripts = pd.read_sql_query('SELECT COUNT(*) as count FROM generated_scripts', conn).iloc[0]['count']
-        
-        conn.close()
+        try:
+            counters = dict(conn.execute('SELECT name, value FROM global_counters').fetchall())
+        finally:
+            conn.close()
         
         return {
-            'total_users': total_users,
-            'total_prospects': total_prospects,
-            'total_contacts': total_contacts,
-            'total_scripts': total_scripts
+            'total_users': counters.get('users', 0),
+            'total_prospects': counters.get('prospects', 0),
+            'total_contacts': counters.get('contacts', 0),
+            'total_scripts': counters.get('scripts', 0)
         }
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get hit/miss/eviction statistics of the prospect and contact cache"""
+        return {**self.cache.stats(), 'invalidation': self.invalidation.stats()}
+    
+    def run_maintenance(self, force: bool = False) -> List[Dict[str, Any]]:
+        """Run due maintenance tasks now (every task with force=True)"""
+        return self.maintenance.run_pending(force=force)
+    
+    def get_maintenance_runs(self, limit: int = 20) -> RowSet:
+        """Get the latest maintenance runs with their duration and reclaimed bytes"""
+        conn = self.get_connection()
+        try:
+            return recent_runs(conn, limit)
+        finally:
+            conn.close()
+    
+    def rebuild_counters(self):
+        """Recompute the statistics counters from the base tables"""
+        with self.connection() as conn:
+            rebuild_counters(conn)
+    
+    def verify_counters(self) -> List[Dict[str, Any]]:
+        """List statistics counters that disagree with the base tables"""
+        conn = self.get_connection()
+        try:
+            return verify_counters(conn)
+        finally:
+            conn.close()
+
+
+class LazyDatabaseManager:
+    """DatabaseManager proxy that opens the database on first attribute access, not at import"""
+    
+    def __init__(self, **options: Any):
+        self._options = options
+        self._manager: Optional[DatabaseManager] = None
+        self._lock = threading.Lock()
+    
+    def configure(self, db_path: Union[str, StorageBackend, None] = None, **options: Any):
+        """Set DatabaseManager arguments; only allowed before the database is opened"""
+        with self._lock:
+            if self._manager is not None:
+                raise RuntimeError("The database is already open; configure it before first use")
+            self._options = {'db_path': db_path, **options}
+    
+    @property
+    def is_open(self) -> bool:
+        return self._manager is not None
+    
+    def get(self) -> DatabaseManager:
+        """The underlying manager, opening it if needed"""
+        manager = self._manager
+        if manager is None:
+            with self._lock:
+                if self._manager is None:
+                    self._manager = DatabaseManager(**self._options)
+                manager = self._manager
+        return manager
+    
+    def close(self):
+        """Close the manager if it was opened; the next use opens a fresh one"""
+        with self._lock:
+            manager, self._manager = self._manager, None
+        if manager is not None:
+            manager.close()
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.get(), name)
+
 
 # Global database instance
-db = DatabaseManager()
+db = LazyDatabaseManager()
 
 # Additional functions for AI generation component
 def save_generated_script(script_record: Dict[str, Any]) -> bool:
@@ -495,7 +1061,7 @@ def save_generated_script(script_record: Dict[str, Any]) -> bool:
     try:
         return db.create_generated_script(
             prospect_id=script_record.get('prospect_id'),
-            user_id=script_record.get('user_id', 1),  # Default to hardcoded user
+            user_id=script_record.get('user_id') or db.ensure_user(DEFAULT_USERNAME),
             script_data={
                 'script_type': script_record.get('script_type'),
                 'content': script_record.get('generated_content'),
@@ -507,33 +1073,10 @@ def save_generated_script(script_record: Dict[str, Any]) -> bool:
         print(f"Error saving generated script: {e}")
         return False
 
-def get_generated_scripts() -> List[Dict[str, Any]]:
-    """Get all generated scripts with prospect information"""
+def get_generated_scripts(limit: Optional[int] = None, include_content: bool = True) -> List[Dict[str, Any]]:
+    """Get generated scripts with prospect information, newest first"""
     try:
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT 
-                gs.*,
-                p.company_name,
-                p.industry,
-                p.meeting_objective
-            FROM generated_scripts gs
-            LEFT JOIN prospects p ON gs.prospect_id = p.id
-            ORDER BY gs.created_at DESC
-        ''')
-        
-        results = cursor.fetchall()
-        columns = [description[0] for description in cursor.description]
-        
-        scripts = []
-        for row in results:
-            script_dict = dict(zip(columns, row))
-            scripts.append(script_dict)
-        
-        conn.close()
-        return scripts
+        return db.get_generated_scripts(limit=limit, include_content=include_content).to_dicts()
     except Exception as e:
         print(f"Error getting generated scripts: {e}")
-        return [] 
\ No newline at end of file
+        return []
@@ -0,0 +1,230 @@
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from .backends import StorageBackend, get_backend
+
+
+class PoolTimeoutError(sqlite3.OperationalError):
+    """Raised when no pooled connection becomes available in time"""
+
+
+class PooledConnection(sqlite3.Connection):
+    """SQLite connection that returns itself to its pool on close()"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pool: Optional['ConnectionPool'] = None
+        self._depth = 0
+        self._last_used = time.monotonic()
+
+    @property
+    def nested(self) -> bool:
+        """True when the current thread has checked this connection out more than once"""
+        return self._depth > 1
+
+    def commit(self):
+        """Commit, deferring to the outermost checkout when nested"""
+        if self.nested:
+            return
+        super().commit()
+
+    def close(self):
+        """Hand the connection back to the pool instead of closing it"""
+        if self._pool is None:
+            super().close()
+        else:
+            self._pool.release(self)
+
+    def _close(self):
+        """Really close the underlying SQLite handle"""
+        self._pool = None
+        super().close()
+
+
+class ConnectionPool:
+    """Thread-safe pool of long-lived SQLite connections.
+
+    Each thread holds at most one connection at a time; repeated checkouts
+    from the same thread are re-entrant and share that connection. Idle
+    connections are handed back to the thread that last used them when
+    possible, and are health-checked before reuse once they have been idle
+    for longer than ``health_check_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        db_path: Union[str, StorageBackend],
+        max_size: int = 8,
+        timeout: float = 30.0,
+        health_check_interval: float = 30.0,
+        on_connect: Optional[Callable[[sqlite3.Connection], None]] = None,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.backend = get_backend(db_path)
+        self.db_path = self.backend.location
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.on_connect = on_connect
+
+        self._cond = threading.Condition()
+        self._idle: List[PooledConnection] = []
+        self._size = 0
+        self._local = threading.local()
+        self._closed = False
+        self._last_activity = time.monotonic()
+        self._stats = {'created': 0, 'reused': 0, 'discarded': 0, 'waits': 0}
+
+    def _connect(self) -> PooledConnection:
+        """Open a new pooled connection"""
+        conn = self.backend.connect(factory=PooledConnection)
+        if self.on_connect is not None:
+            self.on_connect(conn)
+        conn._pool = self
+        with self._cond:
+            self._stats['created'] += 1
+        return conn
+
+    def _is_healthy(self, conn: PooledConnection) -> bool:
+        """Ping a connection that has been idle for a while"""
+        if time.monotonic() - conn._last_used < self.health_check_interval:
+            return True
+        try:
+            conn.execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn: PooledConnection):
+        """Drop a broken connection and free its slot"""
+        try:
+            conn._close()
+        except sqlite3.Error:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._stats['discarded'] += 1
+            self._cond.notify()
+
+    def _checkout(self) -> PooledConnection:
+        """Take an idle connection or open a new one, waiting if the pool is full"""
+        deadline = time.monotonic() + self.timeout
+        preferred = getattr(self._local, 'last', None)
+
+        while True:
+            conn = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise sqlite3.ProgrammingError("Connection pool is closed")
+                    if self._idle:
+                        if preferred is not None and preferred in self._idle:
+                            self._idle.remove(preferred)
+                            conn = preferred
+                        else:
+                            conn = self._idle.pop()
+                        self._stats['reused'] += 1
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeoutError(
+                            f"Timed out after {self.timeout}s waiting for a database connection"
+                        )
+                    self._stats['waits'] += 1
+                    self._cond.wait(remaining)
+
+            if conn is None:
+                try:
+                    return self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+
+            if self._is_healthy(conn):
+                return conn
+            self._discard(conn)
+
+    def acquire(self) -> PooledConnection:
+        """Check out this thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn._depth += 1
+            return conn
+
+        conn = self._checkout()
+        conn._depth = 1
+        self._local.conn = conn
+        self._local.last = conn
+        return conn
+
+    def release(self, conn: PooledConnection):
+        """Return a connection; the outermost release puts it back in the pool.
+
+        Anything the holder left uncommitted, as after an exception, is rolled
+        back here. The thread's checkout is cleared first, so even a failed
+        rollback cannot leave later checkouts on the thread nested.
+        """
+        if conn._depth <= 0:
+            return
+        conn._depth -= 1
+        if conn._depth > 0:
+            return
+
+        if getattr(self._local, 'conn', None) is conn:
+            self._local.conn = None
+
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except BaseException as e:
+            # A connection that cannot roll back may still hold the write lock
+            self._discard(conn)
+            if isinstance(e, sqlite3.Error):
+                return
+            raise
+
+        conn._last_used = time.monotonic()
+        with self._cond:
+            self._last_activity = conn._last_used
+            if self._closed:
+                self._size -= 1
+                conn._close()
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+    def close_all(self):
+        """Close idle connections and refuse further checkouts"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            conn._close()
+
+    def idle_for(self) -> float:
+        """Seconds since the last connection was returned, or 0 while any is checked out"""
+        with self._cond:
+            if self._size > len(self._idle):
+                return 0.0
+            return time.monotonic() - self._last_activity
+
+    def stats(self) -> Dict[str, Any]:
+        """Get pool usage counters"""
+        with self._cond:
+            return {
+                'max_size': self.max_size,
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                **self._stats,
+            }
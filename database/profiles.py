@@ -0,0 +1,71 @@
+import os
+import sqlite3
+from dataclasses import dataclass
+from typing import Dict, Optional, Union
+
+
+@dataclass(frozen=True)
+class StorageProfile:
+    """SQLite settings applied to every pooled connection"""
+    name: str
+    journal_mode: str = 'WAL'
+    synchronous: str = 'NORMAL'
+    mmap_size: int = 256 * 1024 * 1024
+    cache_size: int = -16000  # negative values are KiB, so roughly 16 MB per connection
+    temp_store: str = 'MEMORY'
+    busy_timeout_ms: int = 5000
+    # Transactions that read before they write take the write lock up front
+    # with an explicit BEGIN IMMEDIATE; 'IMMEDIATE' here does it for all of them
+    begin_mode: Optional[str] = None
+    # Off by default in SQLite; enforcing it is what makes ON DELETE CASCADE work
+    foreign_keys: bool = True
+
+    def apply(self, conn: sqlite3.Connection):
+        """Apply the profile's PRAGMAs and transaction mode to a connection"""
+        # busy_timeout goes first so the journal_mode switch itself can wait
+        conn.execute(f'PRAGMA busy_timeout = {int(self.busy_timeout_ms)}')
+        try:
+            conn.execute(f'PRAGMA journal_mode = {self.journal_mode}')
+        except sqlite3.OperationalError:
+            # The journal mode is stored in the database file; leaving WAL needs
+            # exclusive access, so while other connections are open keep the current mode
+            pass
+        conn.execute(f'PRAGMA synchronous = {self.synchronous}')
+        conn.execute(f'PRAGMA mmap_size = {int(self.mmap_size)}')
+        conn.execute(f'PRAGMA cache_size = {int(self.cache_size)}')
+        conn.execute(f'PRAGMA temp_store = {self.temp_store}')
+        conn.execute(f'PRAGMA foreign_keys = {"ON" if self.foreign_keys else "OFF"}')
+        conn.isolation_level = self.begin_mode or ''
+
+
+PROFILES: Dict[str, StorageProfile] = {
+    # Default: WAL lets readers run alongside a writer, NORMAL sync is safe in WAL mode
+    'wal': StorageProfile(name='wal'),
+    # WAL, but fsync on every commit for hosts where power loss is a concern
+    'durable': StorageProfile(name='durable', synchronous='FULL'),
+    # SQLite's stock rollback journal; kept for comparison and for read-only media
+    'legacy': StorageProfile(
+        name='legacy',
+        journal_mode='DELETE',
+        synchronous='FULL',
+        mmap_size=0,
+        cache_size=-2000,
+        temp_store='DEFAULT'
+    ),
+}
+
+DEFAULT_PROFILE = 'wal'
+
+
+def get_profile(profile: Union[str, StorageProfile, None] = None) -> StorageProfile:
+    """Resolve a profile name (or NBP_DB_PROFILE when omitted) to a StorageProfile"""
+    if isinstance(profile, StorageProfile):
+        return profile
+
+    name = profile or os.getenv('NBP_DB_PROFILE', DEFAULT_PROFILE)
+    try:
+        return PROFILES[name.lower()]
+    except KeyError:
+        raise ValueError(
+            f"Unknown storage profile '{name}'. Choose one of: {', '.join(PROFILES)}"
+        ) from None
@@ -0,0 +1,132 @@
+"""Check that every SQL query in database/models.py is served by an index.
+
+Runs EXPLAIN QUERY PLAN for each query against a freshly migrated database
+and exits non-zero if any of them still scans a table.
+
+    python -m database.query_plan [--db path/to/existing.db] [--verbose]
+"""
+import argparse
+import ast
+import inspect
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+from typing import Dict, List, Tuple
+
+SQL_VERBS = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH', 'REPLACE')
+
+# Queries that read a whole table on purpose, keyed by their whitespace-normalized text
+ALLOWED_SCANS: Dict[str, str] = {
+    'SELECT name, value FROM global_counters': 'four-row counters table',
+    'SELECT seq FROM sqlite_sequence WHERE name = ?': 'one row per AUTOINCREMENT table',
+}
+
+
+def normalize(sql: str) -> str:
+    """Collapse whitespace so queries can be compared regardless of layout"""
+    return re.sub(r'\s+', ' ', sql).strip()
+
+
+def collect_queries(module=None) -> List[Tuple[int, str]]:
+    """Find every SQL string literal in a module, with its line number"""
+    if module is None:
+        from database import models as module
+
+    tree = ast.parse(inspect.getsource(module))
+    # Bare string statements are docstrings, not queries
+    docstrings = {id(node.value) for node in ast.walk(tree) if isinstance(node, ast.Expr)}
+
+    queries, seen = [], set()
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.Constant) and isinstance(node.value, str)):
+            continue
+        if id(node) in docstrings:
+            continue
+        sql = normalize(node.value)
+        if not sql.upper().startswith(SQL_VERBS) or sql in seen:
+            continue
+        seen.add(sql)
+        queries.append((node.lineno, sql))
+
+    return sorted(queries)
+
+
+def explain(conn: sqlite3.Connection, sql: str) -> List[str]:
+    """Get the query plan detail lines for a query, binding NULL to each parameter"""
+    params = [None] * sql.count('?')
+    return [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', params)]
+
+
+def find_scans(plan: List[str]) -> List[str]:
+    """Pick out plan steps that walk a whole table"""
+    # Scanning a subquery's own (already filtered) result set is not a table scan
+    subqueries = {step.split(' ', 1)[1] for step in plan if step.startswith(('MATERIALIZE ', 'CO-ROUTINE '))}
+    scans = []
+    for step in plan:
+        if not step.startswith('SCAN ') or 'CONSTANT ROW' in step:
+            continue
+        if step.split(' ')[1] in subqueries:
+            continue
+        # An FTS5 MATCH is answered from the full-text index (idxStr starting with M)
+        if re.search(r'VIRTUAL TABLE INDEX \d+:M', step):
+            continue
+        scans.append(step)
+    return scans
+
+
+def check(conn: sqlite3.Connection, queries: List[Tuple[int, str]], verbose: bool = False) -> int:
+    """Print a report and return the number of queries with unexpected scans"""
+    failures = 0
+    for lineno, sql in queries:
+        try:
+            plan = explain(conn, sql)
+        except sqlite3.Error as e:
+            print(f"ERROR  models.py:{lineno}: {e}\n       {sql}")
+            failures += 1
+            continue
+
+        scans = find_scans(plan)
+        if scans and sql not in ALLOWED_SCANS:
+            status = 'SCAN '
+            failures += 1
+        elif scans:
+            status = 'ALLOW'
+        else:
+            status = 'OK   '
+
+        if verbose or status != 'OK   ':
+            print(f"{status}  models.py:{lineno}: {sql}")
+            if status == 'ALLOW':
+                print(f"       ({ALLOWED_SCANS[sql]})")
+            for step in plan:
+                print(f"         {step}")
+
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', help='existing database to check (default: a fresh, migrated one)')
+    parser.add_argument('--verbose', action='store_true', help='print the plan for every query')
+    args = parser.parse_args()
+
+    from database.models import DatabaseManager
+
+    queries = collect_queries()
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DatabaseManager(args.db or os.path.join(tmp, 'query_plan.db'))
+        conn = manager.get_connection()
+        try:
+            failures = check(conn, queries, verbose=args.verbose)
+        finally:
+            conn.close()
+            manager.close()
+
+    print(f"\n{len(queries)} queries checked, {failures} with table scans")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+"""Persistent cache of AI model responses.
+
+A response is stored under ``cache_key(model, messages, params)``, a
+SHA-256 of the canonical JSON of everything sent to the model. The same
+prompt with the same sampling parameters is therefore answered from the
+database instead of the API. Bodies are compressed like script blobs.
+
+Entries expire ``ttl`` seconds after they are written. Writing an entry
+also evicts the least recently used ones beyond ``max_entries`` or
+``max_bytes`` (compressed). Hits, misses, bypasses (forced regeneration),
+evictions and the tokens the hits saved are counted in
+``ai_response_cache_stats``, so the numbers cover every process using
+the database.
+
+A lookup is a plain read. Its hit or miss, and the entry's hit count and
+last use, are held in a ``CacheUsage`` and written by ``flush_usage``
+along with the next cache write (or idle-time eviction). A read-mostly
+cache therefore does not take the write lock on every report view.
+
+    python -m database.response_cache [--db nbp_sales.db] [--clear]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .blobs import compress, inflate
+
+DEFAULT_TTL = float(os.getenv('NBP_AI_CACHE_TTL', str(7 * 24 * 3600)))
+DEFAULT_MAX_ENTRIES = int(os.getenv('NBP_AI_CACHE_MAX_ENTRIES', '5000'))
+DEFAULT_MAX_BYTES = int(os.getenv('NBP_AI_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+
+COUNTERS = ('hits', 'misses', 'bypasses', 'stores', 'evictions', 'tokens_saved')
+
+RESPONSE_CACHE_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS ai_response_cache (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    codec TEXT NOT NULL,
+    body BLOB NOT NULL,
+    stored_size INTEGER NOT NULL,
+    tokens_used INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_used_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_ai_response_cache_expires ON ai_response_cache (expires_at);
+CREATE INDEX IF NOT EXISTS idx_ai_response_cache_used ON ai_response_cache (last_used_at);
+
+CREATE TABLE IF NOT EXISTS ai_response_cache_stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO ai_response_cache_stats (name, value)
+VALUES ('hits', 0), ('misses', 0), ('bypasses', 0), ('stores', 0), ('evictions', 0), ('tokens_saved', 0);
+'''
+
+
+def cache_key(model: str, messages: List[Dict[str, Any]], params: Optional[Dict[str, Any]] = None) -> str:
+    """SHA-256 of the canonical JSON of a request (key order and whitespace do not matter)"""
+    payload = json.dumps(
+        {'model': model, 'messages': messages, 'params': params or {}},
+        sort_keys=True, separators=(',', ':'), ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _count(conn: sqlite3.Connection, name: str, amount: int = 1):
+    conn.execute('UPDATE ai_response_cache_stats SET value = value + ? WHERE name = ?', (amount, name))
+
+
+class CacheUsage:
+    """Hits, misses and bypasses counted in memory until ``flush_usage`` writes them"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'bypasses': 0, 'tokens_saved': 0}
+        # key -> (hits, last used)
+        self._used: Dict[str, Tuple[int, float]] = {}
+
+    def hit(self, key: str, tokens_saved: int, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self._counters['hits'] += 1
+            self._counters['tokens_saved'] += tokens_saved
+            hits, _ = self._used.get(key, (0, now))
+            self._used[key] = (hits + 1, now)
+
+    def miss(self):
+        with self._lock:
+            self._counters['misses'] += 1
+
+    def bypass(self):
+        with self._lock:
+            self._counters['bypasses'] += 1
+
+    def pending(self) -> Dict[str, int]:
+        """Counts not written yet"""
+        with self._lock:
+            return dict(self._counters)
+
+    def take(self) -> Tuple[Dict[str, int], Dict[str, Tuple[int, float]]]:
+        """Hand over the pending counts and entry usage, resetting them"""
+        with self._lock:
+            counters, used = self._counters, self._used
+            self._counters = dict.fromkeys(counters, 0)
+            self._used = {}
+        return counters, used
+
+
+def lookup(conn: sqlite3.Connection, key: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """The cached response for a key, or None; read-only, so record the hit or miss in a CacheUsage"""
+    now = time.time() if now is None else now
+    row = conn.execute(
+        'SELECT model, codec, body, tokens_used, created_at, hits FROM ai_response_cache '
+        'WHERE key = ? AND expires_at > ?',
+        (key, now)
+    ).fetchone()
+    if row is None:
+        return None
+
+    model, codec, body, tokens_used, created_at, hits = row
+    return {
+        'content': inflate(codec, body),
+        'model': model,
+        'tokens_used': tokens_used,
+        'created_at': created_at,
+        'hits': hits + 1,
+    }
+
+
+def flush_usage(conn: sqlite3.Connection, usage: CacheUsage) -> int:
+    """Write pending counts and entry usage; returns the lookups written (caller commits)"""
+    counters, used = usage.take()
+    for name, amount in counters.items():
+        if amount:
+            _count(conn, name, amount)
+    if used:
+        conn.executemany(
+            'UPDATE ai_response_cache SET hits = hits + ?, last_used_at = MAX(last_used_at, ?) WHERE key = ?',
+            [(hits, last_used, key) for key, (hits, last_used) in used.items()]
+        )
+    return counters['hits'] + counters['misses']
+
+
+def store(conn: sqlite3.Connection, key: str, model: str, content: str, tokens_used: int,
+          ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES,
+          max_bytes: int = DEFAULT_MAX_BYTES, now: Optional[float] = None) -> int:
+    """Cache a response and evict down to the limits; returns the entries evicted (caller commits)"""
+    now = time.time() if now is None else now
+    codec, body = compress(content)
+    conn.execute(
+        '''
+        INSERT INTO ai_response_cache (
+            key, model, codec, body, stored_size, tokens_used, created_at, expires_at, last_used_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (key) DO UPDATE SET
+            model = excluded.model, codec = excluded.codec, body = excluded.body,
+            stored_size = excluded.stored_size, tokens_used = excluded.tokens_used,
+            created_at = excluded.created_at, expires_at = excluded.expires_at,
+            last_used_at = excluded.last_used_at, hits = 0
+        ''',
+        (key, model, codec, body, len(body), tokens_used or 0, now, now + ttl, now)
+    )
+    _count(conn, 'stores')
+    return evict(conn, max_entries, max_bytes, now)
+
+
+def evict(conn: sqlite3.Connection, max_entries: int = DEFAULT_MAX_ENTRIES,
+          max_bytes: int = DEFAULT_MAX_BYTES, now: Optional[float] = None) -> int:
+    """Drop expired entries, then least recently used ones beyond the limits (caller commits)"""
+    now = time.time() if now is None else now
+    removed = conn.execute('DELETE FROM ai_response_cache WHERE expires_at <= ?', (now,)).rowcount
+
+    entries, stored = conn.execute(
+        'SELECT COUNT(*), COALESCE(SUM(stored_size), 0) FROM ai_response_cache'
+    ).fetchone()
+    if entries > max_entries or stored > max_bytes:
+        # Keep the most recently used entries that fit both budgets
+        removed += conn.execute(
+            '''
+            DELETE FROM ai_response_cache WHERE key IN (
+                SELECT key FROM (
+                    SELECT key,
+                           ROW_NUMBER() OVER recent AS position,
+                           SUM(stored_size) OVER recent AS running_bytes
+                    FROM ai_response_cache
+                    WINDOW recent AS (ORDER BY last_used_at DESC, key)
+                )
+                WHERE position > ? OR running_bytes > ?
+            )
+            ''',
+            (max_entries, max_bytes)
+        ).rowcount
+
+    if removed:
+        _count(conn, 'evictions', removed)
+    return removed
+
+
+def clear(conn: sqlite3.Connection) -> int:
+    """Delete every cached response (the counters are kept); caller commits"""
+    return conn.execute('DELETE FROM ai_response_cache').rowcount
+
+
+def cache_stats(conn: sqlite3.Connection, pending: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """Counters (plus this process's pending ones) and the current size of the cache"""
+    stats = {name: 0 for name in COUNTERS}
+    stats.update(conn.execute('SELECT name, value FROM ai_response_cache_stats').fetchall())
+    for name, amount in (pending or {}).items():
+        stats[name] += amount
+    entries, stored = conn.execute(
+        'SELECT COUNT(*), COALESCE(SUM(stored_size), 0) FROM ai_response_cache'
+    ).fetchone()
+    lookups = stats['hits'] + stats['misses']
+    stats.update({
+        'entries': entries,
+        'stored_bytes': stored,
+        'hit_rate': stats['hits'] / lookups if lookups else 0.0,
+    })
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', default='nbp_sales.db')
+    parser.add_argument('--clear', action='store_true', help='delete every cached response first')
+    args = parser.parse_args()
+
+    from database.models import DatabaseManager
+
+    manager = DatabaseManager(args.db, maintenance=False)
+    try:
+        if args.clear:
+            print(f"Cleared {manager.clear_ai_response_cache()} cached responses")
+        stats = manager.get_ai_cache_stats()
+        print(f"{stats['entries']:,} cached responses, {stats['stored_bytes']:,} bytes stored")
+        print(f"{stats['hits']:,} hits, {stats['misses']:,} misses ({stats['hit_rate']:.1%} hit rate), "
+              f"{stats['bypasses']:,} forced regenerations")
+        print(f"{stats['tokens_saved']:,} tokens saved, {stats['evictions']:,} entries evicted")
+    finally:
+        manager.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+import sqlite3
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+
+def _columns(cursor: sqlite3.Cursor) -> Tuple[str, ...]:
+    """Column names of the cursor's current result.
+
+    Read from each query rather than cached by SQL text: a migration that
+    adds columns changes what ``SELECT *`` returns.
+    """
+    return tuple(d[0] for d in cursor.description or ())
+
+
+class RowSet(Sequence):
+    """Query result held as sqlite3.Row objects.
+
+    Rows support access by index and by column name. Conversion to a pandas
+    DataFrame only happens (and pandas is only imported) when ``to_frame()``
+    is called, and the frame is cached.
+    """
+
+    __slots__ = ('columns', 'rows', '_frame')
+
+    def __init__(self, columns: Tuple[str, ...], rows: List[sqlite3.Row]):
+        self.columns = columns
+        self.rows = rows
+        self._frame = None
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        return self.rows[index]
+
+    def __iter__(self) -> Iterator[sqlite3.Row]:
+        return iter(self.rows)
+
+    def __repr__(self) -> str:
+        return f"RowSet({len(self.rows)} rows, columns={list(self.columns)})"
+
+    @property
+    def empty(self) -> bool:
+        """True when the query returned no rows"""
+        return not self.rows
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Get the rows as plain dictionaries"""
+        columns = self.columns
+        return [dict(zip(columns, row)) for row in self.rows]
+
+    def to_dict(self, orient: str = 'records') -> List[Dict[str, Any]]:
+        """DataFrame-compatible alias for to_dicts(); only 'records' is supported"""
+        if orient != 'records':
+            raise ValueError("RowSet.to_dict only supports orient='records'; use to_frame() for others")
+        return self.to_dicts()
+
+    def to_frame(self):
+        """Get the rows as a pandas DataFrame (built once, on first use)"""
+        if self._frame is None:
+            import pandas as pd
+            self._frame = pd.DataFrame.from_records(
+                [tuple(row) for row in self.rows],
+                columns=list(self.columns)
+            )
+        return self._frame
+
+
+def query_rows(conn: sqlite3.Connection, sql: str, params: Union[Sequence, Dict] = ()) -> RowSet:
+    """Run a query and return all rows as a RowSet"""
+    cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
+    cursor.execute(sql, params)
+    rows = cursor.fetchall()
+    return RowSet(_columns(cursor), rows)
+
+
+def query_one(conn: sqlite3.Connection, sql: str, params: Union[Sequence, Dict] = ()) -> Optional[Dict[str, Any]]:
+    """Run a query and return its first row as a dictionary, or None"""
+    cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
+    cursor.execute(sql, params)
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    return dict(zip(_columns(cursor), row))
@@ -0,0 +1,158 @@
+"""Full-text search indexes over prospects, contacts and generated scripts.
+
+The prospect and contact indexes are external-content FTS5 tables: they
+store only the inverted index and read column values back from their base
+tables, so the text is not duplicated. Script bodies are stored compressed,
+so ``scripts_fts`` keeps its own copy of the text instead (see
+``database.blobs``). Triggers keep the indexes in step with every insert,
+delete and update of an indexed column; ``rebuild_search_indexes``
+regenerates them.
+
+The prospect and script indexes also hold the owning ``user_id`` as a token
+in their last column (with zero ranking weight), so a user's search
+intersects posting lists inside FTS5 instead of ranking every user's
+matches and filtering after. Being last keeps snippet() from preferring it
+over a text column.
+"""
+import re
+import sqlite3
+from typing import Optional
+
+# Porter stemming on top of unicode61, with prefix indexes for type-ahead queries
+_TOKENIZE = "tokenize = 'porter unicode61 remove_diacritics 2', prefix = '2 3'"
+
+SEARCH_SCHEMA = f'''
+CREATE VIRTUAL TABLE IF NOT EXISTS prospects_fts USING fts5(
+    company_name, industry, context, notes, user_id,
+    content = 'prospects', content_rowid = 'id', {_TOKENIZE}
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5(
+    contact_name, title, email,
+    content = 'additional_contacts', content_rowid = 'id', {_TOKENIZE}
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS scripts_fts USING fts5(
+    script_type, content, user_id,
+    content = 'generated_scripts', content_rowid = 'id', {_TOKENIZE}
+);
+
+-- Prospects
+CREATE TRIGGER IF NOT EXISTS trg_prospects_fts_insert AFTER INSERT ON prospects
+BEGIN
+    INSERT INTO prospects_fts (rowid, company_name, industry, context, notes, user_id)
+    VALUES (NEW.id, NEW.company_name, NEW.industry, NEW.context, NEW.notes, NEW.user_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_prospects_fts_delete AFTER DELETE ON prospects
+BEGIN
+    INSERT INTO prospects_fts (prospects_fts, rowid, company_name, industry, context, notes, user_id)
+    VALUES ('delete', OLD.id, OLD.company_name, OLD.industry, OLD.context, OLD.notes, OLD.user_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_prospects_fts_update
+AFTER UPDATE OF user_id, company_name, industry, context, notes ON prospects
+BEGIN
+    INSERT INTO prospects_fts (prospects_fts, rowid, company_name, industry, context, notes, user_id)
+    VALUES ('delete', OLD.id, OLD.company_name, OLD.industry, OLD.context, OLD.notes, OLD.user_id);
+    INSERT INTO prospects_fts (rowid, company_name, industry, context, notes, user_id)
+    VALUES (NEW.id, NEW.company_name, NEW.industry, NEW.context, NEW.notes, NEW.user_id);
+END;
+
+-- Contacts
+CREATE TRIGGER IF NOT EXISTS trg_contacts_fts_insert AFTER INSERT ON additional_contacts
+BEGIN
+    INSERT INTO contacts_fts (rowid, contact_name, title, email)
+    VALUES (NEW.id, NEW.contact_name, NEW.title, NEW.email);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_contacts_fts_delete AFTER DELETE ON additional_contacts
+BEGIN
+    INSERT INTO contacts_fts (contacts_fts, rowid, contact_name, title, email)
+    VALUES ('delete', OLD.id, OLD.contact_name, OLD.title, OLD.email);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_contacts_fts_update
+AFTER UPDATE OF contact_name, title, email ON additional_contacts
+BEGIN
+    INSERT INTO contacts_fts (contacts_fts, rowid, contact_name, title, email)
+    VALUES ('delete', OLD.id, OLD.contact_name, OLD.title, OLD.email);
+    INSERT INTO contacts_fts (rowid, contact_name, title, email)
+    VALUES (NEW.id, NEW.contact_name, NEW.title, NEW.email);
+END;
+
+-- Generated scripts
+CREATE TRIGGER IF NOT EXISTS trg_scripts_fts_insert AFTER INSERT ON generated_scripts
+BEGIN
+    INSERT INTO scripts_fts (rowid, script_type, content, user_id)
+    VALUES (NEW.id, NEW.script_type, NEW.content, NEW.user_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_scripts_fts_delete AFTER DELETE ON generated_scripts
+BEGIN
+    INSERT INTO scripts_fts (scripts_fts, rowid, script_type, content, user_id)
+    VALUES ('delete', OLD.id, OLD.script_type, OLD.content, OLD.user_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_scripts_fts_update
+AFTER UPDATE OF user_id, script_type, content ON generated_scripts
+BEGIN
+    INSERT INTO scripts_fts (scripts_fts, rowid, script_type, content, user_id)
+    VALUES ('delete', OLD.id, OLD.script_type, OLD.content, OLD.user_id);
+    INSERT INTO scripts_fts (rowid, script_type, content, user_id)
+    VALUES (NEW.id, NEW.script_type, NEW.content, NEW.user_id);
+END;
+'''
+
+# bm25 column weights: names and titles count for more than free text, owners not at all
+_RANKING = {
+    'prospects_fts': 'bm25(10.0, 3.0, 1.0, 1.0, 0.0)',
+    'contacts_fts': 'bm25(10.0, 3.0, 5.0)',
+    'scripts_fts': 'bm25(2.0, 1.0, 0.0)',
+}
+
+# Text columns searched by default, i.e. everything but the owner token
+SEARCH_COLUMNS = {
+    'prospects_fts': ('company_name', 'industry', 'context', 'notes'),
+    'contacts_fts': ('contact_name', 'title', 'email'),
+    'scripts_fts': ('script_type', 'content'),
+}
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def rebuild_search_indexes(conn: sqlite3.Connection):
+    """Regenerate every search index from its base table (caller handles the transaction)"""
+    for table, ranking in _RANKING.items():
+        conn.execute(f"INSERT INTO {table} ({table}) VALUES ('rebuild')")
+        conn.execute(f"INSERT INTO {table} ({table}, rank) VALUES ('rank', ?)", (ranking,))
+
+
+def optimize_search_indexes(conn: sqlite3.Connection):
+    """Merge each index's b-trees into one for faster queries"""
+    for table in _RANKING:
+        conn.execute(f"INSERT INTO {table} ({table}) VALUES ('optimize')")
+
+
+def build_match_query(text: str) -> Optional[str]:
+    """Turn free text into a safe FTS5 query, or None if it has no searchable words.
+
+    Every word must match; the last one also matches as a prefix so results
+    update while the user is still typing. Quoting each word keeps FTS5
+    operators and punctuation in user input from being interpreted.
+    """
+    tokens = _TOKEN.findall(text or '')
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def scoped_match(table: str, match: str, user_id: Optional[int] = None) -> str:
+    """Restrict a build_match_query() result to a table's text columns and, optionally, one owner"""
+    columns = ' '.join(SEARCH_COLUMNS[table])
+    scoped = f'{{{columns}}} : ({match})'
+    if user_id is not None:
+        scoped = f'user_id : "{int(user_id)}" AND {scoped}'
+    return scoped
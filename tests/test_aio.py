@@ -0,0 +1,58 @@
+import asyncio
+import threading
+
+from database.aio import AsyncDatabaseManager
+from database.models import DatabaseManager
+
+
+def test_failed_write_is_rolled_back_without_its_batch(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'test.db'), maintenance=False)
+
+    def failing_write(db):
+        db.create_prospect(1, {'company_name': 'Half Written Ltd'})
+        raise ValueError('rejected')
+
+    async def main():
+        adb = AsyncDatabaseManager(db)
+        started, release = threading.Event(), threading.Event()
+
+        def hold_writer(db):
+            started.set()
+            release.wait(5)
+
+        # Park the writer so the following calls queue up and commit as one batch
+        held = asyncio.ensure_future(adb.write(hold_writer))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        queued = [
+            asyncio.ensure_future(adb.create_prospect(1, {'company_name': 'Acme Corp'})),
+            asyncio.ensure_future(adb.write(failing_write)),
+            asyncio.ensure_future(adb.create_prospect(1, {'company_name': 'Globex'})),
+        ]
+        await asyncio.sleep(0.1)
+        release.set()
+        await held
+        results = await asyncio.gather(*queued, return_exceptions=True)
+        stats = adb.stats()['writer']
+        await adb.aclose()
+        return results, stats
+
+    try:
+        results, stats = asyncio.run(main())
+
+        assert isinstance(results[1], ValueError)
+        assert [type(result) for result in (results[0], results[2])] == [int, int]
+        assert stats['largest_batch'] == 3
+        companies = [row['company_name'] for row in db.get_user_prospects(1)]
+        assert sorted(companies) == ['Acme Corp', 'Globex']
+    finally:
+        db.close()
+
+
+def test_non_batched_write_runs_in_its_own_transaction(tmp_path):
+    async def main():
+        async with AsyncDatabaseManager(db_path=str(tmp_path / 'test.db'), maintenance=False) as adb:
+            await adb.create_prospect(1, {'company_name': 'Acme Corp'})
+            await adb.optimize_search()
+            return await adb.search(1, 'acme')
+
+    assert [row['kind'] for row in asyncio.run(main())] == ['prospect']
@@ -0,0 +1,45 @@
+import sqlite3
+
+from database import analytics_store
+from database.models import DatabaseManager
+
+
+def test_legacy_rows_without_timestamp_are_kept():
+    conn = sqlite3.connect(':memory:')
+    conn.executescript(analytics_store.ANALYTICS_SCHEMA)
+    conn.execute('''
+        CREATE TABLE analytics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, action_type TEXT NOT NULL,
+            action_data TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.executemany(
+        'INSERT INTO analytics (user_id, action_type, created_at) VALUES (?, ?, ?)',
+        [(1, 'login', '2024-03-05 10:00:00'), (1, 'login', None), (1, 'export', '')]
+    )
+
+    analytics_store.migrate_legacy_table(conn)
+
+    rows = conn.execute('SELECT id, action_type, created_at FROM analytics ORDER BY id').fetchall()
+    assert [(row[0], row[1]) for row in rows] == [(1, 'login'), (2, 'login'), (3, 'export')]
+    assert all(row[2] for row in rows)
+
+
+def test_activity_summary_includes_events_since_the_last_rollup(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'test.db'), maintenance=False)
+    try:
+        db.roll_up_analytics()
+        assert db.get_user_action_totals(1) == {}
+
+        db.log_analytics(1, 'prospect_created')
+        db.log_analytics(1, 'prospect_created')
+        db.create_user('other_rep', 'x')
+        db.log_analytics(db.get_user_by_username('other_rep')['id'], 'prospect_created')
+
+        # Within ROLLUP_INTERVAL of the rollup above, so this reads the raw events
+        assert db.get_user_action_totals(1) == {'prospect_created': 2}
+
+        db.roll_up_analytics()
+        assert db.get_user_action_totals(1) == {'prospect_created': 2}
+    finally:
+        db.close()
@@ -0,0 +1,15 @@
+from database.models import DatabaseManager
+
+
+def test_analytics_for_a_missing_user_do_not_drop_the_batch(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'test.db'), maintenance=False)
+    try:
+        db.log_analytics(1, 'login')
+        db.log_analytics(999, 'login')
+        db.log_analytics(1, 'logout')
+        db.analytics_sink.flush()
+
+        assert [row['action_type'] for row in db.get_user_analytics(1)] == ['logout', 'login']
+        assert db.analytics_sink.stats()['failed'] == 1
+    finally:
+        db.close()
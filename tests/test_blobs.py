@@ -0,0 +1,53 @@
+import sqlite3
+
+from database.models import DatabaseManager
+
+
+def test_scripts_can_be_deleted_without_the_app(tmp_path):
+    path = str(tmp_path / 'test.db')
+    db = DatabaseManager(path, maintenance=False)
+    try:
+        prospect_id = db.create_prospect(1, {'company_name': 'Acme Corp'})
+        other_id = db.create_prospect(1, {'company_name': 'Globex'})
+        for owner in (prospect_id, other_id):
+            db.create_generated_script(owner, 1, {'script_type': 'AI Report', 'content': 'Quarterly widget forecast'})
+    finally:
+        db.close()
+
+    # A plain connection, as the sqlite3 shell or a backup tool would open
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute('PRAGMA foreign_keys = ON')
+        conn.execute('DELETE FROM prospects WHERE id = ?', (prospect_id,))
+        conn.commit()
+        assert conn.execute('SELECT refcount FROM script_blobs').fetchall() == [(1,)]
+        conn.execute('DELETE FROM prospects WHERE id = ?', (other_id,))
+        conn.commit()
+        assert conn.execute('SELECT COUNT(*) FROM script_blobs').fetchone() == (0,)
+    finally:
+        conn.close()
+
+    db = DatabaseManager(path, maintenance=False)
+    try:
+        assert len(db.search(1, 'widget')) == 0
+    finally:
+        db.close()
+
+
+def test_script_text_is_searchable_and_read_back(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'test.db'), maintenance=False)
+    try:
+        prospect_id = db.create_prospect(1, {'company_name': 'Acme Corp'})
+        db.create_generated_scripts(1, [
+            {'prospect_id': prospect_id, 'script_type': 'AI Report', 'content': 'Quarterly widget forecast'},
+            {'prospect_id': prospect_id, 'script_type': 'Cold Call', 'content': 'Ask about gadget budgets'},
+        ])
+
+        results = db.search(1, 'widget')
+        assert [(row['kind'], row['title']) for row in results] == [('script', 'AI Report')]
+        assert '**widget**' in results[0]['snippet']
+        assert sorted(row['content'] for row in db.get_prospect_scripts(prospect_id)) == [
+            'Ask about gadget budgets', 'Quarterly widget forecast'
+        ]
+    finally:
+        db.close()
@@ -0,0 +1,82 @@
+import io
+import sqlite3
+
+import pytest
+
+from components.bulk_import import import_prospects
+from database.models import DatabaseManager
+
+HEADER = 'Company Name,Contact Name,Email,Meeting Objective\n'
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / 'test.db'), maintenance=False)
+    yield manager
+    manager.close()
+
+
+def csv_file(*companies: str) -> io.BytesIO:
+    rows = ''.join(f'{company},Jane Doe,jane@example.com,Discovery call\n' for company in companies)
+    return io.BytesIO((HEADER + rows).encode('utf-8'))
+
+
+def test_failed_batch_reports_only_the_rows_that_fail(db, monkeypatch):
+    create = db.create_prospects_with_contacts
+
+    def create_rejecting_bad_rows(user_id, prospects):
+        if any(prospect['company_name'] == 'Bad Row Ltd' for prospect in prospects):
+            raise sqlite3.IntegrityError('FOREIGN KEY constraint failed')
+        return create(user_id, prospects)
+
+    monkeypatch.setattr(db, 'create_prospects_with_contacts', create_rejecting_bad_rows)
+    result = import_prospects(db, 1, csv_file('Acme Corp', 'Bad Row Ltd', 'Globex'), 'accounts.csv')
+
+    assert result.imported == 2
+    assert [row_number for row_number, _ in result.errors] == [3]
+    assert db.get_user_statistics(1)['total_prospects'] == 2
+
+
+def test_failed_duplicate_check_does_not_block_the_import(db, monkeypatch):
+    def fail(*args, **kwargs):
+        raise sqlite3.OperationalError('database is locked')
+
+    monkeypatch.setattr(db, 'find_exact_duplicate_prospects', fail)
+    result = import_prospects(db, 1, csv_file('Acme Corp', 'Globex'), 'accounts.csv')
+
+    assert (result.imported, result.failed) == (2, 0)
+    assert len(result.warnings) == 1
+
+
+def test_invalid_rows_are_reported_by_file_row_number(db):
+    source = io.BytesIO((
+        HEADER
+        + 'Acme Corp,Jane Doe,jane@example.com,Discovery call\n'
+        + ',Jane Doe,jane@example.com,Discovery call\n'
+        + '\n'
+        + 'Globex,Jane Doe,not-an-email,Discovery call\n'
+        + 'Initech,Jane Doe,jane@example.com,Discovery call\n'
+    ).encode('utf-8'))
+
+    result = import_prospects(db, 1, source, 'accounts.csv', batch_size=1)
+
+    # Row 1 is the header and the blank row 4 is skipped without counting
+    assert (result.rows, result.imported, result.failed) == (4, 2, 2)
+    assert [row_number for row_number, _ in result.errors] == [3, 5]
+
+
+def test_error_list_is_capped_but_the_count_is_exact(db, monkeypatch):
+    monkeypatch.setattr('components.bulk_import.MAX_REPORTED_ERRORS', 2)
+    source = io.BytesIO((HEADER + ',Jane Doe,jane@example.com,Discovery call\n' * 5).encode('utf-8'))
+
+    result = import_prospects(db, 1, source, 'accounts.csv')
+
+    assert result.failed == 5
+    assert [row_number for row_number, _ in result.errors] == [2, 3]
+
+
+def test_duplicate_rows_are_flagged_by_row_number(db):
+    result = import_prospects(db, 1, csv_file('Acme Corp', 'Globex', 'ACME Corp.'), 'accounts.csv')
+
+    assert result.imported == 3
+    assert [row_number for row_number, _ in result.duplicate_warnings] == [4]
@@ -0,0 +1,75 @@
+import threading
+
+from database.cache import LRUCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_load_overlapping_an_invalidation_is_not_stored():
+    cache = LRUCache()
+    rows = {'acme': 'old'}
+    loading, written = threading.Event(), threading.Event()
+
+    def slow_load():
+        value = rows['acme']
+        loading.set()
+        written.wait(5)
+        return value
+
+    results = []
+    reader = threading.Thread(target=lambda: results.append(cache.get_or_load('acme', slow_load)))
+    reader.start()
+    loading.wait(5)
+    # A writer commits and invalidates while the reader still holds the old row
+    rows['acme'] = 'new'
+    cache.invalidate('acme')
+    written.set()
+    reader.join(5)
+
+    assert results == ['old']
+    assert cache.get_or_load('acme', lambda: rows['acme']) == 'new'
+
+
+def test_clear_during_a_load_discards_it():
+    cache = LRUCache()
+
+    def load():
+        cache.clear()
+        return 'stale'
+
+    assert cache.get_or_load('key', load) == 'stale'
+    assert len(cache) == 0
+
+
+def test_entries_expire_and_least_recent_is_evicted():
+    clock = FakeClock()
+    cache = LRUCache(max_entries=2, ttl=10, clock=clock)
+    cache.get_or_load('a', lambda: 1)
+    cache.get_or_load('b', lambda: 2)
+    cache.get_or_load('a', lambda: None)
+    cache.get_or_load('c', lambda: 3)
+
+    assert cache.get_or_load('b', lambda: 'reloaded') == 'reloaded'
+    clock.now = 11
+    assert cache.get_or_load('c', lambda: 'fresh') == 'fresh'
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['evictions'] == 2
+    assert stats['expirations'] == 1
+
+
+def test_disabled_cache_always_loads():
+    cache = LRUCache(max_entries=0)
+    calls = []
+
+    for _ in range(2):
+        cache.get_or_load('key', lambda: calls.append(1))
+
+    assert len(calls) == 2
+    assert len(cache) == 0
@@ -0,0 +1,55 @@
+import pytest
+
+from database.dedupe import REASON_NAME, REASON_SIMILAR, REASON_WEBSITE, name_keys, normalize_company_name, website_domain
+from database.models import DatabaseManager
+
+
+@pytest.mark.parametrize('name, normalized', [
+    ('ACME, Inc.', 'acme'),
+    ('The Acme Corporation', 'acme'),
+    ('Acme Holdings Ltd', 'acme'),
+    ('Société Générale SA', 'societe generale'),
+    ('Smith & Sons', 'smith and sons'),
+    ('The Company', 'company'),
+    ('Inc', 'inc'),
+    ('  ', None),
+    (None, None),
+])
+def test_company_names_normalize_to_their_distinctive_words(name, normalized):
+    assert normalize_company_name(name) == normalized
+
+
+def test_name_keys_include_the_reversed_name():
+    assert name_keys('Globex LLC') == ('globex', 'xebolg')
+    assert name_keys('') == (None, None)
+
+
+@pytest.mark.parametrize('url, domain', [
+    ('https://www.Acme.com/about', 'acme.com'),
+    ('acme.com', 'acme.com'),
+    ('http://user@shop.acme.co.uk:8080?ref=1', 'shop.acme.co.uk'),
+    ('www.acme.com.', 'acme.com'),
+    ('localhost', None),
+    ('', None),
+])
+def test_website_domain_keeps_only_the_host(url, domain):
+    assert website_domain(url) == domain
+
+
+def test_matches_by_website_name_and_near_miss(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'test.db'), maintenance=False)
+    try:
+        acme = db.create_prospect(1, {'company_name': 'Acme Inc', 'website': 'https://acme.com'})
+        globex = db.create_prospect(1, {'company_name': 'Globex Industries'})
+
+        by_website = db.find_duplicate_prospects(1, 'Totally Different', website='www.acme.com/contact')
+        by_name = db.find_duplicate_prospects(1, 'ACME Corporation')
+        by_typo = db.find_duplicate_prospects(1, 'Glbex Industries')
+        other_user = db.find_duplicate_prospects(2, 'Acme')
+    finally:
+        db.close()
+
+    assert [(m['id'], m['reason']) for m in by_website] == [(acme, REASON_WEBSITE)]
+    assert [(m['id'], m['reason']) for m in by_name] == [(acme, REASON_NAME)]
+    assert [(m['id'], m['reason']) for m in by_typo] == [(globex, REASON_SIMILAR)]
+    assert other_user == []
@@ -0,0 +1,64 @@
+import csv
+import io
+
+from openpyxl import load_workbook
+
+from database.export import SCRIPT_COLUMNS, export
+from database.models import DatabaseManager
+
+
+def read_csv(db: DatabaseManager, dataset: str, user_id: int = 1, chunk_size: int = 1000):
+    out = io.BytesIO()
+    rows = export(db, dataset, 'csv', out, user_id, chunk_size=chunk_size)
+    table = list(csv.reader(io.StringIO(out.getvalue().decode('utf-8-sig'))))
+    return rows, table[0], table[1:]
+
+
+def test_prospect_export_leaves_out_lookup_columns(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'test.db'), maintenance=False)
+    try:
+        db.create_prospect(1, {'company_name': 'Acme Corp', 'website': 'https://www.acme.com'})
+        _, header, body = read_csv(db, 'prospects')
+    finally:
+        db.close()
+
+    assert not {'normalized_name', 'name_reversed', 'website_domain'} & set(header)
+    assert len(body) == 1
+    record = dict(zip(header, body[0]))
+    assert (record['company_name'], record['website']) == ('Acme Corp', 'https://www.acme.com')
+
+
+def test_script_rows_line_up_with_the_header_across_chunks(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'test.db'), maintenance=False)
+    try:
+        prospect_id = db.create_prospect(1, {'company_name': 'Acme Corp'})
+        for number in range(3):
+            db.create_generated_script(prospect_id, 1, {
+                'script_type': f'Type {number}',
+                'content': f'Report {number}, with a comma\nand a second line',
+                'tokens_used': number,
+            })
+        rows, header, body = read_csv(db, 'scripts', chunk_size=1)
+    finally:
+        db.close()
+
+    assert rows == 3
+    assert header == [name for name, _ in SCRIPT_COLUMNS]
+    records = [dict(zip(header, row)) for row in body]
+    assert all(len(row) == len(header) for row in body)
+    assert sorted((r['script_type'], r['content'], r['tokens_used']) for r in records) == [
+        (f'Type {number}', f'Report {number}, with a comma\nand a second line', str(number)) for number in range(3)
+    ]
+    assert {r['prospect_id'] for r in records} == {str(prospect_id)}
+
+
+def test_empty_xlsx_export_still_has_a_header(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'test.db'), maintenance=False)
+    try:
+        out = io.BytesIO()
+        assert export(db, 'scripts', 'xlsx', out, 1) == 0
+    finally:
+        db.close()
+
+    sheet = load_workbook(io.BytesIO(out.getvalue())).active
+    assert [list(row) for row in sheet.iter_rows(values_only=True)] == [[name for name, _ in SCRIPT_COLUMNS]]
@@ -0,0 +1,90 @@
+import multiprocessing as mp
+import time
+
+from database.models import DatabaseManager
+
+POLL_INTERVAL = 0.1
+# Time a reader may take to notice a commit: one poll interval, plus a loop
+# over the prospects and process scheduling
+LATENCY_LIMIT = POLL_INTERVAL + 1.0
+READERS = 3
+PROSPECTS = 8
+WRITES = 60
+
+
+def reader(db_path: str, prospect_ids, stop, ready, results):
+    """Read every prospect in a loop, recording when each new version first shows up"""
+    db = DatabaseManager(db_path, invalidation_poll_interval=POLL_INTERVAL, maintenance=False)
+    seen, observations, regressions = {}, [], []
+
+    def observe(key, version):
+        previous = seen.get(key, -1)
+        if version < previous:
+            regressions.append((key, previous, version))
+        elif version > previous:
+            seen[key] = version
+            observations.append((key, version, time.time()))
+
+    try:
+        first = True
+        while not stop.is_set():
+            for prospect_id in prospect_ids:
+                name = db.get_prospect_by_id(prospect_id)['company_name']
+                observe(('prospect', prospect_id), int(name.rsplit(' v', 1)[1]))
+                observe(('contacts', prospect_id), len(db.get_prospect_contacts(prospect_id)))
+            if first:
+                ready.put(True)
+                first = False
+            time.sleep(0.001)
+    finally:
+        results.put({'observations': observations, 'regressions': regressions, 'final': seen})
+        db.close()
+
+
+def test_readers_in_other_processes_see_every_write_in_time(tmp_path):
+    db_path = str(tmp_path / 'test.db')
+    db = DatabaseManager(db_path, maintenance=False)
+    prospect_ids = [db.create_prospect(1, {'company_name': f'Company {i} v0'}) for i in range(PROSPECTS)]
+
+    ctx = mp.get_context('spawn')
+    stop, ready, results = ctx.Event(), ctx.Queue(), ctx.Queue()
+    readers = [ctx.Process(target=reader, args=(db_path, prospect_ids, stop, ready, results))
+               for _ in range(READERS)]
+    for process in readers:
+        process.start()
+    try:
+        for _ in readers:
+            ready.get(timeout=30)
+
+        versions = {(kind, prospect_id): 0 for kind in ('prospect', 'contacts') for prospect_id in prospect_ids}
+        committed = []
+        for write in range(WRITES):
+            prospect_id = prospect_ids[write % PROSPECTS]
+            if write % 2:
+                key = ('contacts', prospect_id)
+                versions[key] += 1
+                db.create_contact(prospect_id, {'contact_name': f'Contact {versions[key]}'})
+            else:
+                key = ('prospect', prospect_id)
+                versions[key] += 1
+                db.update_prospect(prospect_id, {'company_name': f'Company {prospect_id} v{versions[key]}'})
+            committed.append((key, versions[key], time.time()))
+            time.sleep(0.01)
+
+        time.sleep(LATENCY_LIMIT + POLL_INTERVAL)
+        stop.set()
+        reports = [results.get(timeout=30) for _ in readers]
+    finally:
+        stop.set()
+        for process in readers:
+            process.join(timeout=30)
+        db.close()
+
+    for report in reports:
+        assert report['regressions'] == []
+        assert report['final'] == versions
+        for key, version, written_at in committed:
+            # The first read of this version or a later one; an older one after that is stale
+            caught_up = min(at for seen_key, seen_version, at in report['observations']
+                            if seen_key == key and seen_version >= version)
+            assert caught_up - written_at <= LATENCY_LIMIT, (key, version)
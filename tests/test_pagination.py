@@ -0,0 +1,50 @@
+import pytest
+
+from database.models import DatabaseManager
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / 'test.db'), maintenance=False)
+    yield manager
+    manager.close()
+
+
+def create_prospects(db: DatabaseManager, count: int):
+    # One batch, so most rows share a created_at second and only the id breaks ties
+    return db.create_prospects_with_contacts(1, [{'company_name': f'Company {i}'} for i in range(count)])
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 5, 7])
+def test_pages_cover_every_row_once_newest_first(db, chunk_size):
+    ids = create_prospects(db, 15)
+
+    pages = list(db.iter_user_prospects(1, chunk_size=chunk_size))
+
+    seen = [row['id'] for page in pages for row in page]
+    assert seen == sorted(ids, reverse=True)
+    assert all(len(page) == chunk_size for page in pages[:-1])
+    assert 0 < len(pages[-1]) <= chunk_size
+
+
+def test_page_after_the_last_row_is_empty(db):
+    create_prospects(db, 3)
+    last = db.get_user_prospects(1)[-1]
+
+    assert db.get_user_prospects(1, limit=10, after_created_at=last['created_at'], after_id=last['id']).empty
+    assert list(db.iter_user_prospects(2)) == []
+
+
+def test_cursor_needs_both_created_at_and_id(db):
+    with pytest.raises(ValueError):
+        db.get_user_prospects(1, after_created_at='2024-01-01 00:00:00')
+    with pytest.raises(ValueError):
+        list(db.iter_user_prospects(1, chunk_size=0))
+
+
+def test_script_listing_can_leave_out_content(db):
+    prospect_id = create_prospects(db, 1)[0]
+    db.create_generated_script(prospect_id, 1, {'script_type': 'AI Report', 'content': 'Report body'})
+
+    assert 'content' not in db.get_user_scripts(1, include_content=False).columns
+    assert db.get_user_scripts(1)[0]['content'] == 'Report body'
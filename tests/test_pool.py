@@ -0,0 +1,64 @@
+import sqlite3
+import threading
+
+import pytest
+
+from database.models import DatabaseManager
+from database.profiles import StorageProfile
+
+
+@pytest.fixture(params=[None, 'IMMEDIATE'], ids=['deferred', 'immediate'])
+def db(request, tmp_path):
+    # A short busy timeout turns a held write lock into a quick failure
+    profile = StorageProfile(name='test', busy_timeout_ms=500, begin_mode=request.param)
+    manager = DatabaseManager(str(tmp_path / 'test.db'), profile=profile, maintenance=False)
+    yield manager
+    manager.close()
+
+
+def write_from_thread(db: DatabaseManager) -> object:
+    """Create a prospect on a new thread; returns its id or the exception raised"""
+    outcome = []
+
+    def write():
+        try:
+            outcome.append(db.create_prospect(1, {'company_name': 'Other Thread Ltd'}))
+        except Exception as e:
+            outcome.append(e)
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    thread.join()
+    return outcome[0]
+
+
+def test_failed_write_releases_the_write_lock(db):
+    with pytest.raises(sqlite3.IntegrityError):
+        db.create_prospect(999, {'company_name': 'No Such User Inc'})
+
+    assert isinstance(write_from_thread(db), int)
+    assert db.pool.stats()['in_use'] == 0
+
+
+def test_failed_write_does_not_nest_later_commits(db):
+    with pytest.raises(sqlite3.IntegrityError):
+        db.create_prospect(999, {'company_name': 'No Such User Inc'})
+    prospect_id = db.create_prospect(1, {'company_name': 'Acme Corp'})
+
+    # Committed, so visible to a connection outside the pool
+    other = sqlite3.connect(db.db_path)
+    try:
+        row = other.execute('SELECT company_name FROM prospects WHERE id = ?', (prospect_id,)).fetchone()
+    finally:
+        other.close()
+    assert row == ('Acme Corp',)
+
+
+def test_failed_write_inside_connection_block_rolls_back(db):
+    with pytest.raises(sqlite3.IntegrityError):
+        with db.connection() as conn:
+            conn.execute("INSERT INTO prospects (user_id, company_name) VALUES (1, 'Rolled Back')")
+            db.create_contact(999, {'contact_name': 'Nobody'})
+
+    assert isinstance(write_from_thread(db), int)
+    assert db.get_user_statistics(1)['total_prospects'] == 1
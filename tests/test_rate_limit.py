@@ -0,0 +1,89 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import openai
+import pytest
+
+from components.rate_limit import RateLimiter, TokenBucket, retry_after
+
+
+class RateLimitError(openai.RateLimitError):
+    """A 429 with just the parts the limiter reads, whatever the SDK version"""
+
+    def __init__(self, code=None, headers=None):
+        Exception.__init__(self, '429')
+        self.code = code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+def test_exhausted_quota_is_raised_without_retrying():
+    limiter = RateLimiter(rpm=1000, tpm=100000)
+    calls = []
+
+    def out_of_credit():
+        calls.append(1)
+        raise RateLimitError('insufficient_quota')
+
+    with pytest.raises(openai.RateLimitError):
+        limiter.call(out_of_credit, tokens=100)
+
+    stats = limiter.stats()
+    assert len(calls) == 1
+    assert (stats['rate_limited'], stats['paused_for'], stats['in_flight']) == (0, 0.0, 0)
+
+
+@pytest.mark.parametrize('headers, seconds', [
+    ({'retry-after-ms': '250', 'retry-after': '3'}, 0.25),
+    ({'retry-after': '3'}, 3.0),
+    ({'retry-after-ms': 'soon', 'retry-after': '2'}, 2.0),
+    ({'retry-after': '-1'}, 0.0),
+    ({}, None),
+])
+def test_retry_after_prefers_milliseconds(headers, seconds):
+    assert retry_after(RateLimitError(headers=headers)) == seconds
+
+
+def test_token_bucket_refills_over_a_minute_up_to_capacity():
+    bucket = TokenBucket(600, now=0.0)
+    bucket.level = 0.0
+
+    assert bucket.wait_for(100) == pytest.approx(10.0)
+    bucket.refill(5.0)
+    assert bucket.level == pytest.approx(50.0)
+    # More than the whole bucket waits only for a full one
+    assert bucket.wait_for(10000) == pytest.approx(55.0)
+    bucket.refill(1000.0)
+    assert bucket.level == 600
+
+
+def test_429_pauses_for_retry_after_then_retries():
+    limiter = RateLimiter(rpm=1000, tpm=100000, initial_concurrency=4)
+    attempts = []
+
+    def busy_once():
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise RateLimitError(headers={'retry-after-ms': '200'})
+        return SimpleNamespace(usage=SimpleNamespace(total_tokens=400))
+
+    limiter.call(busy_once, tokens=1000)
+
+    stats = limiter.stats()
+    assert attempts[1] - attempts[0] >= 0.2
+    assert (stats['rate_limited'], stats['decreases'], stats['in_flight']) == (1, 1, 0)
+    # The 429 refunds its whole reservation and the success its unused 600 tokens
+    assert stats['tokens_refunded'] == 1600
+    assert stats['concurrency_limit'] == 2.5
+
+
+def test_last_429_is_raised_after_the_attempts_run_out():
+    limiter = RateLimiter(rpm=1000, tpm=100000)
+
+    async def always_busy():
+        raise RateLimitError(headers={'retry-after-ms': '1'})
+
+    with pytest.raises(openai.RateLimitError):
+        asyncio.run(limiter.call_async(always_busy, tokens=10, attempts=3))
+
+    assert limiter.stats()['rate_limited'] == 3
@@ -0,0 +1,28 @@
+from database.models import DatabaseManager
+
+
+def test_lookup_is_a_read_and_counts_are_written_later(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'test.db'), maintenance=False)
+    try:
+        db.cache_ai_response('key', 'gpt-4', 'report', 120)
+        conn = db.get_connection()
+        try:
+            changes = conn.total_changes
+            assert db.get_cached_ai_response('key')['content'] == 'report'
+            assert db.get_cached_ai_response('missing') is None
+            db.record_ai_cache_bypass()
+            assert conn.total_changes == changes
+            assert not conn.in_transaction
+        finally:
+            conn.close()
+
+        # Pending counts show up in the stats before they are written
+        stats = db.get_ai_cache_stats()
+        assert (stats['hits'], stats['misses'], stats['bypasses'], stats['tokens_saved']) == (1, 1, 1, 120)
+
+        assert db.flush_ai_cache_usage() == 2
+        stats = db.get_ai_cache_stats()
+        assert (stats['hits'], stats['misses'], stats['bypasses'], stats['tokens_saved']) == (1, 1, 1, 120)
+        assert db.get_cached_ai_response('key')['hits'] == 2
+    finally:
+        db.close()
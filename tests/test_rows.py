@@ -0,0 +1,46 @@
+import sqlite3
+
+import pytest
+
+from database.rows import query_one, query_rows
+
+
+def test_select_star_sees_columns_added_later():
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)')
+    conn.execute("INSERT INTO items (name) VALUES ('first')")
+    assert query_rows(conn, 'SELECT * FROM items').columns == ('id', 'name')
+
+    conn.execute('ALTER TABLE items ADD COLUMN note TEXT')
+    conn.execute("UPDATE items SET note = 'added'")
+
+    assert query_rows(conn, 'SELECT * FROM items').columns == ('id', 'name', 'note')
+    assert query_one(conn, 'SELECT * FROM items') == {'id': 1, 'name': 'first', 'note': 'added'}
+
+
+def test_rows_are_readable_by_index_and_name():
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)')
+    conn.executemany('INSERT INTO items (name) VALUES (?)', [('first',), ('second',)])
+
+    rows = query_rows(conn, 'SELECT id, name FROM items ORDER BY id')
+
+    assert len(rows) == 2 and not rows.empty
+    assert rows[1]['name'] == rows[1][1] == 'second'
+    assert [row['id'] for row in rows] == [1, 2]
+    assert rows.to_dicts() == rows.to_dict('records') == [
+        {'id': 1, 'name': 'first'}, {'id': 2, 'name': 'second'}
+    ]
+    with pytest.raises(ValueError):
+        rows.to_dict('list')
+
+
+def test_empty_result_keeps_its_columns():
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)')
+
+    rows = query_rows(conn, 'SELECT id, name FROM items')
+
+    assert rows.empty
+    assert rows.columns == ('id', 'name')
+    assert query_one(conn, 'SELECT id, name FROM items') is None
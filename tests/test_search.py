@@ -0,0 +1,51 @@
+import pytest
+
+from database.models import DatabaseManager
+from database.search import build_match_query
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / 'test.db'), maintenance=False)
+    yield manager
+    manager.close()
+
+
+def add_prospect(db: DatabaseManager, user_id: int, company_name: str) -> int:
+    prospect_id = db.create_prospects_with_contacts(user_id, [{
+        'company_name': company_name,
+        'industry': 'Widgets',
+        'contacts': [{'contact_name': 'Jane Widget', 'email': 'jane@example.com'}],
+    }])[0]
+    db.create_generated_script(prospect_id, user_id, {'script_type': 'AI Report', 'content': 'Widget pricing plan'})
+    return prospect_id
+
+
+def test_search_only_returns_the_users_own_records(db):
+    other_id = db.ensure_user('other_rep')
+    own_id = add_prospect(db, 1, 'Acme Widgets')
+    add_prospect(db, other_id, 'Globex Widgets')
+
+    results = db.search(1, 'widget')
+
+    assert sorted(row['kind'] for row in results) == ['contact', 'prospect', 'script']
+    assert {row['prospect_id'] for row in results} == {own_id}
+    assert len(db.search(other_id + 1, 'widget')) == 0
+
+
+def test_user_id_is_not_matched_as_text(db):
+    other_id = db.ensure_user('other_rep')
+    add_prospect(db, other_id, 'Acme Widgets')
+
+    # The owner's id is indexed as a token, but only to scope searches, never as a word
+    assert len(db.search(1, str(other_id))) == 0
+    assert len(db.search(other_id, str(other_id))) == 0
+
+
+def test_query_operators_are_treated_as_words(db):
+    add_prospect(db, 1, 'Acme Widgets')
+
+    assert build_match_query('acme OR "globex') == '"acme" "OR" "globex"*'
+    assert build_match_query(' -*: ') is None
+    assert len(db.search(1, 'acme OR globex')) == 0
+    assert [row['kind'] for row in db.search(1, 'acme wid')] == ['prospect']
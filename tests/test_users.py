@@ -0,0 +1,43 @@
+import sqlite3
+
+from database.models import DEFAULT_USERNAME, DatabaseManager
+from database.profiles import StorageProfile
+
+
+def test_login_user_is_seeded_by_username(tmp_path):
+    path = str(tmp_path / 'test.db')
+    # An older database where id 1 already belongs to somebody else
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute("INSERT INTO users (id, username, password_hash) VALUES (1, 'manager', 'x')")
+    conn.commit()
+    conn.close()
+
+    db = DatabaseManager(path, maintenance=False)
+    try:
+        user_id = db.ensure_user(DEFAULT_USERNAME)
+        assert user_id != 1
+        assert db.get_user_by_id(user_id)['username'] == DEFAULT_USERNAME
+        assert db.ensure_user(DEFAULT_USERNAME) == user_id
+        assert isinstance(db.create_prospect(user_id, {'company_name': 'Acme Corp'}), int)
+    finally:
+        db.close()
+
+
+def test_existing_user_is_looked_up_while_another_writer_holds_the_lock(tmp_path):
+    path = str(tmp_path / 'test.db')
+    db = DatabaseManager(path, profile=StorageProfile(name='test', busy_timeout_ms=200), maintenance=False)
+    writer = sqlite3.connect(path)
+    try:
+        user_id = db.ensure_user(DEFAULT_USERNAME)
+        writer.execute('BEGIN IMMEDIATE')
+        assert db.ensure_user(DEFAULT_USERNAME) == user_id
+    finally:
+        writer.rollback()
+        writer.close()
+        db.close()